@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from car_agent.core.types import MODES
+from car_agent.safety.fsm import DRIVE_LIMITED, DRIVE_STOP
+
+
+_IDLE = MODES.index("idle")
+_PATH = MODES.index("path")
+_CTE_BLOCK = 1 << 16  # rows per (points, segments) block in cross_track
+
+
+def _col(arr: np.ndarray, name: str) -> np.ndarray:
+    return np.asarray(arr[name], dtype=np.float64)
+
+
+def _first_of_each(seq: np.ndarray) -> np.ndarray:
+    """Mask of the rows where seq differs from the row before (the first row always counts)."""
+    new = np.empty(len(seq), dtype=bool)
+    if len(seq):
+        new[0] = True
+        np.not_equal(seq[1:], seq[:-1], out=new[1:])
+    return new
+
+
+def loop_intervals(act: np.ndarray) -> np.ndarray:
+    """Control loop tick intervals in s; act is written once per tick."""
+    t = _col(act, "rx_time")
+    return np.diff(t[t > 0.0])
+
+
+def _ticks(act: np.ndarray) -> np.ndarray:
+    return _col(act, "rx_time")
+
+
+def cmd_latency(cmd: np.ndarray, act: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per received command: (link_s, hold_s). link is station send -> car
+    receive and is only as good as the clock sync between the two; hold is
+    car receive -> the first tick at or after it (act rx_time is the tick
+    time). Rows are joined on time, not index, since the recorder may drop
+    rows of one stream and not another.
+    """
+    seq = np.asarray(cmd["seq"])
+    rx = _col(cmd, "rx_time")
+    new = _first_of_each(seq) & (rx > 0.0)
+    rx_new = rx[new]
+    sent = _col(cmd, "t")[new]
+    link = (rx_new - sent)[sent > 0.0]
+    ticks = _ticks(act)
+    i = np.searchsorted(ticks, rx_new, side="left")
+    acted = i < len(ticks)
+    hold = ticks[i[acted]] - rx_new[acted]
+    return link, hold
+
+
+def velocity_errors(act: np.ndarray, chassis: np.ndarray, lag_ticks: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Commanded minus measured (vx, wz) while driving. The measurement is the
+    latest chassis frame stamped by lag_ticks median tick periods after the
+    command, so the chassis response delay is not counted as error.
+    """
+    ticks = _ticks(act)
+    stamps = _col(chassis, "stamp")
+    if len(ticks) < 2 or len(stamps) == 0:
+        return np.zeros(0), np.zeros(0)
+    lag_s = lag_ticks * float(np.median(np.diff(ticks)))
+    j = np.searchsorted(stamps, ticks + lag_s, side="right") - 1
+    seen = j >= 0
+    j = np.maximum(j, 0)
+    c = chassis[j]
+    ok = seen & (np.asarray(act["mode"]) != _IDLE) & (np.asarray(c["err"]) == 0) & (stamps[j] > 0.0)
+    ev = _col(act, "vx")[ok] - _col(c, "vx")[ok]
+    ew = _col(act, "wz")[ok] - _col(c, "wz")[ok]
+    return ev, ew
+
+
+def _segment_dist(px: np.ndarray, py: np.ndarray, seg: np.ndarray, ax, ay, dx, dy) -> np.ndarray:
+    """Distance from each point to each of its candidate segments seg, shape (N, K)."""
+    sx, sy, ex, ey = ax[seg], ay[seg], dx[seg], dy[seg]
+    rx = px[:, None] - sx
+    ry = py[:, None] - sy
+    u = np.clip((rx * ex + ry * ey) / np.maximum(ex * ex + ey * ey, 1e-12), 0.0, 1.0)
+    rx -= u * ex
+    ry -= u * ey
+    return np.sqrt(rx * rx + ry * ry)
+
+
+def path_poses(pose: np.ndarray, act: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (x, y) of the poses taken in path mode (every pose if the run never was).
+    A pose gets the mode of the latest tick at or before its stamp.
+    """
+    px, py = _col(pose, "x"), _col(pose, "y")
+    ticks = _ticks(act)
+    if len(ticks) == 0:
+        return px, py
+    i = np.searchsorted(ticks, _col(pose, "stamp"), side="right") - 1
+    sel = (i >= 0) & (np.asarray(act["mode"])[np.maximum(i, 0)] == _PATH)
+    if not sel.any():
+        return px, py
+    return px[sel], py[sel]
+
+
+def path_distance(
+    px: np.ndarray, py: np.ndarray, path_x: np.ndarray, path_y: np.ndarray, cell_m: float = 0.05,
+) -> np.ndarray:
+    """
+    Distance from every point to the path polyline. Exact, but instead of
+    every segment each point only tries the segments that can be nearest to
+    some point of its grid cell: those within the cell centre's distance
+    plus the cell diagonal.
+    """
+    px = np.asarray(px, dtype=np.float64)
+    py = np.asarray(py, dtype=np.float64)
+    path_x = np.asarray(path_x, dtype=np.float64)
+    path_y = np.asarray(path_y, dtype=np.float64)
+    if len(px) == 0 or len(path_x) < 2:
+        return np.zeros(0)
+    ax, ay = path_x[:-1], path_y[:-1]
+    dx, dy = np.diff(path_x), np.diff(path_y)
+
+    ix = np.floor(px / cell_m).astype(np.int64)
+    iy = np.floor(py / cell_m).astype(np.int64)
+    keys, inv = np.unique((ix << 32) + (iy & 0xFFFFFFFF), return_inverse=True)
+    inv = inv.reshape(-1)
+    centre_x = ((keys >> 32) + 0.5) * cell_m
+    centre_y = (((keys & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000 + 0.5) * cell_m
+    cand = np.empty((len(keys), len(ax)), dtype=bool)
+    rows = max(1, _CTE_BLOCK // len(ax))
+    for i in range(0, len(keys), rows):
+        j = slice(i, i + rows)
+        seg_all = np.broadcast_to(np.arange(len(ax)), (len(centre_x[j]), len(ax)))
+        d_c = _segment_dist(centre_x[j], centre_y[j], seg_all, ax, ay, dx, dy)
+        cand[j] = d_c <= d_c.min(axis=1, keepdims=True) + cell_m * math.sqrt(2.0)
+    # pad every cell's candidate list to the longest with its own first candidate
+    k = int(cand.sum(axis=1).max())
+    order = np.argsort(~cand, axis=1, kind="stable")[:, :k]
+    seg = np.where(np.take_along_axis(cand, order, axis=1), order, order[:, :1])
+
+    out = np.empty(len(px))
+    for i in range(0, len(px), _CTE_BLOCK):
+        j = slice(i, i + _CTE_BLOCK)
+        out[j] = _segment_dist(px[j], py[j], seg[inv[j]], ax, ay, dx, dy).min(axis=1)
+    return out
+
+
+def cross_track(pose: np.ndarray, act: np.ndarray, path_x: np.ndarray, path_y: np.ndarray) -> np.ndarray:
+    """Distance to the path for every pose taken in path mode (every pose if the run never was)."""
+    px, py = path_poses(pose, act)
+    return path_distance(px, py, path_x, path_y)
+
+
+def uwb_dropouts(uwb: np.ndarray, t_end: float = 0.0, gap_s: float = 0.0) -> Tuple[np.ndarray, int]:
+    """
+    (spans_s, fixes): durations of the gaps between good fixes longer than
+    gap_s (0: three median fix intervals, at least 0.2 s), including a
+    trailing gap up to t_end when the fixes stopped before the run did.
+    """
+    s = _col(uwb, "stamp")[np.asarray(uwb["err"]) == 0]
+    if len(s) == 0:
+        return np.zeros(0), 0
+    d = np.diff(s)
+    if gap_s <= 0.0:
+        gap_s = max(0.2, 3.0 * float(np.median(d))) if len(d) else 0.2
+    spans = d[d > gap_s]
+    if t_end - s[-1] > gap_s:
+        spans = np.append(spans, t_end - s[-1])
+    return spans, len(s)
+
+
+def chassis_frames(chassis: np.ndarray, period_s: float = 0.0) -> Tuple[int, int, np.ndarray]:
+    """
+    (received, lost, intervals_s) for chassis frames as seen by the loop:
+    chassis rows repeat the latest frame every tick, so distinct stamps are
+    the frames and a gap of k periods (0: median interval) is k - 1 lost.
+    """
+    s = _col(chassis, "stamp")[np.asarray(chassis["err"]) == 0]
+    s = s[_first_of_each(s)]
+    d = np.diff(s)
+    if len(d) == 0:
+        return len(s), 0, d
+    if period_s <= 0.0:
+        period_s = float(np.median(d))
+    k = np.rint(d / max(period_s, 1e-6))
+    lost = int(np.maximum(k - 1.0, 0.0).sum())
+    return len(s), lost, d
+
+
+def telemetry_stats(telem: np.ndarray) -> Tuple[int, int, float, float]:
+    """
+    (packets, bytes, limited_s, stop_s) from the telemetry stream; each
+    packet's drive mode counts until the next packet.
+    """
+    sent = np.asarray(telem["size"]) > 0
+    dt = np.diff(_col(telem, "stamp"))
+    drive = np.asarray(telem["drive"])[:-1]
+    return (
+        int(np.count_nonzero(sent)),
+        int(np.asarray(telem["size"], dtype=np.int64).sum()),
+        float(dt[drive == DRIVE_LIMITED].sum()),
+        float(dt[drive == DRIVE_STOP].sum()),
+    )
+
+
+def extract(run, path_xy: Optional[Tuple[np.ndarray, np.ndarray]] = None, lag_ticks: int = 1) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
+    """
+    One pass over a run: additive counts plus the per-event samples the
+    summary percentiles come from, so runs of one car can be pooled.
+    """
+    act = run["act"]
+    intervals = loop_intervals(act)
+    link, hold = cmd_latency(run["cmd"], act)
+    ev, ew = velocity_errors(act, run["chassis"], lag_ticks)
+    t_end = float(act["rx_time"][-1]) if len(act) else 0.0
+    spans, fixes = uwb_dropouts(run["uwb"], t_end)
+    frames, lost, frame_dt = chassis_frames(run["chassis"])
+    packets, sent_bytes, limited_s, stop_s = telemetry_stats(run["telemetry"])
+
+    counts = {
+        "runs": 1,
+        "ticks": len(act),
+        "duration_s": float(intervals.sum()),
+        "cmds": len(hold),
+        "uwb_fixes": fixes,
+        "chassis_frames": frames,
+        "chassis_lost": lost,
+        "telem_packets": packets,
+        "telem_bytes": sent_bytes,
+        "drive_limited_s": limited_s,
+        "drive_stop_s": stop_s,
+    }
+    samples = {
+        "loop_dt": intervals,
+        "link": link,
+        "hold": hold,
+        "v_err": ev,
+        "w_err": ew,
+        "uwb_gap": spans,
+        "frame_dt": frame_dt,
+    }
+    if path_xy is not None:
+        samples["cte"] = cross_track(run["pose"], act, path_xy[0], path_xy[1])
+    return counts, samples
+
+
+def _pct(x: np.ndarray, *q: float) -> Tuple[float, ...]:
+    if len(x) == 0:
+        return (float("nan"),) * len(q)
+    return tuple(float(v) for v in np.percentile(x, q))
+
+
+def _rms(x: np.ndarray) -> float:
+    return float(np.sqrt(np.mean(x * x))) if len(x) else float("nan")
+
+
+def summarize(counts: Dict[str, float], samples: Dict[str, np.ndarray], period_s: float = 0.0) -> Dict[str, float]:
+    """Scalar metrics from extract() output; period_s is the nominal loop period (0: median tick)."""
+    dt = samples["loop_dt"]
+    loop50, loop99 = _pct(dt, 50, 99)
+    nominal = period_s or (loop50 if len(dt) else 0.0)
+    hold50, hold99 = _pct(samples["hold"], 50, 99)
+    link50, link99 = _pct(samples["link"], 50, 99)
+    dur = counts["duration_s"]
+    expected = counts["chassis_frames"] + counts["chassis_lost"]
+    gaps = samples["uwb_gap"]
+    out = {
+        "runs": counts["runs"],
+        "duration_s": dur,
+        "ticks": counts["ticks"],
+        "loop_p50_ms": 1e3 * loop50,
+        "loop_p99_ms": 1e3 * loop99,
+        "loop_max_ms": 1e3 * float(dt.max()) if len(dt) else float("nan"),
+        "jitter_p99_ms": 1e3 * _pct(np.abs(dt - nominal), 99)[0],
+        "overruns": int(np.count_nonzero(dt > 1.5 * nominal)) if nominal > 0.0 else 0,
+        "cmds": counts["cmds"],
+        "hold_p50_ms": 1e3 * hold50,
+        "hold_p99_ms": 1e3 * hold99,
+        "link_p50_ms": 1e3 * link50,
+        "link_p99_ms": 1e3 * link99,
+        "v_err_rms": _rms(samples["v_err"]),
+        "v_err_p95": _pct(np.abs(samples["v_err"]), 95)[0],
+        "w_err_rms": _rms(samples["w_err"]),
+        "uwb_fixes": counts["uwb_fixes"],
+        "uwb_hz": counts["uwb_fixes"] / dur if dur > 0.0 else 0.0,
+        "uwb_dropouts": len(gaps),
+        "uwb_dropout_s": float(gaps.sum()),
+        "uwb_dropout_max_s": float(gaps.max()) if len(gaps) else 0.0,
+        "chassis_frames": counts["chassis_frames"],
+        "chassis_lost": counts["chassis_lost"],
+        "chassis_loss": counts["chassis_lost"] / expected if expected else 0.0,
+        "chassis_dt_p99_ms": 1e3 * _pct(samples["frame_dt"], 99)[0],
+        "telem_hz": counts["telem_packets"] / dur if dur > 0.0 else 0.0,
+        "telem_bps": counts["telem_bytes"] / dur if dur > 0.0 else 0.0,
+        "drive_limited_frac": counts["drive_limited_s"] / dur if dur > 0.0 else 0.0,
+        "drive_stop_frac": counts["drive_stop_s"] / dur if dur > 0.0 else 0.0,
+    }
+    if "cte" in samples:
+        cte = samples["cte"]
+        out.update({"cte_rms": _rms(cte), "cte_p95": _pct(cte, 95)[0], "cte_max": float(cte.max()) if len(cte) else float("nan")})
+    return out
+
+
+def pool(parts) -> Tuple[Dict[str, float], Dict[str, np.ndarray]]:
+    """Merge extract() results (e.g. all runs of one car) into one."""
+    counts: Dict[str, float] = {}
+    chunks: Dict[str, list] = {}
+    for c, s in parts:
+        for k, v in c.items():
+            counts[k] = counts.get(k, 0) + v
+        for k, v in s.items():
+            chunks.setdefault(k, []).append(v)
+    return counts, {k: np.concatenate(v) for k, v in chunks.items()}
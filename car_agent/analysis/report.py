@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from car_agent.analysis.metrics import extract, pool, summarize
+from car_agent.analysis.runs import find_runs, load_run
+
+
+# (key, header, format) of the table columns; --json has every metric
+COLUMNS = (
+    ("duration_s", "dur_s", "{:8.0f}"),
+    ("loop_p99_ms", "loop99", "{:7.1f}"),
+    ("jitter_p99_ms", "jit99", "{:6.1f}"),
+    ("overruns", "ovr", "{:6d}"),
+    ("hold_p99_ms", "hold99", "{:7.1f}"),
+    ("link_p50_ms", "link50", "{:7.1f}"),
+    ("link_p99_ms", "link99", "{:7.1f}"),
+    ("v_err_rms", "v_rms", "{:6.3f}"),
+    ("uwb_hz", "uwb_hz", "{:6.1f}"),
+    ("uwb_dropouts", "drops", "{:6d}"),
+    ("uwb_dropout_max_s", "drop_max", "{:8.2f}"),
+    ("chassis_loss", "ch_loss", "{:7.2%}"),
+    ("telem_bps", "tel_Bps", "{:8.0f}"),
+    ("drive_limited_frac", "limited", "{:7.1%}"),
+)
+
+
+def _load_path(spec: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    if not spec:
+        return None
+    from car_agent.control.evaluate import load_path
+
+    return load_path(spec)
+
+
+def _analyze(job: Tuple[str, Optional[Tuple[np.ndarray, np.ndarray]], int]):
+    path, path_xy, lag = job
+    run = load_run(Path(path))
+    counts, samples = extract(run, path_xy, lag)
+    return str(run.path), run.name, run.car_id, run.t0, counts, samples
+
+
+def analyze(
+    roots: List[str], path_xy: Optional[Tuple[np.ndarray, np.ndarray]] = None, lag_ticks: int = 1,
+    period_s: float = 0.0, jobs: int = 1,
+) -> Dict[str, List[Dict[str, object]]]:
+    """{"runs": [...], "cars": [...]}: one metrics dict per run and per car (its runs pooled)."""
+    todo = [(str(p), path_xy, lag_ticks) for p in find_runs(roots)]
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            results = list(ex.map(_analyze, todo))
+    else:
+        results = [_analyze(j) for j in todo]
+
+    runs: List[Dict[str, object]] = []
+    by_car: Dict[str, list] = {}
+    for path, name, car, t0, counts, samples in results:
+        row: Dict[str, object] = {"run": name, "car": car, "path": path, "start": t0}
+        row.update(summarize(counts, samples, period_s))
+        runs.append(row)
+        by_car.setdefault(car, []).append((counts, samples))
+    cars = []
+    for car in sorted(by_car):
+        row = {"car": car}
+        row.update(summarize(*pool(by_car[car]), period_s=period_s))
+        cars.append(row)
+    return {"runs": runs, "cars": cars}
+
+
+def _width(fmt: str) -> int:
+    return len(fmt.format(0))
+
+
+def _fmt(fmt: str, v: object) -> str:
+    width = _width(fmt)
+    if isinstance(v, float) and math.isnan(v):
+        return "-".rjust(width)
+    if fmt.endswith("d}"):
+        v = int(v)  # type: ignore[arg-type]
+    return fmt.format(v)
+
+
+def format_table(rows: List[Dict[str, object]], key: str) -> str:
+    width = max([len(key)] + [len(str(r[key])) for r in rows])
+    head = key.ljust(width) + " " + " ".join(
+        h.rjust(_width(f)) for _, h, f in COLUMNS
+    )
+    lines = [head]
+    for r in rows:
+        lines.append(str(r[key]).ljust(width) + " " + " ".join(_fmt(f, r[k]) for k, _, f in COLUMNS))
+    return "\n".join(lines)
+
+
+def _json_safe(v: object) -> object:
+    return None if isinstance(v, float) and not math.isfinite(v) else v
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="per-run and per-car metrics from recorder runs (record_dir)")
+    ap.add_argument("roots", nargs="+", help="run directories or directories holding them, searched recursively")
+    ap.add_argument("--path", type=str, default="", help="reference path for cross-track error: .npz with path_x, path_y or a make_path name")
+    ap.add_argument("--hz", type=float, default=0.0, help="nominal control rate for loop jitter; 0 uses each run's median tick")
+    ap.add_argument("--lag", type=int, default=1, help="ticks between a command and the chassis sample it is compared with")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--json", type=str, default="", help="also write every metric to this file ('-' for stdout only)")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    t0 = time.perf_counter()
+    res = analyze(
+        args.roots, _load_path(args.path), lag_ticks=args.lag,
+        period_s=1.0 / args.hz if args.hz > 0.0 else 0.0, jobs=args.jobs,
+    )
+    elapsed = time.perf_counter() - t0
+
+    if args.json:
+        text = json.dumps(
+            {k: [{kk: _json_safe(vv) for kk, vv in r.items()} for r in rows] for k, rows in res.items()}, indent=1,
+        )
+        if args.json == "-":
+            print(text)
+            return
+        Path(args.json).write_text(text)
+
+    if not res["runs"]:
+        print(f"[analysis] no runs under {' '.join(args.roots)}")
+        return
+    print(format_table(res["runs"], "run"))
+    print()
+    print(format_table(res["cars"], "car"))
+    ticks = sum(int(r["ticks"]) for r in res["runs"])  # type: ignore[arg-type]
+    print(f"\n[analysis] {len(res['runs'])} runs, {len(res['cars'])} cars, {ticks} ticks in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from car_agent.core.types import SAMPLE_TYPES, CmdSample
+from car_agent.logging.recorder import open_record, read_header
+
+
+# what the main loop records; act is the command actually sent to the chassis,
+# telemetry one row per packet sent (size 0: the send failed)
+STREAMS = ("chassis", "cmd", "act", "pose", "odom", "uwb", "telemetry")
+
+
+def _empty(stream: str) -> np.ndarray:
+    cls = SAMPLE_TYPES.get(stream, CmdSample)
+    return np.zeros(0, dtype=cls.DTYPE)
+
+
+@dataclass
+class Run:
+    """One recorder run directory; streams are memory-mapped, never read in full."""
+
+    path: Path
+    car_id: str
+    streams: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __getitem__(self, stream: str) -> np.ndarray:
+        arr = self.streams.get(stream)
+        return arr if arr is not None else _empty(stream)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def t0(self) -> float:
+        ticks = self["act"]
+        return float(ticks["rx_time"][0]) if len(ticks) else 0.0
+
+
+def find_runs(roots: Iterable[str]) -> List[Path]:
+    """Every directory holding .rec files under roots (a root may itself be a run)."""
+    runs = set()
+    for root in roots:
+        base = Path(root).expanduser()
+        if base.is_file():
+            base = base.parent
+        runs.update(p.parent for p in base.rglob("*.rec"))
+    return sorted(runs)
+
+
+def load_run(path: Path) -> Run:
+    path = Path(path)
+    run = Run(path=path, car_id=path.name.split("_")[0])
+    for rec in sorted(path.glob("*.rec")):
+        try:
+            info = read_header(str(rec))
+        except ValueError:
+            continue
+        car_id = info.get("meta", {}).get("car_id")
+        if car_id:
+            run.car_id = str(car_id)
+        run.streams[info.get("stream", rec.stem)] = open_record(str(rec))
+    return run
@@ -1,34 +1,29 @@
 from __future__ import annotations
 
+import multiprocessing
 import time
-from dataclasses import dataclass
 from multiprocessing import Process, shared_memory
-from typing import Optional, Tuple
+from typing import Any, Optional, Tuple
 
 import numpy as np
 
+from car_agent.core.rt import Placement
+from car_agent.core.seqlock import snapshot
+from car_agent.core.types import ChassisSample, OdomSample
+
 from .shm_layout import ShmLayout
 from . import wheeltec_serial_io
 
 
-@dataclass
-class ChassisState:
-    vx: float = 0.0
-    vy: float = 0.0
-    vz: float = 0.0
-    ax: float = 0.0
-    ay: float = 0.0
-    az: float = 0.0
-    wx: float = 0.0
-    wy: float = 0.0
-    wz: float = 0.0
-    err: int = 0
-    stamp: float = 0.0
-
 
 class ChassisDriver:
-    def __init__(self, serial_port: str, baudrate: int = 115200, control_hz: float = 50.0) -> None:
+    def __init__(
+        self, serial_port: str, baudrate: int = 115200, control_hz: float = 50.0,
+        mp_context: Optional[Any] = None, placement: Optional[Placement] = None, backend: str = "pyserial",
+    ) -> None:
         self.serial_port = serial_port
+        self.placement = placement
+        self.backend = backend
         self.baudrate = int(baudrate)
         self.control_hz = float(control_hz)
 
@@ -36,8 +31,10 @@ class ChassisDriver:
         self._shm: Optional[shared_memory.SharedMemory] = None
         self._arr: Optional[np.ndarray] = None
         self._proc: Optional[Process] = None
+        self._ctx = mp_context if mp_context is not None else multiprocessing.get_context()
 
         self._last_cmd_ts: float = 0.0
+        self._vy_warn_last: float = 0.0
 
     def start(self) -> None:
         if self._proc is not None and self._proc.is_alive():
@@ -47,9 +44,9 @@ class ChassisDriver:
         self._arr = arr
         self._shm = shm
 
-        self._proc = Process(
+        self._proc = self._ctx.Process(
             target=wheeltec_serial_io.read_CAR,
-            args=(self._arr.shape, self._arr.dtype, self._shm.name, self.serial_port),
+            args=(self._arr.shape, self._arr.dtype, self._shm.name, self.serial_port, self.placement, self.baudrate, self.backend),
             daemon=True,
         )
         self._proc.start()
@@ -68,24 +65,33 @@ class ChassisDriver:
         self._arr[self.layout.cmd_slice] = [float(vx), 0.0, float(wz)]
         self._last_cmd_ts = time.time()
 
-    def get_state(self) -> ChassisState:
+    def get_state(self) -> ChassisSample:
         if self._arr is None:
-            return ChassisState(err=1, stamp=time.time())
+            return ChassisSample(stamp=time.time(), err=1)
 
-        s = self._arr.copy()
-        vx, vy, vz, ax, ay, az, wx, wy, wz = [float(x) for x in s[self.layout.state_slice]]
+        s = snapshot(self._arr, self.layout.seq_idx)
         err = int(s[self.layout.err_idx])
 
         if not self.is_alive():
             err = 1
 
-        return ChassisState(
-            vx=vx, vy=vy, vz=vz,
-            ax=ax, ay=ay, az=az,
-            wx=wx, wy=wy, wz=wz,
-            err=err,
-            stamp=time.time(),
-        )
+        # stamp is when the frame's first byte was read, not when we looked at it
+        stamp = float(s[self.layout.stamp_idx])
+        return ChassisSample(stamp, *s[self.layout.state_slice].tolist(), err)
+
+    def get_odom(self) -> OdomSample:
+        if self._arr is None:
+            return OdomSample()
+        s = snapshot(self._arr, self.layout.seq_idx)
+        x, y, yaw, dist, slip = s[self.layout.odom_slice].tolist()
+        return OdomSample(float(s[self.layout.stamp_idx]), x, y, yaw, dist, int(slip))
+
+    def rx_stats(self) -> Tuple[int, float]:
+        """(frames published, first-byte -> publish latency of the last frame in s)."""
+        if self._arr is None:
+            return 0, 0.0
+        s = snapshot(self._arr, self.layout.seq_idx)
+        return int(s[self.layout.frame_count_idx]), float(s[self.layout.pub_lat_idx])
 
     def stop(self) -> None:
         if self._proc is not None and self._proc.is_alive():
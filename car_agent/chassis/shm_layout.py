@@ -1,23 +1,36 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import dataclass, field
 
-import numpy as np
+from car_agent.core.types import CHASSIS_STATE_FIELDS
 
 
-SHM_LEN: int = 13
+SHM_LEN: int = 22
 
 CMD_SLICE = slice(0, 3)      # vx, vy, wz command
-STATE_SLICE = slice(3, 12)   # vx, vy, vz, ax, ay, az, wx, wy, wz
-ERR_IDX: int = 12            # error flag
+STATE_SLICE = slice(3, 12)   # ChassisSample fields: vx, vy, vz, ax, ay, az, wx, wy, wz
+STAMP_IDX: int = 12          # time.time() of the read that delivered the frame's first byte
+PUB_LAT_IDX: int = 13        # first byte -> shm publish latency of the last frame (s)
+FRAME_COUNT_IDX: int = 14    # frames published since start
+ODOM_SLICE = slice(15, 20)   # OdomSample fields: x, y, yaw, dist, slip (integrated in the I/O process)
+SEQ_IDX: int = 20            # seqlock counter, odd while the I/O process is publishing a frame
+ERR_IDX: int = 21            # error flag, always last
+
+assert STATE_SLICE.stop - STATE_SLICE.start == len(CHASSIS_STATE_FIELDS)
+assert ERR_IDX == SHM_LEN - 1
 
 
 @dataclass(frozen=True)
 class ShmLayout:
     length: int = SHM_LEN
-    cmd_slice: slice = CMD_SLICE
-    state_slice: slice = STATE_SLICE
+    # slice is unhashable, so it cannot be a plain dataclass default on newer Pythons
+    cmd_slice: slice = field(default_factory=lambda: CMD_SLICE)
+    state_slice: slice = field(default_factory=lambda: STATE_SLICE)
+    stamp_idx: int = STAMP_IDX
+    pub_lat_idx: int = PUB_LAT_IDX
+    frame_count_idx: int = FRAME_COUNT_IDX
+    odom_slice: slice = field(default_factory=lambda: ODOM_SLICE)
+    seq_idx: int = SEQ_IDX
     err_idx: int = ERR_IDX
 
     @property
@@ -1,18 +1,19 @@
 import time
 from multiprocessing import shared_memory, Process
 import numpy as np
-import serial
-import serial.tools.list_ports
 import logging
-try:
-    from prettytable import PrettyTable
-except Exception:
-    PrettyTable = None
+
+from car_agent.chassis.shm_layout import FRAME_COUNT_IDX, ODOM_SLICE, PUB_LAT_IDX, SEQ_IDX, SHM_LEN, STAMP_IDX
+from car_agent.core.rt import JitterMeter, apply_placement, format_jitter, format_report
+from car_agent.core.seqlock import write_begin, write_end
+from car_agent.core.transport import open_transport
+from car_agent.estimation.odometry import Odometry
 
 
 def init_CAR_shm():
-    # (X轴速度命令 Y轴速度命令 Z轴速度命令) (X轴速度 Y轴速度 Z轴速度) (X轴加速度 Y轴加速度 Z轴加速度) （X轴角速度 Y轴角速度 Z轴角速度）错误位
-    a = np.zeros(13)  # Start with an existing NumPy array
+    # (X轴速度命令 Y轴速度命令 Z轴速度命令) (X轴速度 Y轴速度 Z轴速度) (X轴加速度 Y轴加速度 Z轴加速度) （X轴角速度 Y轴角速度 Z轴角速度）
+    # 帧首字节接收时间 发布延迟 帧计数 (里程计 x y yaw 里程 打滑位) 序列锁计数 错误位，见 shm_layout
+    a = np.zeros(SHM_LEN)  # Start with an existing NumPy array
     shm = shared_memory.SharedMemory(create=True, size=a.nbytes)
 
     # 共享的数组
@@ -21,7 +22,7 @@ def init_CAR_shm():
     b[-1] = 1  # 初始化错误标识位为1，表示还没准备好
     return b, shm
 
-def read_CAR(shape, dtype, buffer_name, COM_name):
+def read_CAR(shape, dtype, buffer_name, COM_name, placement=None, baudrate=115200, backend="pyserial"):
     existing_shm = shared_memory.SharedMemory(name=buffer_name)
     # 从buffer中加载共享的numpy array
     shared_numpy = np.ndarray(shape, dtype=dtype, buffer=existing_shm.buf)
@@ -34,57 +35,108 @@ def read_CAR(shape, dtype, buffer_name, COM_name):
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     logger.info('=======CAR准备开始=======')
-    with serial.Serial(COM_name, 115200,
-                       bytesize=serial.EIGHTBITS,
-                       parity=serial.PARITY_NONE,
-                       stopbits=serial.STOPBITS_ONE,
-                       timeout=0.001) as ser:
-        if not ser.isOpen():
-            ser.open()
-        assert ser.isOpen()  # 串口是否已打开
-
-        ser.reset_input_buffer()
-        ser.reset_output_buffer()  # 打开串口后就自动开始接收数据，先清空缓存
-        temp_sum = b''  # 解码数组
-
-        frame_len = 24  # 单条信息字节长度24
-        send_period = 1.0 / 50.0  # 50HZ
-        next_send_t = time.perf_counter() + send_period  # 50Hz 定时
-
-        while True:
-            start_index = 0
-            # orgin_data = bytes.fromhex(ser.read(50).hex())  # 将字节转为16进制
-            orgin_data = ser.read(50)
-            temp_sum = temp_sum + orgin_data  # 加上之前没读完的字节
-            count = len(temp_sum)
-
-            while count > 50:
-                if temp_sum[start_index] == 0x7B and temp_sum[start_index + frame_len -1] == 0x7D:
-                    uwb_data = temp_sum[start_index:start_index + frame_len]
-                    velocity_X, velocity_Y, velocity_Z, acceleration_X, acceleration_Y, acceleration_Z, angular_X, angular_Y, angular_Z = CAR_Handle(uwb_data)
-                    shared_numpy[3:12] = [velocity_X, velocity_Y, velocity_Z, acceleration_X, acceleration_Y, acceleration_Z, angular_X, angular_Y, angular_Z]
-                    shared_numpy[-1] = 0  # 移除错误位
-                    start_index = start_index + 24
-                    count = count - 24
-
-                else:
-                    start_index = start_index + 1
-                    count = count - 1
-            temp_sum = temp_sum[start_index:]
+    if placement is not None:
+        # 绑核 / 实时优先级 / 锁内存，权限不够时降级并在日志里说明
+        logger.info(format_report("chassis", apply_placement(placement)))
+    # COM_name 可带前缀选后端: raw:/dev/ttyX, replay:/path.bin（loopback: 无人喂数据，这里不允许）
+    with open_transport(COM_name, baudrate, backend=backend, timeout_s=0.001) as ser:
+        ser.reset_input()  # 打开串口后就自动开始接收数据，先清空缓存
+        CAR_loop(ser, shared_numpy, logger)
 
-            now = time.perf_counter()
-            if now >= next_send_t:
-                # 从共享区/全局变量获取当前要发的命令（示例：shared_numpy 某些位置存目标）
-                # 假设：shared_numpy[0:3] 存的是目标 vx, vy, wz (m/s, m/s, rad/s)，你按自己的定义替换
-                command = shared_numpy[0:3].copy()
-                send_msg = Command_Trans(command)
-                ser.write(send_msg)
 
-                next_send_t += send_period
-                # 如果循环偶尔卡顿，避免 next_send_t 落后太多导致连续补发
-                if now - next_send_t > 0.5:
-                    next_send_t = now + send_period
+def CAR_loop(ser, shared_numpy, logger=None, stop_at_eof=False):
+    """
+    底盘收发主循环，ser 为任意 Transport。stop_at_eof=True 时回放结束即返回帧数（用于基准测试）。
+    """
+    temp_sum = b''  # 解码数组
+    temp_t = 0.0  # temp_sum 首字节到达时那次 read 的时间戳
+    frame_count = 0
+    starts = []
+    odom = Odometry()  # 每一帧都积分，不依赖主循环采样
+
+    send_period = 1.0 / 50.0  # 50HZ
+    next_send_t = time.perf_counter() + send_period  # 50Hz 定时
+    frame_jitter = JitterMeter(0.0)
+    send_jitter = JitterMeter(send_period)
+    next_report_t = time.perf_counter() + 10.0
+
+    while not (stop_at_eof and ser.eof):
+        orgin_data = ser.read(50)
+        if orgin_data:
+            t_read = time.time()  # 在 read 返回处打时间戳
+            if not temp_sum:
+                temp_t = t_read
+            chunk_start = len(temp_sum)  # 本次读到的字节在缓存中的起点
+            temp_sum = temp_sum + orgin_data  # 加上之前没读完的字节
 
+            # 帧尾字节一到就立即解析发布，不再攒够 50 字节
+            del starts[:]
+            frames, temp_sum = split_CAR_frames(temp_sum, starts=starts)
+            for car_data, start in zip(frames, starts):
+                state = CAR_Handle(car_data)
+                stamp = t_read if start >= chunk_start else temp_t
+                # vx, wz, ax, 当前命令 vx
+                odom.update(stamp, state[0], state[8], state[3], shared_numpy[0])
+                frame_jitter.tick(stamp)
+                frame_count += 1
+                # 序列锁：计数为奇数时主循环不会采用读到的快照，整帧写完再变回偶数
+                write_begin(shared_numpy, SEQ_IDX)
+                shared_numpy[3:12] = state
+                shared_numpy[STAMP_IDX] = stamp
+                shared_numpy[FRAME_COUNT_IDX] = frame_count
+                shared_numpy[ODOM_SLICE] = (odom.x, odom.y, odom.yaw, odom.dist, odom.slip)
+                shared_numpy[-1] = 0  # 移除错误位
+                shared_numpy[PUB_LAT_IDX] = time.time() - stamp
+                write_end(shared_numpy, SEQ_IDX)
+            if len(temp_sum) <= len(orgin_data):
+                temp_t = t_read
+
+        now = time.perf_counter()
+        if now >= next_send_t:
+            # shared_numpy[0:3] 存的是目标 vx, vy, wz (m/s, m/s, rad/s)
+            command = shared_numpy[0:3].copy()
+            send_msg = Command_Trans(command)
+            ser.write(send_msg)
+            send_jitter.tick(now)
+
+            next_send_t += send_period
+            # 如果循环偶尔卡顿，避免 next_send_t 落后太多导致连续补发
+            if now - next_send_t > 0.5:
+                next_send_t = now + send_period
+
+        if logger is not None and now >= next_report_t:
+            next_report_t = now + 10.0
+            logger.info(format_jitter("chassis frames", frame_jitter.stats()))
+            logger.info(format_jitter("chassis cmd send", send_jitter.stats()))
+    return frame_count
+
+
+CAR_FRAME_LEN = 24  # 单条信息字节长度24
+CAR_FRAME_HEAD = 0x7B
+CAR_FRAME_TAIL = 0x7D
+
+
+def split_CAR_frames(buf: bytes, min_buffered: int = CAR_FRAME_LEN - 1, check: bool = True, starts=None):
+    """
+    从缓存中切出完整的底盘帧（帧头 0x7B、帧尾 0x7D、第 23 字节为前 22 字节的 BCC）。
+    帧尾一到就切出；返回 (帧列表, 剩余未解析字节)。starts 非空时追加每帧在 buf 中的起点。
+    """
+    frames = []
+    start_index = 0
+    count = len(buf)
+    while count > min_buffered:
+        end = start_index + CAR_FRAME_LEN
+        if (buf[start_index] == CAR_FRAME_HEAD and buf[end - 1] == CAR_FRAME_TAIL
+                and (not check or bcc_xor(buf[start_index:end - 2]) == buf[end - 2])):
+            frames.append(buf[start_index:end])
+            if starts is not None:
+                starts.append(start_index)
+            start_index = end
+            count -= CAR_FRAME_LEN
+        else:
+            start_index += 1
+            count -= 1
+    return frames, buf[start_index:]
 
 
 def hex_to_int(b:bytes)->int:
@@ -177,6 +229,8 @@ def CAR_Handle(CAR_data):
 
 
 if __name__ == "__main__":
+    from prettytable import PrettyTable  # 仅调试打印使用
+
     CAR_data, shm = init_CAR_shm()
 
     p = Process(target=read_CAR, args=(CAR_data.shape, CAR_data.dtype, shm.name, "/dev/ttyCH343USB0"))
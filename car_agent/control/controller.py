@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from car_agent.estimation.estimator import wrap_angle
+from car_agent.safety.limits import clamp
+
+
+VELOCITY_MODES = ("open_loop", "pi")
+TRACKERS = ("pure_pursuit", "stanley")
+
+
+class TrackPath:
+    """Uploaded waypoints with a cruise speed; segment headings are precomputed once."""
+
+    __slots__ = ("path_id", "xs", "ys", "yaws", "v", "n")
+
+    def __init__(self, path_id: int, xs: Sequence[float], ys: Sequence[float], v: float) -> None:
+        n = len(xs)
+        if n < 2 or len(ys) != n:
+            raise ValueError(f"path needs >=2 waypoints with equal xs/ys length: xs={n} ys={len(ys)}")
+        xs_f = [float(x) for x in xs]
+        ys_f = [float(y) for y in ys]
+        for name, arr in (("xs", xs_f), ("ys", ys_f)):
+            bad = next((i for i, x in enumerate(arr) if not math.isfinite(x)), None)
+            if bad is not None:
+                raise ValueError(f"path {name} must be finite, got {arr[bad]} at index {bad}")
+        v = float(v)
+        if not math.isfinite(v):
+            raise ValueError(f"path v must be finite, got {v}")
+        self.path_id = int(path_id)
+        self.xs = xs_f
+        self.ys = ys_f
+        self.v = v
+        self.n = n
+        self.yaws = [
+            math.atan2(self.ys[i + 1] - self.ys[i], self.xs[i + 1] - self.xs[i]) for i in range(n - 1)
+        ]
+        self.yaws.append(self.yaws[-1])
+
+    @classmethod
+    def from_msg(cls, msg: Dict[str, Any]) -> "TrackPath":
+        return cls(int(msg.get("path_id", 0)), msg.get("xs", []), msg.get("ys", []), float(msg.get("v", 0.0)))
+
+
+class VelocityPI:
+    """Feedforward + PI on chassis-reported vx/wz."""
+
+    __slots__ = ("kp_v", "ki_v", "kp_w", "ki_w", "i_max", "_iv", "_iw")
+
+    def __init__(self, kp_v: float, ki_v: float, kp_w: float, ki_w: float, i_max: float) -> None:
+        self.kp_v = float(kp_v)
+        self.ki_v = float(ki_v)
+        self.kp_w = float(kp_w)
+        self.ki_w = float(ki_w)
+        self.i_max = float(i_max)
+        self._iv = 0.0
+        self._iw = 0.0
+
+    def reset(self) -> None:
+        self._iv = 0.0
+        self._iw = 0.0
+
+    def update(self, vx_ref: float, wz_ref: float, vx_meas: float, wz_meas: float, dt: float) -> Tuple[float, float]:
+        ev = vx_ref - vx_meas
+        ew = wz_ref - wz_meas
+        # a single NaN would stay in the integrators for good; the output still shows it this tick
+        if math.isfinite(ev * dt):
+            self._iv = clamp(self._iv + ev * dt, -self.i_max, self.i_max)
+        if math.isfinite(ew * dt):
+            self._iw = clamp(self._iw + ew * dt, -self.i_max, self.i_max)
+        vx = vx_ref + self.kp_v * ev + self.ki_v * self._iv
+        wz = wz_ref + self.kp_w * ew + self.ki_w * self._iw
+        return vx, wz
+
+
+class PathTracker:
+    """Pure pursuit or Stanley tracking on the fused pose; keeps a monotonic progress cursor."""
+
+    __slots__ = ("kind", "lookahead_m", "stanley_k", "heading_k", "goal_tol_m", "_idx", "done")
+
+    def __init__(self, kind: str, lookahead_m: float, stanley_k: float, heading_k: float, goal_tol_m: float) -> None:
+        if kind not in TRACKERS:
+            raise ValueError(f"unknown tracker {kind!r}, expected one of {TRACKERS}")
+        self.kind = kind
+        self.lookahead_m = float(lookahead_m)
+        self.stanley_k = float(stanley_k)
+        self.heading_k = float(heading_k)
+        self.goal_tol_m = float(goal_tol_m)
+        self._idx = 0
+        self.done = False
+
+    def reset(self) -> None:
+        self._idx = 0
+        self.done = False
+
+    def _advance(self, path: TrackPath, x: float, y: float) -> int:
+        # search forward from the cursor only, so crossings in the path do not jump back
+        xs, ys = path.xs, path.ys
+        i = self._idx
+        best = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+        j = i + 1
+        while j < path.n:
+            d = (xs[j] - x) ** 2 + (ys[j] - y) ** 2
+            if d > best:
+                break
+            best = d
+            i = j
+            j += 1
+        self._idx = i
+        return i
+
+    def update(self, path: TrackPath, x: float, y: float, yaw: float) -> Tuple[float, float]:
+        i = self._advance(path, x, y)
+        gx, gy = path.xs[-1], path.ys[-1]
+        if i >= path.n - 1 and math.hypot(gx - x, gy - y) < self.goal_tol_m:
+            self.done = True
+        if self.done:
+            return 0.0, 0.0
+
+        v = path.v
+        if self.kind == "pure_pursuit":
+            j = i
+            while j < path.n - 1 and math.hypot(path.xs[j] - x, path.ys[j] - y) < self.lookahead_m:
+                j += 1
+            dx, dy = path.xs[j] - x, path.ys[j] - y
+            ld = max(1e-3, math.hypot(dx, dy))
+            alpha = wrap_angle(math.atan2(dy, dx) - yaw)
+            return v, 2.0 * v * math.sin(alpha) / ld
+
+        # stanley: signed cross-track error against the current segment heading
+        seg_yaw = path.yaws[i]
+        ex = x - path.xs[i]
+        ey = y - path.ys[i]
+        e_ct = -math.sin(seg_yaw) * ex + math.cos(seg_yaw) * ey
+        psi = wrap_angle(seg_yaw - yaw)
+        delta = psi + math.atan2(-self.stanley_k * e_ct, abs(v) + 0.1)
+        return v, self.heading_k * delta
+
+
+class Controller:
+    """Control stage between command ingest and ChassisDriver.set_cmd."""
+
+    __slots__ = ("velocity_mode", "pi", "tracker", "_path_id")
+
+    def __init__(self, velocity_mode: str, pi: VelocityPI, tracker: PathTracker) -> None:
+        if velocity_mode not in VELOCITY_MODES:
+            raise ValueError(f"unknown velocity mode {velocity_mode!r}, expected one of {VELOCITY_MODES}")
+        self.velocity_mode = velocity_mode
+        self.pi = pi
+        self.tracker = tracker
+        self._path_id: Optional[int] = None
+
+    def reset(self) -> None:
+        self.pi.reset()
+        self.tracker.reset()
+        self._path_id = None
+
+    def track(self, path: TrackPath, x: float, y: float, yaw: float) -> Tuple[float, float]:
+        # a re-sent path with the same id keeps its progress cursor
+        if path.path_id != self._path_id:
+            self._path_id = path.path_id
+            self.tracker.reset()
+        return self.tracker.update(path, x, y, yaw)
+
+    def update(self, vx_ref: float, wz_ref: float, vx_meas: float, wz_meas: float, dt: float) -> Tuple[float, float]:
+        if self.velocity_mode == "pi":
+            return self.pi.update(vx_ref, wz_ref, vx_meas, wz_meas, dt)
+        return vx_ref, wz_ref
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import argparse
+import math
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+
+from car_agent.analysis.metrics import path_distance, path_poses
+from car_agent.analysis.runs import load_run
+from car_agent.control.controller import Controller, PathTracker, TrackPath, VelocityPI
+from car_agent.estimation.estimator import PoseEstimator
+from car_agent.safety.limits import clamp
+
+
+def make_path(name: str, n: int = 200) -> Tuple[np.ndarray, np.ndarray]:
+    s = np.linspace(0.0, 1.0, n)
+    if name == "line":
+        return 3.0 * s, np.zeros_like(s)
+    if name == "square":
+        side = 2.0
+        u = 4.0 * s
+        xs = np.select([u < 1, u < 2, u < 3], [u * side, side + 0 * u, (3 - u) * side], 0 * u)
+        ys = np.select([u < 1, u < 2, u < 3], [0 * u, (u - 1) * side, side + 0 * u], (4 - u) * side)
+        return xs, ys
+    if name == "figure8":
+        th = 2.0 * math.pi * s
+        return 1.5 * np.sin(th), 0.75 * np.sin(2.0 * th)
+    raise ValueError(f"unknown path {name!r}, expected line | square | figure8")
+
+
+def load_path(spec: str) -> Tuple[np.ndarray, np.ndarray]:
+    """A .npz with path_x, path_y, or a make_path name."""
+    if spec.endswith(".npz"):
+        d = np.load(spec)
+        return d["path_x"], d["path_y"]
+    return make_path(spec)
+
+
+def score(px: np.ndarray, py: np.ndarray, path_x: np.ndarray, path_y: np.ndarray) -> Dict[str, float]:
+    e = path_distance(px, py, path_x, path_y)
+    goal = math.hypot(float(px[-1]) - float(path_x[-1]), float(py[-1]) - float(path_y[-1])) if len(px) else math.nan
+    return {
+        "n": float(e.size),
+        "ct_rms_m": float(np.sqrt(np.mean(e * e))) if e.size else 0.0,
+        "ct_p95_m": float(np.percentile(e, 95)) if e.size else 0.0,
+        "ct_max_m": float(e.max()) if e.size else 0.0,
+        "goal_err_m": goal,
+    }
+
+
+def simulate(
+    path_x: np.ndarray,
+    path_y: np.ndarray,
+    controller: Controller,
+    v: float = 0.4,
+    hz: float = 50.0,
+    lag_s: float = 0.15,
+    delay_ticks: int = 2,
+    uwb_hz: float = 10.0,
+    uwb_noise_m: float = 0.03,
+    v_max: float = 0.8,
+    w_max: float = 1.5,
+    t_max: float = 60.0,
+    seed: int = 0,
+) -> Dict[str, np.ndarray]:
+    """Unicycle plant with first-order velocity lag, actuation delay and noisy low-rate UWB."""
+    rng = np.random.default_rng(seed)
+    dt = 1.0 / hz
+    steps = int(t_max * hz)
+    path = TrackPath(1, path_x.tolist(), path_y.tolist(), v)
+
+    x, y = float(path_x[0]), float(path_y[0])
+    yaw = math.atan2(float(path_y[1] - path_y[0]), float(path_x[1] - path_x[0]))
+    vx_act, wz_act = 0.0, 0.0
+    pipe = [(0.0, 0.0)] * max(0, delay_ticks)
+
+    est = PoseEstimator()
+    uwb_every = max(1, int(round(hz / uwb_hz)))
+    alpha = dt / max(dt, lag_s)
+
+    out = np.zeros((steps, 5))
+    k = 0
+    for k in range(steps):
+        t = k * dt
+        est.predict(t, vx_act, wz_act)
+        if k % uwb_every == 0:
+            nx, ny = rng.normal(0.0, uwb_noise_m, 2)
+            est.correct_uwb(x + nx, y + ny, vx_act * math.cos(yaw), vx_act * math.sin(yaw), t + 1e-9, vx_act)
+
+        vx_ref, wz_ref = controller.track(path, est.x, est.y, est.yaw)
+        vx_ref = clamp(vx_ref, -v_max, v_max)
+        wz_ref = clamp(wz_ref, -w_max, w_max)
+        vx_c, wz_c = controller.update(vx_ref, wz_ref, vx_act, wz_act, dt)
+        vx_c = clamp(vx_c, -v_max, v_max)
+        wz_c = clamp(wz_c, -w_max, w_max)
+
+        pipe.append((vx_c, wz_c))
+        vx_in, wz_in = pipe.pop(0)
+        vx_act += alpha * (vx_in - vx_act)
+        wz_act += alpha * (wz_in - wz_act)
+
+        yaw_mid = yaw + 0.5 * wz_act * dt
+        x += vx_act * math.cos(yaw_mid) * dt
+        y += vx_act * math.sin(yaw_mid) * dt
+        yaw += wz_act * dt
+
+        out[k] = (t, x, y, vx_ref, vx_act)
+        if controller.tracker.done:
+            break
+
+    out = out[: k + 1]
+    return {"t": out[:, 0], "x": out[:, 1], "y": out[:, 2], "vx_ref": out[:, 3], "vx": out[:, 4]}
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="offline tracking-error evaluation for the on-car controller")
+    ap.add_argument("--run", type=str, default="", help="recorder run directory (record_dir) to score against --path; skips simulation")
+    ap.add_argument("--path", type=str, default="figure8", help="line | square | figure8 or a .npz with path_x, path_y")
+    ap.add_argument("--tracker", type=str, default="pure_pursuit")
+    ap.add_argument("--velocity-loop", type=str, default="pi")
+    ap.add_argument("--v", type=float, default=0.4)
+    ap.add_argument("--hz", type=float, default=50.0)
+    ap.add_argument("--lag", type=float, default=0.15)
+    ap.add_argument("--delay", type=int, default=2)
+    ap.add_argument("--lookahead", type=float, default=0.4)
+    ap.add_argument("--seed", type=int, default=0)
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    path_x, path_y = load_path(args.path)
+    if args.run:
+        run = load_run(Path(args.run))
+        px, py = path_poses(run["pose"], run["act"])
+        res = score(px, py, path_x, path_y)
+        print(f"[eval] run={args.run} path={args.path} " + " ".join(f"{k}={v:.4f}" for k, v in res.items()))
+        return
+
+    controller = Controller(
+        velocity_mode=args.velocity_loop,
+        pi=VelocityPI(kp_v=0.5, ki_v=1.0, kp_w=0.3, ki_w=0.5, i_max=0.3),
+        tracker=PathTracker(args.tracker, lookahead_m=args.lookahead, stanley_k=1.5, heading_k=1.0, goal_tol_m=0.1),
+    )
+    sim = simulate(path_x, path_y, controller, v=args.v, hz=args.hz, lag_s=args.lag, delay_ticks=args.delay, seed=args.seed)
+    res = score(sim["x"], sim["y"], path_x, path_y)
+    res["duration_s"] = float(sim["t"][-1])
+    res["v_rms_err"] = float(np.sqrt(np.mean((sim["vx_ref"] - sim["vx"]) ** 2)))
+    print(
+        f"[eval] path={args.path} tracker={args.tracker} velocity_loop={args.velocity_loop} "
+        + " ".join(f"{k}={v:.4f}" for k, v in res.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_right
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class Trajectory:
+    """
+    Time-parameterized (t, vx, wz) setpoints, t relative to receive time.
+    The last setpoint is held for hold_s past the last t; a single setpoint
+    needs hold_s > 0, otherwise it would expire on arrival.
+    """
+
+    __slots__ = ("ts", "vx", "wz", "horizon_s")
+
+    def __init__(
+        self, ts: Sequence[float], vx: Sequence[float], wz: Sequence[float], max_horizon_s: float, hold_s: float = 0.0,
+    ) -> None:
+        n = len(ts)
+        if n == 0 or len(vx) != n or len(wz) != n:
+            raise ValueError(f"trajectory arrays must be non-empty and equal length: ts={n} vx={len(vx)} wz={len(wz)}")
+        hold_s = float(hold_s)
+        if not math.isfinite(hold_s) or hold_s < 0.0:
+            raise ValueError(f"trajectory hold_s must be finite and >= 0, got {hold_s}")
+        if n < 2 and hold_s <= 0.0:
+            raise ValueError("trajectory needs >= 2 points, or hold_s > 0 for a single setpoint")
+
+        ts_f: List[float] = [float(x) for x in ts]
+        vx_f: List[float] = [float(x) for x in vx]
+        wz_f: List[float] = [float(x) for x in wz]
+        for name, arr in (("ts", ts_f), ("vx", vx_f), ("wz", wz_f)):
+            bad = next((i for i, x in enumerate(arr) if not math.isfinite(x)), None)
+            if bad is not None:
+                raise ValueError(f"trajectory {name} must be finite, got {arr[bad]} at index {bad}")
+        if ts_f[0] < 0.0:
+            raise ValueError(f"trajectory must start at t>=0, got {ts_f[0]}")
+        for i in range(1, n):
+            if ts_f[i] <= ts_f[i - 1]:
+                raise ValueError(f"trajectory times must be strictly increasing at index {i}")
+
+        self.ts = ts_f
+        self.vx = vx_f
+        self.wz = wz_f
+        # never execute past the configured cap, so a lost link cannot run the car blind for long
+        self.horizon_s = min(ts_f[-1] + hold_s, float(max_horizon_s))
+
+    @classmethod
+    def from_msg(cls, msg: Dict[str, Any], max_horizon_s: float) -> "Trajectory":
+        return cls(msg.get("ts", []), msg.get("vx", []), msg.get("wz", []), max_horizon_s, msg.get("hold_s", 0.0))
+
+    def expired(self, elapsed: float) -> bool:
+        return elapsed > self.horizon_s
+
+    def sample(self, elapsed: float) -> Tuple[float, float]:
+        ts = self.ts
+        if elapsed <= ts[0]:
+            return self.vx[0], self.wz[0]
+        if elapsed >= ts[-1]:
+            return self.vx[-1], self.wz[-1]
+
+        i = bisect_right(ts, elapsed)
+        t0, t1 = ts[i - 1], ts[i]
+        a = (elapsed - t0) / (t1 - t0)
+        vx = self.vx[i - 1] + a * (self.vx[i] - self.vx[i - 1])
+        wz = self.wz[i - 1] + a * (self.wz[i] - self.wz[i - 1])
+        return vx, wz
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def _host_port(v: str) -> Optional[str]:
+    host, sep, port = v.rpartition(":")
+    if not sep or not host.strip() or not port.isdigit() or not (0 < int(port) < 65536):
+        return "must be 'host:port'"
+    return None
+
+
+def _positive(v: float) -> Optional[str]:
+    return None if v > 0 else "must be > 0"
+
+
+def _non_negative(v: float) -> Optional[str]:
+    return None if v >= 0 else "must be >= 0"
+
+
+def _host_port_or_empty(v: str) -> Optional[str]:
+    return None if v == "" else _host_port(v)
+
+
+def _cpu_list(v: str) -> Optional[str]:
+    spec = v.replace(" ", "")
+    if not spec:
+        return None
+    for part in spec.split(","):
+        lo, sep, hi = part.partition("-")
+        if not lo.isdigit() or (sep and (not hi.isdigit() or int(hi) < int(lo))):
+            return "must be a CPU list like '2' or '0-1,3'"
+    return None
+
+
+def _serial_port(v: str) -> Optional[str]:
+    return "must not be loopback: (nothing feeds it), use replay:<file>" if v.startswith("loopback:") else None
+
+
+def _one_of(*choices: str) -> Callable[[str], Optional[str]]:
+    def check(v: str) -> Optional[str]:
+        return None if v in choices else f"must be one of {choices}"
+    return check
+
+
+# (attribute, yaml path, type, default, validator)
+_SPEC: Tuple[Tuple[str, Tuple[str, ...], type, Any, Optional[Callable[[Any], Optional[str]]]], ...] = (
+    ("car_id", ("car_id",), str, "car_unknown", None),
+    ("cmd_listen", ("net", "cmd_listen"), str, "0.0.0.0:31001", _host_port),
+    ("telemetry_peer", ("net", "telemetry_peer"), str, "192.168.10.1:32001", _host_port),
+    ("fleet_listen", ("net", "fleet_listen"), str, "", _host_port_or_empty),
+    ("fleet_peer", ("net", "fleet_peer"), str, "", _host_port_or_empty),
+    ("control_hz", ("loop", "control_hz"), float, 50.0, _positive),
+    ("telemetry_hz", ("loop", "telemetry_hz"), float, 20.0, _positive),
+    ("telemetry_adaptive", ("telemetry", "adaptive"), bool, False, None),
+    ("telemetry_min_hz", ("telemetry", "min_hz"), float, 2.0, _positive),
+    ("telemetry_max_hz", ("telemetry", "max_hz"), float, 30.0, _positive),
+    ("telemetry_keyframe_s", ("telemetry", "keyframe_s"), float, 1.0, _positive),
+    ("telemetry_loss_hi", ("telemetry", "loss_hi"), float, 0.05, _positive),
+    ("telemetry_rtt_hi_s", ("telemetry", "rtt_hi_s"), float, 0.15, _positive),
+    ("chassis_serial", ("chassis", "serial_port"), str, "", _serial_port),
+    ("chassis_baudrate", ("chassis", "baudrate"), int, 115200, _positive),
+    ("chassis_hz", ("chassis", "control_hz"), float, 50.0, _positive),
+    ("chassis_backend", ("chassis", "backend"), str, "pyserial", _one_of("pyserial", "raw")),
+    ("cmd_timeout_s", ("safety", "cmd_timeout_s"), float, 0.2, _positive),
+    ("traj_max_horizon_s", ("safety", "traj_max_horizon_s"), float, 2.0, _positive),
+    ("path_timeout_s", ("safety", "path_timeout_s"), float, 1.0, _positive),
+    ("v_max", ("safety", "v_max"), float, 0.3, _non_negative),
+    ("w_max", ("safety", "w_max"), float, 0.6, _non_negative),
+    ("collision_enabled", ("safety", "collision", "enabled"), bool, False, None),
+    ("collision_car_radius_m", ("safety", "collision", "car_radius_m"), float, 0.2, _positive),
+    ("collision_ttc_stop_s", ("safety", "collision", "ttc_stop_s"), float, 0.6, _non_negative),
+    ("collision_ttc_slow_s", ("safety", "collision", "ttc_slow_s"), float, 2.0, _positive),
+    ("collision_radius_m", ("safety", "collision", "neighbor_radius_m"), float, 3.0, _positive),
+    ("collision_peer_max_age_s", ("safety", "collision", "peer_max_age_s"), float, 0.5, _positive),
+    ("health_recover_s", ("safety", "health", "recover_s"), float, 1.0, _non_negative),
+    ("health_chassis_degraded_age_s", ("safety", "health", "chassis_degraded_age_s"), float, 0.2, _positive),
+    ("health_chassis_failed_age_s", ("safety", "health", "chassis_failed_age_s"), float, 0.5, _positive),
+    ("health_chassis_min_hz", ("safety", "health", "chassis_min_hz"), float, 10.0, _non_negative),
+    ("health_uwb_degraded_age_s", ("safety", "health", "uwb_degraded_age_s"), float, 0.3, _positive),
+    ("health_uwb_failed_age_s", ("safety", "health", "uwb_failed_age_s"), float, 1.5, _positive),
+    ("health_uwb_min_hz", ("safety", "health", "uwb_min_hz"), float, 5.0, _non_negative),
+    ("health_link_loss_hi", ("safety", "health", "link_loss_hi"), float, 0.05, _non_negative),
+    ("health_limited_v_max", ("safety", "health", "limited_v_max"), float, 0.3, _non_negative),
+    ("health_limited_w_max", ("safety", "health", "limited_w_max"), float, 0.8, _non_negative),
+    ("control_velocity_loop", ("control", "velocity_loop"), str, "open_loop", _one_of("open_loop", "pi")),
+    ("control_kp_v", ("control", "kp_v"), float, 0.5, _non_negative),
+    ("control_ki_v", ("control", "ki_v"), float, 1.0, _non_negative),
+    ("control_kp_w", ("control", "kp_w"), float, 0.3, _non_negative),
+    ("control_ki_w", ("control", "ki_w"), float, 0.5, _non_negative),
+    ("control_i_max", ("control", "i_max"), float, 0.3, _non_negative),
+    ("control_tracker", ("control", "tracker"), str, "pure_pursuit", _one_of("pure_pursuit", "stanley")),
+    ("control_lookahead_m", ("control", "lookahead_m"), float, 0.4, _positive),
+    ("control_stanley_k", ("control", "stanley_k"), float, 1.5, _non_negative),
+    ("control_heading_k", ("control", "heading_k"), float, 1.0, _positive),
+    ("control_goal_tol_m", ("control", "goal_tol_m"), float, 0.1, _positive),
+    ("uwb_enabled", ("sensors", "uwb", "enabled"), bool, False, None),
+    ("uwb_port", ("sensors", "uwb", "serial_port"), str, "/dev/ttyCH343USB1", _serial_port),
+    ("uwb_baudrate", ("sensors", "uwb", "baudrate"), int, 921600, _positive),
+    ("uwb_backend", ("sensors", "uwb", "backend"), str, "pyserial", _one_of("pyserial", "raw")),
+    ("record_dir", ("logging", "record_dir"), str, "", None),
+    ("boot_start_method", ("boot", "start_method"), str, "fork", _one_of("fork", "forkserver", "spawn")),
+    ("placement_main_cpus", ("placement", "main", "cpus"), str, "", _cpu_list),
+    ("placement_main_policy", ("placement", "main", "policy"), str, "other", _one_of("other", "fifo", "rr")),
+    ("placement_main_priority", ("placement", "main", "priority"), int, 0, _non_negative),
+    ("placement_main_mlock", ("placement", "main", "mlock"), bool, False, None),
+    ("placement_main_gc", ("placement", "main", "gc"), str, "default", _one_of("default", "freeze", "freeze_no_gen2")),
+    ("placement_chassis_cpus", ("placement", "chassis", "cpus"), str, "", _cpu_list),
+    ("placement_chassis_policy", ("placement", "chassis", "policy"), str, "other", _one_of("other", "fifo", "rr")),
+    ("placement_chassis_priority", ("placement", "chassis", "priority"), int, 0, _non_negative),
+    ("placement_chassis_mlock", ("placement", "chassis", "mlock"), bool, False, None),
+    ("placement_chassis_gc", ("placement", "chassis", "gc"), str, "default", _one_of("default", "freeze", "freeze_no_gen2")),
+    ("placement_uwb_cpus", ("placement", "uwb", "cpus"), str, "", _cpu_list),
+    ("placement_uwb_policy", ("placement", "uwb", "policy"), str, "other", _one_of("other", "fifo", "rr")),
+    ("placement_uwb_priority", ("placement", "uwb", "priority"), int, 0, _non_negative),
+    ("placement_uwb_mlock", ("placement", "uwb", "mlock"), bool, False, None),
+    ("placement_uwb_gc", ("placement", "uwb", "gc"), str, "default", _one_of("default", "freeze", "freeze_no_gen2")),
+)
+
+# changing these at runtime needs a restart (ports, sockets, child processes)
+RESTART_FIELDS = frozenset({
+    "car_id", "cmd_listen", "telemetry_peer", "fleet_listen", "fleet_peer",
+    "chassis_serial", "chassis_baudrate", "chassis_hz", "chassis_backend",
+    "uwb_enabled", "uwb_port", "uwb_baudrate", "uwb_backend",
+    "record_dir", "boot_start_method",
+}) | frozenset(name for name, *_ in _SPEC if name.startswith("placement_"))
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    car_id: str
+    cmd_listen: str
+    telemetry_peer: str
+    fleet_listen: str
+    fleet_peer: str
+    control_hz: float
+    telemetry_hz: float
+    telemetry_adaptive: bool
+    telemetry_min_hz: float
+    telemetry_max_hz: float
+    telemetry_keyframe_s: float
+    telemetry_loss_hi: float
+    telemetry_rtt_hi_s: float
+    chassis_serial: str
+    chassis_baudrate: int
+    chassis_hz: float
+    chassis_backend: str
+    cmd_timeout_s: float
+    traj_max_horizon_s: float
+    path_timeout_s: float
+    v_max: float
+    w_max: float
+    collision_enabled: bool
+    collision_car_radius_m: float
+    collision_ttc_stop_s: float
+    collision_ttc_slow_s: float
+    collision_radius_m: float
+    collision_peer_max_age_s: float
+    health_recover_s: float
+    health_chassis_degraded_age_s: float
+    health_chassis_failed_age_s: float
+    health_chassis_min_hz: float
+    health_uwb_degraded_age_s: float
+    health_uwb_failed_age_s: float
+    health_uwb_min_hz: float
+    health_link_loss_hi: float
+    health_limited_v_max: float
+    health_limited_w_max: float
+    control_velocity_loop: str
+    control_kp_v: float
+    control_ki_v: float
+    control_kp_w: float
+    control_ki_w: float
+    control_i_max: float
+    control_tracker: str
+    control_lookahead_m: float
+    control_stanley_k: float
+    control_heading_k: float
+    control_goal_tol_m: float
+    uwb_enabled: bool
+    uwb_port: str
+    uwb_baudrate: int
+    uwb_backend: str
+    record_dir: str
+    boot_start_method: str
+    placement_main_cpus: str
+    placement_main_policy: str
+    placement_main_priority: int
+    placement_main_mlock: bool
+    placement_main_gc: str
+    placement_chassis_cpus: str
+    placement_chassis_policy: str
+    placement_chassis_priority: int
+    placement_chassis_mlock: bool
+    placement_chassis_gc: str
+    placement_uwb_cpus: str
+    placement_uwb_policy: str
+    placement_uwb_priority: int
+    placement_uwb_mlock: bool
+    placement_uwb_gc: str
+    source: str = ""
+    raw: Dict[str, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    def diff(self, other: "AppConfig") -> List[str]:
+        return [name for name, *_ in _SPEC if getattr(self, name) != getattr(other, name)]
+
+
+def _cast(value: Any, typ: type, where: str) -> Any:
+    # yaml already produced native types; only widen int -> float, never parse strings
+    if typ is bool:
+        if isinstance(value, bool):
+            return value
+    elif typ is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif typ is float:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    elif typ is str:
+        if isinstance(value, str):
+            return value
+    raise ConfigError(f"{where}: expected {typ.__name__}, got {type(value).__name__} {value!r}")
+
+
+_SECTIONS = frozenset(path[:i] for _, path, *_ in _SPEC for i in range(1, len(path)))
+
+
+def _fill_sections(d: Dict[str, Any], prefix: Tuple[str, ...] = ()) -> None:
+    """A section with every key commented out loads as None; make it {} so it merges and parses."""
+    for k, v in d.items():
+        path = prefix + (str(k),)
+        if v is None and path in _SECTIONS:
+            d[k] = {}
+        elif isinstance(v, dict):
+            _fill_sections(v, path)
+
+
+def _deep_merge(base: Dict[str, Any], over: Dict[str, Any]) -> Dict[str, Any]:
+    out = dict(base)
+    for k, v in over.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _deep_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def _read_layered(p: Path, seen: Set[Path]) -> Dict[str, Any]:
+    if p in seen:
+        raise ConfigError(f"{p}: circular 'extends'")
+    seen.add(p)
+    try:
+        with p.open("r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except OSError as e:
+        raise ConfigError(f"{p}: cannot read: {e}") from e
+    except yaml.YAMLError as e:
+        raise ConfigError(f"{p}: invalid yaml: {e}") from e
+    if not isinstance(data, dict):
+        raise ConfigError(f"{p}: top level must be a mapping")
+    _fill_sections(data)
+
+    parent = data.pop("extends", None)
+    if parent is None:
+        return data
+    if not isinstance(parent, str):
+        raise ConfigError(f"{p}: 'extends' must be a file path")
+    base = _read_layered((p.parent / parent).resolve(), seen)
+    return _deep_merge(base, data)
+
+
+# cross-field rules checked after every field is cast: (lower attr, upper attr, allow equal)
+_ORDERED: Tuple[Tuple[str, str, bool], ...] = (
+    ("telemetry_min_hz", "telemetry_max_hz", True),
+    ("collision_ttc_stop_s", "collision_ttc_slow_s", False),
+    ("health_chassis_degraded_age_s", "health_chassis_failed_age_s", True),
+    ("health_uwb_degraded_age_s", "health_uwb_failed_age_s", True),
+)
+
+
+def _check_ordered(values: Dict[str, Any], name: str) -> None:
+    paths = {attr: ".".join(path) for attr, path, *_ in _SPEC}
+    for lo, hi, equal_ok in _ORDERED:
+        a, b = values[lo], values[hi]
+        if a > b or (a == b and not equal_ok):
+            op = "<=" if equal_ok else "<"
+            raise ConfigError(f"{name}: {paths[lo]} must be {op} {paths[hi]}, got {a!r} and {b!r}")
+
+
+def _leaf_paths(d: Dict[str, Any], prefix: Tuple[str, ...] = ()) -> List[Tuple[str, ...]]:
+    out: List[Tuple[str, ...]] = []
+    for k, v in d.items():
+        if isinstance(v, dict):
+            out.extend(_leaf_paths(v, prefix + (str(k),)))
+        else:
+            out.append(prefix + (str(k),))
+    return out
+
+
+def parse_config(data: Dict[str, Any], source: str = "") -> AppConfig:
+    name = source or "<config>"
+    _fill_sections(data)
+    known = {path for _, path, *_ in _SPEC}
+    unknown = [".".join(p) for p in _leaf_paths(data) if p not in known]
+    if unknown:
+        raise ConfigError(f"{name}: unknown keys {unknown}")
+
+    values: Dict[str, Any] = {}
+    for attr, path, typ, default, check in _SPEC:
+        node: Any = data
+        for key in path:
+            node = node.get(key) if isinstance(node, dict) else None
+            if node is None:
+                break
+        where = f"{name}: {'.'.join(path)}"
+        value = default if node is None else _cast(node, typ, where)
+        if check is not None:
+            msg = check(value)
+            if msg is not None:
+                raise ConfigError(f"{where} {msg}, got {value!r}")
+        values[attr] = value
+    _check_ordered(values, name)
+
+    return AppConfig(source=source, raw=data, **values)
+
+
+def load_config(path: str) -> AppConfig:
+    p = Path(path).expanduser().resolve()
+    return parse_config(_read_layered(p, set()), source=str(p))
+
+
+class ConfigStore:
+    """Holds the live AppConfig; reload() parses a fresh copy and swaps a single reference."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.current = load_config(path)
+
+    def reload(self) -> Tuple[bool, List[str]]:
+        try:
+            new = load_config(self.path)
+        except ConfigError as e:
+            print(f"[config] reload rejected, keeping previous config: {e}")
+            return False, []
+
+        changed = self.current.diff(new)
+        needs_restart = [k for k in changed if k in RESTART_FIELDS]
+        if needs_restart:
+            print(f"[config] reload: {needs_restart} need a restart, keeping running values")
+            new = replace(new, **{k: getattr(self.current, k) for k in needs_restart})
+        self.current = new
+        return True, changed
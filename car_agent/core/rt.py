@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gc
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+_GEN2_THRESHOLD = 100  # gen-1 collections per full collection under freeze_no_gen2 (CPython default 10)
+
+
+def parse_cpus(spec: str) -> List[int]:
+    """'2', '2,3', '0-1,3' -> sorted CPU ids; '' -> []."""
+    cpus = set()
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        if sep:
+            cpus.update(range(int(lo), int(hi) + 1))
+        else:
+            cpus.add(int(lo))
+    return sorted(cpus)
+
+
+@dataclass(frozen=True)
+class Placement:
+    """Where and how one agent process runs. Picklable, so it travels to spawned children."""
+
+    cpus: str = ""
+    policy: str = "other"
+    priority: int = 0
+    mlock: bool = False
+    gc: str = "default"
+
+
+def _set_affinity(cpus: str, rep: Dict[str, Any]) -> None:
+    want = parse_cpus(cpus)
+    if not want:
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        rep["errors"].append("affinity: unsupported on this platform")
+        return
+    usable = [c for c in want if c < (os.cpu_count() or 1)]
+    if not usable:
+        rep["errors"].append(f"affinity: none of {want} exist")
+        return
+    try:
+        os.sched_setaffinity(0, usable)
+        rep["cpus"] = sorted(os.sched_getaffinity(0))
+    except OSError as e:
+        rep["errors"].append(f"affinity: {e}")
+
+
+def _set_policy(policy: str, priority: int, rep: Dict[str, Any]) -> None:
+    if policy == "other":
+        return
+    pol = {"fifo": getattr(os, "SCHED_FIFO", None), "rr": getattr(os, "SCHED_RR", None)}[policy]
+    if pol is None or not hasattr(os, "sched_setscheduler"):
+        rep["errors"].append(f"policy {policy}: unsupported on this platform")
+        return
+    prio = max(os.sched_get_priority_min(pol), min(os.sched_get_priority_max(pol), priority))
+    try:
+        os.sched_setscheduler(0, pol, os.sched_param(prio))
+        rep["policy"] = f"{policy}:{prio}"
+        return
+    except PermissionError as e:
+        rep["errors"].append(f"policy {policy}:{prio}: {e.strerror} (needs CAP_SYS_NICE or LimitRTPRIO)")
+    except OSError as e:
+        rep["errors"].append(f"policy {policy}:{prio}: {e}")
+    # fallback: stay SCHED_OTHER but ask for the best nice value we are allowed
+    for nice in (-10, -5):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+            rep["policy"] = f"other:nice{nice}"
+            return
+        except (OSError, AttributeError):
+            continue
+
+
+def _mlockall(rep: Dict[str, Any]) -> None:
+    name = ctypes.util.find_library("c")
+    if name is None:
+        rep["errors"].append("mlockall: libc not found")
+        return
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+        if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+            err = ctypes.get_errno()
+            rep["errors"].append(f"mlockall: {os.strerror(err)} (needs CAP_IPC_LOCK or LimitMEMLOCK)")
+            return
+        rep["mlock"] = True
+    except (OSError, AttributeError) as e:
+        rep["errors"].append(f"mlockall: {e}")
+
+
+def apply_gc(mode: str, rep: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Call once boot allocations are done: everything alive now moves out of
+    the collector's reach. freeze_no_gen2 also makes full collections ten
+    times rarer; they still run, so cycles made at runtime are reclaimed in
+    a service that stays up for days, and being unfrozen objects only they
+    stay short.
+    """
+    if mode == "default":
+        return
+    gc.collect()
+    gc.freeze()
+    if mode == "freeze_no_gen2":
+        t0, t1, _ = gc.get_threshold()
+        gc.set_threshold(t0, t1, _GEN2_THRESHOLD)
+    if rep is not None:
+        rep["gc"] = f"{mode} frozen={gc.get_freeze_count()}"
+
+
+def apply_placement(p: Placement, gc_now: bool = True) -> Dict[str, Any]:
+    """
+    Applies p to the calling process. Never raises: whatever the platform or
+    permissions refuse ends up in the report's errors, the rest still applies.
+    """
+    rep: Dict[str, Any] = {"pid": os.getpid(), "cpus": None, "policy": "other", "mlock": False, "gc": "default", "errors": []}
+    _set_affinity(p.cpus, rep)
+    _set_policy(p.policy, p.priority, rep)
+    if p.mlock:
+        _mlockall(rep)
+    if gc_now:
+        apply_gc(p.gc, rep)
+    return rep
+
+
+def format_jitter(name: str, st: Dict[str, float]) -> str:
+    return (
+        f"[rt] {name} jitter n={st['n']} p50={st['p50_ms']:.2f}ms p99={st['p99_ms']:.2f}ms "
+        f"max={st['max_ms']:.2f}ms dev_p99={st['jitter_p99_ms']:.2f}ms"
+    )
+
+
+def format_report(name: str, rep: Dict[str, Any]) -> str:
+    s = f"[rt] {name} pid={rep['pid']} cpus={rep['cpus']} policy={rep['policy']} mlock={rep['mlock']} gc={rep['gc']}"
+    if rep["errors"]:
+        s += " fallback: " + "; ".join(rep["errors"])
+    return s
+
+
+class JitterMeter:
+    """
+    Period statistics of a periodic event over a ring of recent intervals.
+    period_s=0 measures deviation from the median interval instead of a
+    nominal period (serial frames whose rate the firmware decides).
+    """
+
+    def __init__(self, period_s: float, n: int = 1024) -> None:
+        self.period_s = float(period_s)
+        self._buf = np.zeros(n)
+        self._n = 0
+        self._last = 0.0
+
+    def tick(self, t: float) -> None:
+        if t <= self._last:
+            return  # frames from one read share a stamp
+        if self._last > 0.0:
+            self._buf[self._n % len(self._buf)] = t - self._last
+            self._n += 1
+        self._last = t
+
+    def stats(self) -> Dict[str, float]:
+        """Interval p50/p99/max and the p99 deviation from the nominal period, in ms."""
+        n = min(self._n, len(self._buf))
+        if n == 0:
+            return {"n": 0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0, "jitter_p99_ms": 0.0}
+        d = self._buf[:n]
+        p50, p99 = np.percentile(d, (50, 99))
+        return {
+            "n": self._n,
+            "p50_ms": 1e3 * float(p50),
+            "p99_ms": 1e3 * float(p99),
+            "max_ms": 1e3 * float(d.max()),
+            "jitter_p99_ms": 1e3 * float(np.percentile(np.abs(d - (self.period_s or p50)), 99)),
+        }
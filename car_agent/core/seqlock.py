@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+
+# Single-writer sequence lock over a float64 shm array. The writer makes
+# the counter odd before it touches any field and even again once the whole
+# frame is in. A reader keeps its copy only if the counter was even before
+# the copy and unchanged after it, so it never sees a new stamp next to an
+# old state or half of a count.
+
+SNAPSHOT_TRIES = 64
+_SPIN_TRIES = 4  # then yield, so a writer preempted mid-frame on a shared core can finish
+
+
+def write_begin(arr: np.ndarray, seq_idx: int) -> None:
+    arr[seq_idx] += 1.0  # odd: frame in progress
+
+
+def write_end(arr: np.ndarray, seq_idx: int) -> None:
+    arr[seq_idx] += 1.0  # even: frame complete
+
+
+def snapshot(arr: np.ndarray, seq_idx: int, tries: int = SNAPSHOT_TRIES) -> np.ndarray:
+    """
+    Consistent copy of arr. A writer holds the lock for a few microseconds,
+    so a couple of spins usually do; after that each retry yields the CPU.
+    After tries the copy is returned anyway (a writer that died mid-frame is
+    reported through its process state).
+    """
+    for i in range(tries):
+        seq = float(arr[seq_idx])
+        s = arr.copy()
+        if int(seq) % 2 == 0 and arr[seq_idx] == seq:
+            return s
+        if i >= _SPIN_TRIES:
+            os.sched_yield()
+    return arr.copy()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Iterable, List, Optional, Tuple
+
+
+def process_age_s() -> Optional[float]:
+    """Seconds since this process was created (Linux /proc), covering interpreter start and imports."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read().decode()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        # field 22 (starttime) counts clock ticks since boot; skip past "(comm)" which may contain spaces
+        fields = stat[stat.rindex(")") + 2:].split()
+        start_ticks = int(fields[19])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class BootTimeline:
+    """Wall-clock phases of agent boot, reported once every expected milestone is reached."""
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.pre_main_s = process_age_s()
+        self.marks: List[Tuple[str, float]] = []
+        self._seen = set()
+        self.reported = False
+
+    def mark(self, phase: str) -> None:
+        if phase in self._seen:
+            return
+        self._seen.add(phase)
+        self.marks.append((phase, time.perf_counter() - self.t0))
+
+    def has(self, phase: str) -> bool:
+        return phase in self._seen
+
+    def report(self, expected: Iterable[str] = ()) -> str:
+        lines = []
+        if self.pre_main_s is not None:
+            lines.append(f"  {'interpreter+imports':<22} {self.pre_main_s * 1e3:8.1f} ms (before main)")
+        prev = 0.0
+        for phase, t in self.marks:
+            lines.append(f"  {phase:<22} {t * 1e3:8.1f} ms  (+{(t - prev) * 1e3:.1f})")
+            prev = t
+        for phase in expected:
+            if phase not in self._seen:
+                lines.append(f"  {phase:<22} not reached")
+        self.reported = True
+        return "\n".join(lines)
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import os
+import select
+import threading
+import time
+from typing import Optional, Tuple, Union
+
+
+BACKENDS: Tuple[str, ...] = ("pyserial", "raw")
+SCHEMES: Tuple[str, ...] = ("pyserial", "raw", "loopback", "replay")
+
+
+class Transport:
+    """
+    Byte I/O used by the serial loops. read() waits at most timeout_s and
+    returns b"" when nothing arrived; eof turns True only for sources that
+    can end (replay).
+    """
+
+    timeout_s: float = 0.001
+    eof: bool = False
+
+    def read(self, n: int) -> bytes:
+        raise NotImplementedError
+
+    def write(self, data: bytes) -> int:
+        raise NotImplementedError
+
+    def reset_input(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class PySerialTransport(Transport):
+    def __init__(self, port: str, baudrate: int, timeout_s: float = 0.001) -> None:
+        import serial  # only the serial children need pyserial
+
+        self.timeout_s = timeout_s
+        self._ser = serial.Serial(
+            port, baudrate,
+            bytesize=serial.EIGHTBITS, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE,
+            timeout=timeout_s,
+        )
+
+    def read(self, n: int) -> bytes:
+        return self._ser.read(n)
+
+    def write(self, data: bytes) -> int:
+        return self._ser.write(data) or 0
+
+    def reset_input(self) -> None:
+        self._ser.reset_input_buffer()
+        self._ser.reset_output_buffer()
+
+    def close(self) -> None:
+        self._ser.close()
+
+
+class RawFdTransport(Transport):
+    """
+    Non-blocking tty fd configured raw with termios, waited on with epoll
+    (select elsewhere). One syscall pair per read and no Python-level
+    buffering, which is where pyserial spends its per-read time.
+    """
+
+    def __init__(self, port: str, baudrate: int, timeout_s: float = 0.001) -> None:
+        import termios
+
+        self.timeout_s = timeout_s
+        self._fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            speed = getattr(termios, f"B{int(baudrate)}", None)
+            if speed is None:
+                raise ValueError(f"unsupported baudrate {baudrate}")
+            iflag, oflag, cflag, lflag, _, _, cc = termios.tcgetattr(self._fd)
+            # cfmakeraw + 8N1, no flow control, reads return whatever is there
+            iflag &= ~(termios.IGNBRK | termios.BRKINT | termios.PARMRK | termios.ISTRIP
+                       | termios.INLCR | termios.IGNCR | termios.ICRNL | termios.IXON | termios.IXOFF)
+            oflag &= ~termios.OPOST
+            lflag &= ~(termios.ECHO | termios.ECHONL | termios.ICANON | termios.ISIG | termios.IEXTEN)
+            cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB | getattr(termios, "CRTSCTS", 0))
+            cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+            cc[termios.VMIN] = 0
+            cc[termios.VTIME] = 0
+            termios.tcsetattr(self._fd, termios.TCSANOW, [iflag, oflag, cflag, lflag, speed, speed, cc])
+        except Exception:
+            os.close(self._fd)
+            raise
+
+        self._ep = select.epoll() if hasattr(select, "epoll") else None
+        if self._ep is not None:
+            self._ep.register(self._fd, select.EPOLLIN)
+
+    def read(self, n: int) -> bytes:
+        try:
+            return os.read(self._fd, n)
+        except BlockingIOError:
+            pass
+        if self._ep is not None:
+            ready = self._ep.poll(self.timeout_s)
+        else:
+            ready = select.select([self._fd], [], [], self.timeout_s)[0]
+        if not ready:
+            return b""
+        try:
+            return os.read(self._fd, n)
+        except BlockingIOError:
+            return b""
+
+    def write(self, data: bytes) -> int:
+        """
+        A full tx buffer drops the frame (the next command frame supersedes
+        it). A short write is finished within timeout_s rather than left
+        for the next frame to be appended to; past that the tail is dropped.
+        """
+        view = memoryview(data)
+        done = 0
+        deadline = time.perf_counter() + self.timeout_s
+        while done < len(view):
+            try:
+                done += os.write(self._fd, view[done:])
+                continue
+            except BlockingIOError:
+                if done == 0:
+                    return 0
+            left = deadline - time.perf_counter()
+            if left <= 0.0 or not select.select([], [self._fd], [], left)[1]:
+                break  # the tail is lost; the frame checksum makes the device drop it
+        return done
+
+    def reset_input(self) -> None:
+        import termios
+
+        termios.tcflush(self._fd, termios.TCIOFLUSH)
+
+    def close(self) -> None:
+        if self._ep is not None:
+            self._ep.close()
+            self._ep = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class LoopbackTransport(Transport):
+    """
+    In-memory byte stream: the test side feed()s device bytes in, the loop
+    read()s them; whatever the loop write()s collects in .written.
+    """
+
+    def __init__(self, timeout_s: float = 0.001) -> None:
+        self.timeout_s = timeout_s
+        self._buf = bytearray()
+        self._cv = threading.Condition()
+        self.written = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        with self._cv:
+            self._buf += data
+            self._cv.notify()
+
+    def read(self, n: int) -> bytes:
+        with self._cv:
+            if not self._buf:
+                self._cv.wait(self.timeout_s)
+            out = bytes(self._buf[:n])
+            del self._buf[:n]
+            return out
+
+    def write(self, data: bytes) -> int:
+        self.written += data
+        return len(data)
+
+    def reset_input(self) -> None:
+        with self._cv:
+            self._buf.clear()
+
+
+class ReplayTransport(Transport):
+    """
+    Plays a captured byte stream (file path or bytes) back in reads of at most
+    n bytes. baudrate > 0 paces it like the wire (10 bits per byte); 0 plays
+    as fast as the loop reads. Writes are counted and dropped.
+    """
+
+    def __init__(self, source: Union[str, bytes], baudrate: int = 0, loop: bool = False, timeout_s: float = 0.001) -> None:
+        if isinstance(source, (bytes, bytearray)):
+            self._data = bytes(source)
+        else:
+            with open(source, "rb") as f:
+                self._data = f.read()
+        self.timeout_s = timeout_s
+        self.loop = loop
+        self._byte_s = 10.0 / baudrate if baudrate > 0 else 0.0
+        self._pos = 0
+        self._t0: Optional[float] = None
+        self.written = 0
+
+    def read(self, n: int) -> bytes:
+        if self._pos >= len(self._data):
+            if not self.loop or not self._data:
+                self.eof = True
+                time.sleep(self.timeout_s)  # like an idle port, so a live loop does not spin
+                return b""
+            self._pos = 0
+            self._t0 = None
+        end = min(len(self._data), self._pos + n)
+        if self._byte_s > 0.0:
+            now = time.perf_counter()
+            if self._t0 is None:
+                self._t0 = now - self._pos * self._byte_s
+            avail = int((now - self._t0) / self._byte_s)
+            if avail <= self._pos:
+                time.sleep(min(self.timeout_s, (self._pos + 1 - avail) * self._byte_s))
+                return b""
+            end = min(end, avail)
+        out = self._data[self._pos:end]
+        self._pos = end
+        return out
+
+    def write(self, data: bytes) -> int:
+        self.written += len(data)
+        return len(data)
+
+
+def open_transport(
+    port: str, baudrate: int, backend: str = "pyserial", timeout_s: float = 0.001, allow_loopback: bool = False,
+) -> Transport:
+    """
+    port is a device path opened with backend, or "<scheme>:<arg>" to pick
+    one explicitly: pyserial:/dev/ttyUSB0, raw:/dev/ttyUSB0, loopback:,
+    replay:/path/capture.bin (replayed at the wire rate of baudrate).
+    loopback: needs a caller that feed()s it, so only those that do pass
+    allow_loopback; the serial processes would wait on it forever.
+    """
+    scheme, sep, arg = port.partition(":")
+    if not sep or scheme not in SCHEMES:
+        scheme, arg = backend, port
+    if scheme == "raw":
+        return RawFdTransport(arg, baudrate, timeout_s)
+    if scheme == "loopback":
+        if not allow_loopback:
+            raise ValueError(f"{port!r}: loopback has nothing feeding it here, use replay:<file> instead")
+        return LoopbackTransport(timeout_s)
+    if scheme == "replay":
+        return ReplayTransport(arg, baudrate, timeout_s=timeout_s)
+    if scheme == "pyserial":
+        return PySerialTransport(arg, baudrate, timeout_s)
+    raise ValueError(f"unknown serial backend {scheme!r}, expected one of {SCHEMES}")
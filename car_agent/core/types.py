@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import struct
+from typing import Any, Dict, Iterable, Tuple
+
+import numpy as np
+
+
+# One schema per sample type: (field, struct code). The NumPy dtype and the
+# wire struct are both built from it, packed little-endian with no padding,
+# so wire bytes, recorder files and np.frombuffer views share one layout.
+_NP_CODE = {"d": "<f8", "f": "<f4", "I": "<u4", "i": "<i4", "B": "u1", "8s": "S8"}
+
+
+def _schema(spec: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[str, ...], np.dtype, struct.Struct]:
+    names = tuple(n for n, _ in spec)
+    dtype = np.dtype([(n, _NP_CODE[c]) for n, c in spec])
+    st = struct.Struct("<" + "".join(c for _, c in spec))
+    assert dtype.itemsize == st.size
+    return names, dtype, st
+
+
+MODES: Tuple[str, ...] = ("idle", "auto", "traj", "path", "manual")
+MODE_UNKNOWN = 255
+
+
+def mode_id(mode: str) -> int:
+    try:
+        return MODES.index(mode)
+    except ValueError:
+        return MODE_UNKNOWN
+
+
+def mode_name(mid: int) -> str:
+    return MODES[mid] if 0 <= mid < len(MODES) else "unknown"
+
+
+class Sample:
+    __slots__ = ()
+
+    FIELDS: Tuple[str, ...] = ()
+    DTYPE: np.dtype = np.dtype([])
+    STRUCT: struct.Struct = struct.Struct("<")
+
+    def values(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, f) for f in self.FIELDS)
+
+    @classmethod
+    def from_values(cls, vals: Iterable[Any]) -> "Sample":
+        return cls(*vals)
+
+    def pack(self) -> bytes:
+        return self.STRUCT.pack(*self.values())
+
+    def pack_into(self, buf: Any, offset: int = 0) -> None:
+        self.STRUCT.pack_into(buf, offset, *self.values())
+
+    @classmethod
+    def unpack_from(cls, buf: Any, offset: int = 0) -> "Sample":
+        return cls.from_values(cls.STRUCT.unpack_from(buf, offset))
+
+    @classmethod
+    def from_record(cls, rec: Any) -> "Sample":
+        return cls.from_values(rec.item())
+
+    def write_record(self, arr: np.ndarray, i: int) -> None:
+        arr[i] = self.values()
+
+    @classmethod
+    def view(cls, buf: Any) -> np.ndarray:
+        # zero-copy: wire payloads / recorder bytes -> structured array
+        return np.frombuffer(buf, dtype=cls.DTYPE)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and self.values() == other.values()  # type: ignore[attr-defined]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in self.FIELDS)})"
+
+
+CHASSIS_STATE_FIELDS: Tuple[str, ...] = ("vx", "vy", "vz", "ax", "ay", "az", "wx", "wy", "wz")
+
+
+class ChassisSample(Sample):
+    """One chassis frame: body velocity (m/s), acceleration (m/s^2), angular rate (rad/s)."""
+
+    __slots__ = ("stamp",) + CHASSIS_STATE_FIELDS + ("err",)
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("stamp", "d"),) + tuple((f, "f") for f in CHASSIS_STATE_FIELDS) + (("err", "B"),)
+    )
+
+    def __init__(
+        self, stamp: float = 0.0,
+        vx: float = 0.0, vy: float = 0.0, vz: float = 0.0,
+        ax: float = 0.0, ay: float = 0.0, az: float = 0.0,
+        wx: float = 0.0, wy: float = 0.0, wz: float = 0.0,
+        err: int = 0,
+    ) -> None:
+        self.stamp = stamp
+        self.vx = vx
+        self.vy = vy
+        self.vz = vz
+        self.ax = ax
+        self.ay = ay
+        self.az = az
+        self.wx = wx
+        self.wy = wy
+        self.wz = wz
+        self.err = err
+
+
+class ImuSample(Sample):
+    __slots__ = ("stamp", "ax", "ay", "az", "wx", "wy", "wz")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("stamp", "d"), ("ax", "f"), ("ay", "f"), ("az", "f"), ("wx", "f"), ("wy", "f"), ("wz", "f"))
+    )
+
+    def __init__(
+        self, stamp: float = 0.0,
+        ax: float = 0.0, ay: float = 0.0, az: float = 0.0,
+        wx: float = 0.0, wy: float = 0.0, wz: float = 0.0,
+    ) -> None:
+        self.stamp = stamp
+        self.ax = ax
+        self.ay = ay
+        self.az = az
+        self.wx = wx
+        self.wy = wy
+        self.wz = wz
+
+    @classmethod
+    def from_chassis(cls, s: ChassisSample) -> "ImuSample":
+        return cls(s.stamp, s.ax, s.ay, s.az, s.wx, s.wy, s.wz)
+
+
+class UwbSample(Sample):
+    __slots__ = ("stamp", "x", "y", "vx", "vy", "err", "rx_age_s")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("stamp", "d"), ("x", "f"), ("y", "f"), ("vx", "f"), ("vy", "f"), ("err", "B"), ("rx_age_s", "f"))
+    )
+
+    def __init__(
+        self, stamp: float = 0.0,
+        x: float = 0.0, y: float = 0.0, vx: float = 0.0, vy: float = 0.0,
+        err: int = 1, rx_age_s: float = 1e9,
+    ) -> None:
+        self.stamp = stamp
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.err = err
+        self.rx_age_s = rx_age_s
+
+
+class CmdSample(Sample):
+    """Velocity command; mode is a name here and a MODES index on the wire."""
+
+    __slots__ = ("rx_time", "t", "seq", "vx", "wz", "mode")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("rx_time", "d"), ("t", "d"), ("seq", "I"), ("vx", "f"), ("wz", "f"), ("mode", "B"))
+    )
+
+    def __init__(
+        self, rx_time: float = 0.0, t: float = 0.0, seq: int = 0,
+        vx: float = 0.0, wz: float = 0.0, mode: str = "idle",
+    ) -> None:
+        self.rx_time = rx_time
+        self.t = t
+        self.seq = seq
+        self.vx = vx
+        self.wz = wz
+        self.mode = mode
+
+    def values(self) -> Tuple[Any, ...]:
+        return (self.rx_time, self.t, self.seq & 0xFFFFFFFF, self.vx, self.wz, mode_id(self.mode))
+
+    @classmethod
+    def from_values(cls, vals: Iterable[Any]) -> "CmdSample":
+        rx_time, t, seq, vx, wz, mid = vals
+        return cls(rx_time, t, seq, vx, wz, mode_name(mid))
+
+
+class PoseSample(Sample):
+    __slots__ = ("stamp", "x", "y", "yaw")
+    FIELDS, DTYPE, STRUCT = _schema((("stamp", "d"), ("x", "f"), ("y", "f"), ("yaw", "f")))
+
+    def __init__(self, stamp: float = 0.0, x: float = 0.0, y: float = 0.0, yaw: float = 0.0) -> None:
+        self.stamp = stamp
+        self.x = x
+        self.y = y
+        self.yaw = yaw
+
+
+class OdomSample(Sample):
+    """Chassis dead reckoning: pose in the odometry frame, travelled distance, slip bitmask."""
+
+    __slots__ = ("stamp", "x", "y", "yaw", "dist", "slip")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("stamp", "d"), ("x", "f"), ("y", "f"), ("yaw", "f"), ("dist", "f"), ("slip", "B"))
+    )
+
+    def __init__(
+        self, stamp: float = 0.0, x: float = 0.0, y: float = 0.0, yaw: float = 0.0,
+        dist: float = 0.0, slip: int = 0,
+    ) -> None:
+        self.stamp = stamp
+        self.x = x
+        self.y = y
+        self.yaw = yaw
+        self.dist = dist
+        self.slip = slip
+
+
+class PeerSample(Sample):
+    """Pose and velocity one car broadcasts to the others; car is at most 8 bytes on the wire."""
+
+    __slots__ = ("stamp", "car", "x", "y", "yaw", "vx", "wz")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (("stamp", "d"), ("car", "8s"), ("x", "f"), ("y", "f"), ("yaw", "f"), ("vx", "f"), ("wz", "f"))
+    )
+
+    def __init__(
+        self, stamp: float = 0.0, car: str = "", x: float = 0.0, y: float = 0.0, yaw: float = 0.0,
+        vx: float = 0.0, wz: float = 0.0,
+    ) -> None:
+        self.stamp = stamp
+        self.car = car
+        self.x = x
+        self.y = y
+        self.yaw = yaw
+        self.vx = vx
+        self.wz = wz
+
+    def values(self) -> Tuple[Any, ...]:
+        return (self.stamp, self.car.encode("utf-8")[:8], self.x, self.y, self.yaw, self.vx, self.wz)
+
+    @classmethod
+    def from_values(cls, vals: Iterable[Any]) -> "PeerSample":
+        stamp, car, x, y, yaw, vx, wz = vals
+        return cls(stamp, car.rstrip(b"\0").decode("utf-8", "replace"), x, y, yaw, vx, wz)
+
+
+class TelemetrySample(Sample):
+    """
+    What one telemetry packet reported, for the recorder: the packet itself
+    is JSON (or delta-coded) and not fixed size. health follows
+    watchdog.SUBSYSTEMS, drive is a fsm.DRIVE_* value.
+    """
+
+    __slots__ = ("stamp", "size", "rate_hz", "drive", "chassis", "uwb", "link", "loc", "cmd_loss", "cmd_rtt_s")
+    FIELDS, DTYPE, STRUCT = _schema(
+        (
+            ("stamp", "d"), ("size", "I"), ("rate_hz", "f"), ("drive", "B"),
+            ("chassis", "B"), ("uwb", "B"), ("link", "B"), ("loc", "B"),
+            ("cmd_loss", "f"), ("cmd_rtt_s", "f"),
+        )
+    )
+
+    def __init__(
+        self, stamp: float = 0.0, size: int = 0, rate_hz: float = 0.0, drive: int = 0,
+        chassis: int = 0, uwb: int = 0, link: int = 0, loc: int = 0, cmd_loss: float = 0.0, cmd_rtt_s: float = 0.0,
+    ) -> None:
+        self.stamp = stamp
+        self.size = size
+        self.rate_hz = rate_hz
+        self.drive = drive
+        self.chassis = chassis
+        self.uwb = uwb
+        self.link = link
+        self.loc = loc
+        self.cmd_loss = cmd_loss
+        self.cmd_rtt_s = cmd_rtt_s
+
+
+class UwbRanges:
+    """
+    Per-anchor ranging from one UWB tag frame. Not a wire Sample: the anchor
+    count is set by the tag firmware. Missing ranges are NaN.
+    """
+
+    __slots__ = ("stamp", "tag_id", "ranges", "eop", "z")
+
+    def __init__(self, stamp: float, tag_id: int, ranges: np.ndarray, eop: np.ndarray, z: float = 0.0) -> None:
+        self.stamp = stamp
+        self.tag_id = tag_id
+        self.ranges = ranges
+        self.eop = eop
+        self.z = z
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stamp": self.stamp,
+            "tag_id": self.tag_id,
+            "ranges": [None if r != r else round(float(r), 3) for r in self.ranges],
+            "eop": [round(float(e), 2) for e in self.eop],
+            "z": self.z,
+        }
+
+
+SAMPLE_TYPES: Dict[str, type] = {
+    "chassis": ChassisSample,
+    "imu": ImuSample,
+    "uwb": UwbSample,
+    "cmd": CmdSample,
+    "pose": PoseSample,
+    "odom": OdomSample,
+    "peer": PeerSample,
+    "telemetry": TelemetrySample,
+}
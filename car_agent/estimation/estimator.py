@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+
+from car_agent.core.types import PoseSample
+
+
+def wrap_angle(a: float) -> float:
+    return (a + math.pi) % (2.0 * math.pi) - math.pi
+
+
+class PoseEstimator:
+    """Planar pose: chassis vx/wz dead reckoning, corrected by UWB x/y and UWB velocity heading."""
+
+    __slots__ = (
+        "x", "y", "yaw", "initialized",
+        "pos_gain", "yaw_gain", "heading_min_speed",
+        "_last_t", "_last_uwb_stamp",
+    )
+
+    def __init__(self, pos_gain: float = 0.3, yaw_gain: float = 0.05, heading_min_speed: float = 0.1) -> None:
+        self.x = 0.0
+        self.y = 0.0
+        self.yaw = 0.0
+        self.initialized = False
+
+        self.pos_gain = float(pos_gain)
+        self.yaw_gain = float(yaw_gain)
+        self.heading_min_speed = float(heading_min_speed)
+
+        self._last_t = 0.0
+        self._last_uwb_stamp = 0.0
+
+    def predict(self, now: float, vx: float, wz: float) -> None:
+        if self._last_t <= 0.0:
+            self._last_t = now
+            return
+        dt = now - self._last_t
+        self._last_t = now
+        if dt <= 0.0 or dt > 0.5:
+            return
+
+        yaw_mid = self.yaw + 0.5 * wz * dt
+        self.x += vx * math.cos(yaw_mid) * dt
+        self.y += vx * math.sin(yaw_mid) * dt
+        self.yaw = wrap_angle(self.yaw + wz * dt)
+
+    def correct_uwb(
+        self, x: float, y: float, vx: float, vy: float, stamp: float, fwd_speed: float, now: float = 0.0
+    ) -> None:
+        if stamp <= self._last_uwb_stamp:
+            return
+        self._last_uwb_stamp = stamp
+
+        # the fix describes where the tag was at its receive stamp; carry it forward to now
+        lag = now - stamp
+        if 0.0 < lag < 0.2:
+            x += vx * lag
+            y += vy * lag
+
+        if not self.initialized:
+            self.x = x
+            self.y = y
+            speed = math.hypot(vx, vy)
+            if speed > self.heading_min_speed:
+                self.yaw = math.atan2(vy, vx)
+            self.initialized = True
+            return
+
+        g = self.pos_gain
+        self.x += g * (x - self.x)
+        self.y += g * (y - self.y)
+
+        # only trust the UWB velocity heading while driving forward at speed
+        if fwd_speed > self.heading_min_speed and math.hypot(vx, vy) > self.heading_min_speed:
+            err = wrap_angle(math.atan2(vy, vx) - self.yaw)
+            self.yaw = wrap_angle(self.yaw + self.yaw_gain * err)
+
+    def to_sample(self, stamp: float) -> PoseSample:
+        return PoseSample(stamp, self.x, self.y, self.yaw)
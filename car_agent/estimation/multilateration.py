@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def project_ranges(anchors: np.ndarray, ranges: np.ndarray, tag_z: float) -> Tuple[np.ndarray, np.ndarray]:
+    """3-D anchors and slant ranges -> planar anchors and horizontal ranges for tags at height tag_z."""
+    dz = anchors[:, 2] - tag_z
+    h2 = ranges * ranges - dz[None, :] ** 2
+    return anchors[:, :2], np.sqrt(np.where(h2 > 0.0, h2, 0.0))
+
+
+def linear_init(anchors: np.ndarray, ranges: np.ndarray, w: np.ndarray, ridge: float = 1e-9) -> np.ndarray:
+    """
+    Closed-form start for every car at once. |p - a|^2 = r^2 is linear in
+    (p, |p|^2), so each car is a small weighted least-squares problem that
+    shares its design matrix with all the others.
+    """
+    m, d = anchors.shape
+    a = np.hstack([-2.0 * anchors, np.ones((m, 1))])                       # (M, D+1)
+    b = np.where(w > 0.0, ranges * ranges, 0.0) - (anchors * anchors).sum(axis=1)[None, :]
+    ata = np.einsum("mi,nm,mj->nij", a, w, a) + ridge * np.eye(d + 1)
+    atb = np.einsum("mi,nm,nm->ni", a, w, b)
+    return np.linalg.solve(ata, atb[..., None])[..., 0][:, :d]
+
+
+def solve_positions(
+    anchors: np.ndarray,
+    ranges: np.ndarray,
+    anchor_w: Optional[np.ndarray] = None,
+    x0: Optional[np.ndarray] = None,
+    iters: int = 5,
+    huber_m: float = 0.3,
+    ridge: float = 1e-6,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Batched robust multilateration: N cars against M anchors in one set of
+    array ops per iteration (Gauss-Newton with Huber IRLS weights).
+
+    anchors (M, D), ranges (N, M) with NaN where a car has no range to an
+    anchor, anchor_w (M,) prior per-anchor weights. Returns positions (N, D)
+    and signed residuals (N, M), NaN where no range was used. Cars with fewer
+    than D + 1 ranges come back as NaN.
+    """
+    anchors = np.asarray(anchors, dtype=np.float64)
+    ranges = np.asarray(ranges, dtype=np.float64)
+    n, m = ranges.shape
+    d = anchors.shape[1]
+    valid = np.isfinite(ranges) & (ranges > 0.0)
+    base_w = valid * (np.ones(m) if anchor_w is None else np.asarray(anchor_w, dtype=np.float64))[None, :]
+    r = np.where(valid, ranges, 0.0)
+
+    p = linear_init(anchors, r, base_w) if x0 is None else np.array(x0, dtype=np.float64)
+    eye = ridge * np.eye(d)
+    res = np.zeros((n, m))
+    for _ in range(max(1, iters)):
+        diff = p[:, None, :] - anchors[None, :, :]                         # (N, M, D)
+        dist = np.sqrt((diff * diff).sum(axis=2))
+        dist = np.maximum(dist, 1e-9)
+        res = dist - r
+        jac = diff / dist[..., None]
+        w = base_w * np.minimum(1.0, huber_m / np.maximum(np.abs(res), 1e-12))
+        h = np.einsum("nmi,nm,nmj->nij", jac, w, jac) + eye
+        g = np.einsum("nmi,nm,nm->ni", jac, w, res)
+        p = p - np.linalg.solve(h, g[..., None])[..., 0]
+
+    diff = p[:, None, :] - anchors[None, :, :]
+    res = np.sqrt((diff * diff).sum(axis=2)) - r
+    res[~valid] = np.nan
+    p[valid.sum(axis=1) < d + 1] = np.nan
+    return p, res
+
+
+class FleetFix:
+    __slots__ = ("stamp", "pos", "residuals", "rms", "n_used", "anchor_rms", "anchor_w")
+
+    def __init__(
+        self, stamp: float, pos: np.ndarray, residuals: np.ndarray, rms: np.ndarray,
+        n_used: np.ndarray, anchor_rms: np.ndarray, anchor_w: np.ndarray,
+    ) -> None:
+        self.stamp = stamp
+        self.pos = pos
+        self.residuals = residuals
+        self.rms = rms
+        self.n_used = n_used
+        self.anchor_rms = anchor_rms
+        self.anchor_w = anchor_w
+
+
+class FleetLocalizer:
+    """
+    Solves every car's position from all cars' anchor ranges each cycle, and
+    keeps a slow per-anchor residual estimate across cycles so an anchor that
+    is consistently off (NLOS, moved, bad calibration) is down-weighted.
+    Runs at the ground station on the ranges in telemetry, or on a car.
+    """
+
+    def __init__(
+        self,
+        anchors: np.ndarray,
+        tag_z: Optional[float] = None,
+        huber_m: float = 0.3,
+        iters: int = 5,
+        anchor_gain: float = 0.1,
+        min_anchor_w: float = 0.05,
+    ) -> None:
+        self.anchors = np.asarray(anchors, dtype=np.float64)
+        self.tag_z = tag_z
+        self.huber_m = float(huber_m)
+        self.iters = int(iters)
+        self.anchor_gain = float(anchor_gain)
+        self.min_anchor_w = float(min_anchor_w)
+
+        m = len(self.anchors)
+        self.anchor_rms = np.zeros(m)
+        self.anchor_w = np.ones(m)
+        self._last: Optional[np.ndarray] = None
+
+    def solve(self, ranges: np.ndarray, stamp: float = 0.0) -> FleetFix:
+        """ranges (N, M): slant ranges from each car's tag to each anchor, NaN where missing."""
+        ranges = np.asarray(ranges, dtype=np.float64)
+        anchors = self.anchors
+        if self.tag_z is not None and anchors.shape[1] == 3:
+            anchors, ranges = project_ranges(anchors, ranges, self.tag_z)
+
+        # warm start from the previous cycle where that car had a fix
+        x0 = None
+        if self._last is not None and len(self._last) == len(ranges):
+            x0 = self._last.copy()
+            cold = ~np.isfinite(x0).all(axis=1)
+            if cold.any():
+                w0 = (np.isfinite(ranges) & (ranges > 0.0)) * self.anchor_w[None, :]
+                x0[cold] = linear_init(anchors, np.nan_to_num(ranges), w0)[cold]
+
+        pos, res = solve_positions(anchors, ranges, self.anchor_w, x0, self.iters, self.huber_m)
+        self._last = pos
+
+        used = np.isfinite(res)
+        n_used = used.sum(axis=1)
+        sq = np.where(used, res * res, 0.0)
+        rms = np.sqrt(sq.sum(axis=1) / np.maximum(n_used, 1))
+
+        # per-anchor robust residual over the cars that ranged to it this cycle
+        seen = used.any(axis=0)
+        if seen.any():
+            med = np.nanmedian(np.abs(res[:, seen]), axis=0)
+            self.anchor_rms[seen] += self.anchor_gain * (med - self.anchor_rms[seen])
+        self.anchor_w = np.maximum(self.min_anchor_w, 1.0 / (1.0 + (self.anchor_rms / self.huber_m) ** 2))
+        return FleetFix(stamp, pos, res, rms, n_used, self.anchor_rms.copy(), self.anchor_w.copy())
+
+
+def simulate(
+    n_cars: int, n_anchors: int, n_bad: int, noise_m: float, bias_m: float, drop: float, cycles: int, seed: int = 0,
+) -> dict:
+    rng = np.random.default_rng(seed)
+    side = 20.0
+    anchors = np.column_stack([rng.uniform(0.0, side, n_anchors), rng.uniform(0.0, side, n_anchors)])
+    bad = rng.choice(n_anchors, size=n_bad, replace=False)
+    loc = FleetLocalizer(anchors)
+
+    truth = rng.uniform(2.0, side - 2.0, (n_cars, 2))
+    err = []
+    t_solve = []
+    for k in range(cycles):
+        truth += rng.normal(0.0, 0.02, truth.shape)
+        rng_m = np.linalg.norm(truth[:, None, :] - anchors[None, :, :], axis=2)
+        rng_m += rng.normal(0.0, noise_m, rng_m.shape)
+        rng_m[:, bad] += bias_m
+        rng_m[rng.random(rng_m.shape) < drop] = np.nan
+        t0 = time.perf_counter()
+        fix = loc.solve(rng_m, stamp=float(k))
+        t_solve.append(time.perf_counter() - t0)
+        if k >= cycles // 2:
+            err.append(np.linalg.norm(fix.pos - truth, axis=1))
+
+    good = np.setdiff1d(np.arange(n_anchors), bad)
+    e = np.concatenate(err)
+    return {
+        "pos_err_rms": float(np.sqrt(np.nanmean(e * e))),
+        "pos_err_p95": float(np.nanpercentile(e, 95)),
+        "solve_ms": 1e3 * float(np.median(t_solve)),
+        "bad_anchor_w": float(loc.anchor_w[bad].max()) if n_bad else float("nan"),
+        "good_anchor_w": float(loc.anchor_w[good].min()),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="fleet UWB multilateration on synthetic ranges")
+    ap.add_argument("--cars", type=int, default=40)
+    ap.add_argument("--anchors", type=int, default=16)
+    ap.add_argument("--bad", type=int, default=2, help="anchors with a constant range bias")
+    ap.add_argument("--noise", type=float, default=0.05, help="range noise sigma m")
+    ap.add_argument("--bias", type=float, default=0.8, help="bad anchor range bias m")
+    ap.add_argument("--drop", type=float, default=0.2, help="probability a range is missing")
+    ap.add_argument("--cycles", type=int, default=100)
+    ap.add_argument("--seed", type=int, default=0)
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    res = simulate(args.cars, args.anchors, args.bad, args.noise, args.bias, args.drop, args.cycles, args.seed)
+    print(f"[mlat] cars={args.cars} anchors={args.anchors} bad={args.bad} " + " ".join(f"{k}={v:.4f}" for k, v in res.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import math
+from typing import Tuple
+
+from car_agent.core.types import OdomSample
+from car_agent.estimation.estimator import wrap_angle
+
+
+SLIP_ACCEL = 1   # wheel-speed derivative disagrees with the IMU longitudinal acceleration
+SLIP_TRACK = 2   # reported wheel speed does not follow the lag-filtered commanded speed
+
+
+class Odometry:
+    """
+    Dead reckoning over every chassis frame. Velocity is held from the previous
+    frame over each interval, and the unicycle is integrated exactly for that
+    piecewise-constant input (arc, not Euler step). Frames from one serial
+    read share a stamp; each of them still gets an interval, the frame period
+    estimated from the stamps, and the integration clock catches up with
+    the stamps at the next read.
+
+    Track slip is the wheel speed leaving the band between the command and
+    the command passed through a first-order lag of cmd_tau_s (a chassis at
+    the slow end of normal), by more than track_tol. A chassis still moving
+    towards a new setpoint is inside the band and is not mistaken for slip.
+    """
+
+    __slots__ = (
+        "x", "y", "yaw", "dist", "slip", "stamp",
+        "accel_tol", "track_tol", "hold_frames", "alpha", "cmd_tau_s",
+        "_vx", "_wz", "_t", "_period", "_read_t", "_read_n", "_a_wheel", "_a_imu", "_cmd_ref",
+        "_accel_flag", "_accel_n", "_track_flag", "_track_n",
+    )
+
+    def __init__(
+        self, accel_tol: float = 1.5, track_tol: float = 0.15, hold_frames: int = 10, alpha: float = 0.3,
+        cmd_tau_s: float = 0.5,
+    ) -> None:
+        self.x = 0.0
+        self.y = 0.0
+        self.yaw = 0.0
+        self.dist = 0.0
+        self.slip = 0
+        self.stamp = 0.0
+
+        self.accel_tol = float(accel_tol)
+        self.track_tol = float(track_tol)
+        self.hold_frames = int(hold_frames)
+        self.alpha = float(alpha)
+        self.cmd_tau_s = float(cmd_tau_s)
+
+        self._vx = 0.0
+        self._wz = 0.0
+        self._t = 0.0        # integrated up to here; may run a few frames ahead of stamp
+        self._period = 0.0   # estimated chassis frame period, 0 until two reads are seen
+        self._read_t = 0.0   # stamp of the current read and how many frames it carried
+        self._read_n = 0
+        self._clear_slip()
+
+    def _clear_slip(self) -> None:
+        self.slip = 0
+        self._a_wheel = 0.0
+        self._a_imu = 0.0
+        self._cmd_ref = self._vx
+        self._accel_flag = False
+        self._accel_n = 0
+        self._track_flag = False
+        self._track_n = 0
+
+    def reset(self, x: float = 0.0, y: float = 0.0, yaw: float = 0.0) -> None:
+        self.x = x
+        self.y = y
+        self.yaw = yaw
+        self.dist = 0.0
+        self._clear_slip()
+
+    def update(self, stamp: float, vx: float, wz: float, ax: float, cmd_vx: float) -> None:
+        if self.stamp <= 0.0:
+            self.stamp = self._t = self._read_t = stamp
+            self._read_n = 1
+            self._vx = vx
+            self._wz = wz
+            return
+
+        if stamp > self._read_t:
+            gap = stamp - self._read_t
+            if gap < 0.5:
+                per_frame = gap / self._read_n
+                self._period = per_frame if self._period <= 0.0 else self._period + 0.1 * (per_frame - self._period)
+            self._read_t, self._read_n = stamp, 1
+        else:
+            self._read_n += 1
+
+        dt = stamp - self._t
+        if dt <= 0.0:
+            # a frame of the same read, or the clock is still ahead from one: one frame period
+            if self._period <= 0.0:
+                self._vx = vx
+                self._wz = wz
+                return
+            dt = self._period
+        self._t += dt
+        self.stamp = max(self.stamp, stamp)
+        if dt > 0.5:
+            # link gap: do not integrate a stale velocity over it
+            self._vx = vx
+            self._wz = wz
+            return
+
+        v, w = self._vx, self._wz
+        th = w * dt
+        if abs(th) > 1e-6:
+            r = v / w
+            yaw1 = self.yaw + th
+            self.x += r * (math.sin(yaw1) - math.sin(self.yaw))
+            self.y -= r * (math.cos(yaw1) - math.cos(self.yaw))
+        else:
+            yaw_mid = self.yaw + 0.5 * th
+            self.x += v * dt * math.cos(yaw_mid)
+            self.y += v * dt * math.sin(yaw_mid)
+        self.yaw = wrap_angle(self.yaw + th)
+        self.dist += abs(v) * dt
+
+        a = self.alpha
+        self._a_wheel += a * ((vx - v) / dt - self._a_wheel)
+        self._a_imu += a * (ax - self._a_imu)
+        self._vx = vx
+        self._wz = wz
+        # the slowest the wheels may plausibly be moving towards the command by now
+        self._cmd_ref += (1.0 - math.exp(-dt / max(self.cmd_tau_s, 1e-3))) * (cmd_vx - self._cmd_ref)
+        lo, hi = min(cmd_vx, self._cmd_ref), max(cmd_vx, self._cmd_ref)
+
+        # each flag needs hold_frames consecutive frames to set, and as many to clear
+        self._accel_flag, self._accel_n = self._hysteresis(
+            abs(self._a_wheel - self._a_imu) > self.accel_tol, self._accel_flag, self._accel_n)
+        self._track_flag, self._track_n = self._hysteresis(
+            abs(cmd_vx) > 1e-3 and (vx < lo - self.track_tol or vx > hi + self.track_tol), self._track_flag, self._track_n)
+        self.slip = (SLIP_ACCEL if self._accel_flag else 0) | (SLIP_TRACK if self._track_flag else 0)
+
+    def _hysteresis(self, bad: bool, flag: bool, n: int) -> Tuple[bool, int]:
+        if bad != flag:
+            n += 1
+            if n >= self.hold_frames:
+                return bad, 0
+            return flag, n
+        return flag, 0
+
+    def to_sample(self) -> OdomSample:
+        return OdomSample(self.stamp, self.x, self.y, self.yaw, self.dist, self.slip)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+import numpy as np
+
+from car_agent.core.types import SAMPLE_TYPES, Sample
+
+
+# file = header (magic + one json line, space padded to a whole number of
+# REC_HEADER_LEN blocks, ending in the only newline) + packed records
+REC_MAGIC = b"CARREC01"
+REC_HEADER_LEN = 256
+
+
+def _header(stream: str, cls: type, meta: Dict[str, Any]) -> bytes:
+    info = {"stream": stream, "type": cls.__name__, "descr": cls.DTYPE.descr, "meta": meta}
+    body = REC_MAGIC + json.dumps(info, separators=(",", ":")).encode("utf-8")
+    size = -(-(len(body) + 1) // REC_HEADER_LEN) * REC_HEADER_LEN
+    return body.ljust(size - 1, b" ") + b"\n"
+
+
+class Recorder:
+    """
+    Appends samples to one <stream>.rec file per stream under run_dir.
+    write() only packs the sample and queues the bytes; a writer thread owns
+    the files, so a slow or stalled disk never blocks the control loop. When
+    the queue is full, samples are dropped and counted.
+    """
+
+    _FLUSH = ("", None, b"")
+
+    def __init__(self, root: str, car_id: str, flush_every: int = 256, max_queue: int = 65536) -> None:
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        self.run_dir = Path(root).expanduser() / f"{car_id}_{stamp}"
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.car_id = car_id
+        self.flush_every = int(flush_every)
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = ""
+        self._files: Dict[str, Tuple[BinaryIO, type]] = {}
+        self._pending = 0
+        self._q: "queue.Queue[Optional[Tuple[str, Optional[type], bytes]]]" = queue.Queue(maxsize=max_queue)
+        self._th = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._th.start()
+
+    def _open(self, stream: str, cls: type) -> BinaryIO:
+        f = (self.run_dir / f"{stream}.rec").open("wb")
+        f.write(_header(stream, cls, {"car_id": self.car_id}))
+        self._files[stream] = (f, cls)
+        return f
+
+    def write(self, stream: str, sample: Sample) -> None:
+        try:
+            self._q.put_nowait((stream, type(sample), sample.pack()))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        try:
+            self._q.put_nowait(self._FLUSH)
+        except queue.Full:
+            pass
+
+    def _flush_files(self) -> None:
+        for f, _ in self._files.values():
+            f.flush()
+        self._pending = 0
+
+    def _run(self) -> None:
+        # the main process may run SCHED_FIFO; file I/O belongs in the normal class
+        if hasattr(os, "sched_setscheduler") and hasattr(threading, "get_native_id"):
+            try:
+                os.sched_setscheduler(threading.get_native_id(), os.SCHED_OTHER, os.sched_param(0))
+            except OSError:
+                pass
+        while True:
+            item = self._q.get()
+            if item is None:
+                break
+            stream, cls, data = item
+            try:
+                if cls is None:
+                    self._flush_files()
+                    continue
+                entry = self._files.get(stream)
+                f = entry[0] if entry is not None else self._open(stream, SAMPLE_TYPES.get(stream, cls))
+                f.write(data)
+                self._pending += 1
+                if self._pending >= self.flush_every:
+                    self._flush_files()
+            except Exception as e:
+                # the thread must outlive a bad record, or every stream silently stops
+                self.errors += 1
+                self.last_error = f"{stream}: {e}"
+
+    def close(self) -> None:
+        """Drains what is queued, closes the files and reports drops and write errors."""
+        if self._th.is_alive():
+            self._q.put(None)
+            self._th.join(timeout=5.0)
+        for f, _ in self._files.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._files.clear()
+        if self.dropped or self.errors:
+            print(f"[recorder] dropped={self.dropped} write_errors={self.errors} last_error={self.last_error or '-'}")
+
+
+def _read_header(path: str) -> Tuple[Dict[str, Any], int]:
+    """(header info, header length in bytes)."""
+    head = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(REC_HEADER_LEN)
+            head += block
+            if len(block) < REC_HEADER_LEN or block.endswith(b"\n"):
+                break
+    if not head.startswith(REC_MAGIC) or not head.endswith(b"\n") or len(head) % REC_HEADER_LEN:
+        raise ValueError(f"{path}: not a recorder file")
+    return json.loads(head[len(REC_MAGIC):].decode("utf-8")), len(head)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    return _read_header(path)[0]
+
+
+def open_record(path: str) -> np.ndarray:
+    """Memory-map a .rec file as a structured array (a torn last record is ignored)."""
+    info, offset = _read_header(path)
+    dtype = np.dtype([tuple(d) for d in info["descr"]])
+    size = Path(path).stat().st_size - offset
+    n = max(0, size // dtype.itemsize)
+    if n == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(n,))
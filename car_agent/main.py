@@ -1,88 +1,107 @@
 from __future__ import annotations
 
 import argparse
+import math
+import multiprocessing
+import signal
+import sys
 import time
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict
-
-import yaml
+from typing import Any, Dict, Optional, Tuple
 
 from car_agent.chassis.chassis_driver import ChassisDriver
+from car_agent.control.controller import Controller, PathTracker, VelocityPI
+from car_agent.core.config import AppConfig, ConfigError, ConfigStore
+from car_agent.core.rt import JitterMeter, Placement, apply_placement, format_jitter, format_report
+from car_agent.core.timebase import BootTimeline
+from car_agent.core.types import CmdSample, PeerSample, TelemetrySample
+from car_agent.estimation.estimator import PoseEstimator
+from car_agent.estimation.odometry import SLIP_ACCEL
 from car_agent.net.cmd_server import UdpCmdServer
+from car_agent.net.fleet_bus import UdpFleetBus
 from car_agent.net.protocol import Telemetry
-from car_agent.net.telemetry_server import UdpTelemetryClient
+from car_agent.net.telemetry_server import TelemetryEncoder, TelemetryRate, UdpTelemetryClient
+from car_agent.safety.collision import CollisionFilter
+from car_agent.safety.fsm import DRIVE_NAMES, DRIVE_STOP, DriveFsm
 from car_agent.safety.limits import clamp
-from car_agent.sensors.uwb_adapter import UwbAdapter
-
-
-@dataclass
-class AppConfig:
-    raw: Dict[str, Any]
-
-    @property
-    def car_id(self) -> str:
-        return str(self.raw.get("car_id", "car_unknown"))
-
-    @property
-    def cmd_listen(self) -> str:
-        return str(self.raw.get("net", {}).get("cmd_listen", "0.0.0.0:31001"))
-
-    @property
-    def telemetry_peer(self) -> str:
-        return str(self.raw.get("net", {}).get("telemetry_peer", "192.168.10.1:32001"))
-
-    @property
-    def control_hz(self) -> float:
-        return float(self.raw.get("loop", {}).get("control_hz", 50.0))
-
-    @property
-    def telemetry_hz(self) -> float:
-        return float(self.raw.get("loop", {}).get("telemetry_hz", 20.0))
-
-    @property
-    def chassis_serial(self) -> str:
-        return str(self.raw.get("chassis", {}).get("serial_port", ""))
+from car_agent.safety.watchdog import DEGRADED, HEALTH_NAMES, OFF, OK, HealthMonitor
 
-    @property
-    def chassis_baudrate(self) -> int:
-        return int(self.raw.get("chassis", {}).get("baudrate", 115200))
 
-    @property
-    def chassis_hz(self) -> float:
-        return float(self.raw.get("chassis", {}).get("control_hz", 50))
-
-    @property
-    def cmd_timeout_s(self) -> float:
-        return float(self.raw.get("safety", {}).get("cmd_timeout_s", 0.2))
+def build_controller(cfg: AppConfig) -> Controller:
+    pi = VelocityPI(
+        kp_v=cfg.control_kp_v, ki_v=cfg.control_ki_v,
+        kp_w=cfg.control_kp_w, ki_w=cfg.control_ki_w,
+        i_max=cfg.control_i_max,
+    )
+    tracker = PathTracker(
+        kind=cfg.control_tracker,
+        lookahead_m=cfg.control_lookahead_m,
+        stanley_k=cfg.control_stanley_k,
+        heading_k=cfg.control_heading_k,
+        goal_tol_m=cfg.control_goal_tol_m,
+    )
+    return Controller(velocity_mode=cfg.control_velocity_loop, pi=pi, tracker=tracker)
 
-    @property
-    def v_max(self) -> float:
-        return float(self.raw.get("safety", {}).get("v_max", 0.3))
 
-    @property
-    def w_max(self) -> float:
-        return float(self.raw.get("safety", {}).get("w_max", 0.6))
+def build_collision(cfg: AppConfig) -> Optional[CollisionFilter]:
+    if not cfg.collision_enabled:
+        return None
+    return CollisionFilter(
+        car_radius_m=cfg.collision_car_radius_m,
+        ttc_stop_s=cfg.collision_ttc_stop_s,
+        ttc_slow_s=cfg.collision_ttc_slow_s,
+        neighbor_radius_m=cfg.collision_radius_m,
+    )
 
-    @property
-    def uwb_enabled(self) -> bool:
-        return bool(self.raw.get("sensors", {}).get("uwb", {}).get("enabled", False))
 
-    @property
-    def uwb_port(self) -> str:
-        return str(self.raw.get("sensors", {}).get("uwb", {}).get("serial_port", "/dev/ttyCH343USB1"))
+def build_health(cfg: AppConfig) -> Dict[str, HealthMonitor]:
+    return {
+        "chassis": HealthMonitor(
+            "chassis", cfg.health_chassis_degraded_age_s, cfg.health_chassis_failed_age_s,
+            cfg.health_chassis_min_hz, cfg.health_recover_s,
+        ),
+        "uwb": HealthMonitor(
+            "uwb", cfg.health_uwb_degraded_age_s, cfg.health_uwb_failed_age_s,
+            cfg.health_uwb_min_hz, cfg.health_recover_s,
+        ),
+        # an idle link is normal; the stale logic owns command timeouts, so link state is
+        # reported to the operator and never reaches DriveFsm
+        "link": HealthMonitor("link", cfg.cmd_timeout_s, max(1.0, 5.0 * cfg.cmd_timeout_s), 0.0, cfg.health_recover_s),
+    }
+
+
+def build_telemetry(cfg: AppConfig) -> Tuple[Optional[TelemetryEncoder], Optional[TelemetryRate]]:
+    if not cfg.telemetry_adaptive:
+        return None, None
+    rate = TelemetryRate(
+        base_hz=cfg.telemetry_hz,
+        min_hz=cfg.telemetry_min_hz,
+        max_hz=cfg.telemetry_max_hz,
+        loss_hi=cfg.telemetry_loss_hi,
+        rtt_hi_s=cfg.telemetry_rtt_hi_s,
+    )
+    return TelemetryEncoder(keyframe_s=cfg.telemetry_keyframe_s), rate
 
-    @property
-    def uwb_baudrate(self) -> int:
-        return int(self.raw.get("sensors", {}).get("uwb", {}).get("baudrate", 921600))
 
+def placement_for(cfg: AppConfig, proc: str) -> Placement:
+    return Placement(
+        cpus=getattr(cfg, f"placement_{proc}_cpus"),
+        policy=getattr(cfg, f"placement_{proc}_policy"),
+        priority=getattr(cfg, f"placement_{proc}_priority"),
+        mlock=getattr(cfg, f"placement_{proc}_mlock"),
+        gc=getattr(cfg, f"placement_{proc}_gc"),
+    )
 
 
-def load_config(path: str) -> AppConfig:
-    p = Path(path).expanduser().resolve()
-    with p.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    return AppConfig(raw=data)
+def make_mp_context(method: str) -> Any:
+    methods = multiprocessing.get_all_start_methods()
+    if method not in methods:
+        print(f"[car_agent] start_method={method} unavailable, using {methods[0]}")
+        method = methods[0]
+    ctx = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # the server imports these once; each serial child then forks from it warm
+        ctx.set_forkserver_preload(["car_agent.chassis.wheeltec_serial_io", "car_agent.sensors.uwb_serial_io", "serial", "termios"])
+    return ctx
 
 
 def parse_args() -> argparse.Namespace:
@@ -92,68 +111,259 @@ def parse_args() -> argparse.Namespace:
 
 
 def main() -> None:
+    boot = BootTimeline()
     args = parse_args()
-    cfg = load_config(args.config)
+    try:
+        store = ConfigStore(args.config)
+    except ConfigError as e:
+        print(f"[car_agent] bad config: {e}")
+        sys.exit(2)
+    cfg = store.current
+    boot.mark("config")
     print(f"[car_agent] boot ok, car_id={cfg.car_id}, config={args.config}")
 
+    # start the serial children first: nothing else is running yet, so a plain
+    # fork is safe and the children inherit the already-imported modules
+    ctx = make_mp_context(cfg.boot_start_method)
     chassis = ChassisDriver(
         serial_port=cfg.chassis_serial,
         baudrate=cfg.chassis_baudrate,
         control_hz=cfg.chassis_hz,
+        mp_context=ctx,
+        placement=placement_for(cfg, "chassis"),
+        backend=cfg.chassis_backend,
     )
     chassis.start()
+    boot.mark("chassis_spawned")
     print(f"[car_agent] chassis started, alive={chassis.is_alive()}, serial={cfg.chassis_serial}")
 
-    cmd_server = UdpCmdServer(car_id=cfg.car_id, listen=cfg.cmd_listen)
-    cmd_server.start()
-    print(f"[car_agent] cmd server listen={cfg.cmd_listen}")
-
     uwb = None
     if cfg.uwb_enabled:
-        uwb = UwbAdapter(serial_port=cfg.uwb_port, baudrate=cfg.uwb_baudrate)
+        from car_agent.sensors.uwb_adapter import UwbAdapter
+
+        uwb = UwbAdapter(
+            serial_port=cfg.uwb_port, baudrate=cfg.uwb_baudrate,
+            mp_context=ctx, placement=placement_for(cfg, "uwb"), backend=cfg.uwb_backend,
+        )
         uwb.start()
+        boot.mark("uwb_spawned")
         print(f"[car_agent] uwb started, alive={uwb.is_alive()}, serial={cfg.uwb_port}")
 
+    # SIGHUP: re-read the yaml and swap the config between ticks
+    reload_req = [False]
+
+    def _on_hup(signum, frame) -> None:
+        reload_req[0] = True
+
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _on_hup)
+
+    cmd_server = UdpCmdServer(
+        car_id=cfg.car_id,
+        listen=cfg.cmd_listen,
+        traj_max_horizon_s=cfg.traj_max_horizon_s,
+    )
+    cmd_server.start()
+    boot.mark("cmd_server")
+    print(f"[car_agent] cmd server listen={cfg.cmd_listen}")
 
-    telem = UdpTelemetryClient(peer=cfg.telemetry_peer)
-    print(f"[car_agent] telemetry peer={cfg.telemetry_peer}")
+    telem_encoder, telem_rate = build_telemetry(cfg)
+    telem = UdpTelemetryClient(peer=cfg.telemetry_peer, encoder=telem_encoder)
+    print(f"[car_agent] telemetry peer={cfg.telemetry_peer} adaptive={cfg.telemetry_adaptive}")
+
+    fleet = None
+    if cfg.fleet_listen or cfg.fleet_peer:
+        fleet = UdpFleetBus(
+            car_id=cfg.car_id, listen=cfg.fleet_listen, peer=cfg.fleet_peer,
+            max_age_s=cfg.collision_peer_max_age_s, cell_m=cfg.collision_radius_m,
+        )
+        fleet.start()
+        print(f"[car_agent] fleet bus listen={cfg.fleet_listen} peer={cfg.fleet_peer}")
+    cavoid = build_collision(cfg)
+    health = build_health(cfg)
+    fsm = DriveFsm(v_limited=cfg.health_limited_v_max, w_limited=cfg.health_limited_w_max)
+    fsm_changes = fsm.changes
+    nonfinite_cmds = 0
+
+    controller = build_controller(cfg)
+    estimator = PoseEstimator()
+    print(f"[car_agent] controller velocity_loop={cfg.control_velocity_loop} tracker={cfg.control_tracker}")
+
+    recorder = None
+    if cfg.record_dir:
+        from car_agent.logging.recorder import Recorder
+
+        recorder = Recorder(cfg.record_dir, cfg.car_id)
+        print(f"[car_agent] recording to {recorder.run_dir}")
+    last_uwb_stamp = 0.0
+
+    # the children apply their own placement; pin this process last, so the
+    # GC freeze covers everything boot allocated
+    rt_report = apply_placement(placement_for(cfg, "main"))
+    print(format_report("main", rt_report))
+    boot.mark("loop_ready")
 
     dt = 1.0 / max(1.0, cfg.control_hz)
     telem_dt = 1.0 / max(1.0, cfg.telemetry_hz)
+    loop_jitter = JitterMeter(dt)
+    jitter = loop_jitter.stats()
+    last_jitter_print = 0.0
 
     last_telem = 0.0
+    last_peer = 0.0
     last_print = 0.0
 
     try:
         while True:
+            if reload_req[0]:
+                reload_req[0] = False
+                ok, changed = store.reload()
+                if ok and changed:
+                    cfg = store.current
+                    controller = build_controller(cfg)
+                    cavoid = build_collision(cfg)
+                    for name, m in build_health(cfg).items():
+                        # keep the current states; only the thresholds change
+                        old = health[name]
+                        old.degraded_age_s, old.failed_age_s = m.degraded_age_s, m.failed_age_s
+                        old.min_hz, old.recover_s = m.min_hz, m.recover_s
+                    fsm.v_limited, fsm.w_limited = cfg.health_limited_v_max, cfg.health_limited_w_max
+                    if fleet is not None:
+                        fleet.max_age_s = cfg.collision_peer_max_age_s
+                    cmd_server.traj_max_horizon_s = cfg.traj_max_horizon_s
+                    dt = 1.0 / max(1.0, cfg.control_hz)
+                    loop_jitter = JitterMeter(dt)
+                    telem_dt = 1.0 / max(1.0, cfg.telemetry_hz)
+                    telem.encoder, telem_rate = build_telemetry(cfg)
+                    print(f"[car_agent] config reloaded, changed={changed}")
+
             now = time.time()
+            loop_jitter.tick(now)
             cmd = cmd_server.get_latest()
+            st = chassis.get_state()
+
+            estimator.predict(now, st.vx, st.wz)
+            u = None
+            if uwb is not None:
+                u = uwb.get_latest()
+                if u.err == 0:
+                    estimator.correct_uwb(u.x, u.y, u.vx, u.vy, u.stamp, st.vx, now)
+            od = chassis.get_odom()
+
+            chassis_frames, chassis_lat = chassis.rx_stats()
+            h_chassis = health["chassis"].update(
+                now, now - st.stamp if st.stamp > 0 else math.inf, chassis_frames,
+                alive=chassis.is_alive() and st.err == 0,
+            )
+            h_uwb = OFF
+            if u is not None:
+                uwb_frames, uwb_lat = uwb.rx_stats()
+                h_uwb = health["uwb"].update(now, u.rx_age_s, uwb_frames, alive=uwb.is_alive() and u.err == 0)
+            h_link = health["link"].update(
+                now, now - cmd.rx_time if cmd.rx_time > 0 else math.inf, cmd_server.rx_count, cmd_server.parse_err,
+                degraded=cmd_server.loss > cfg.health_link_loss_hi,
+            )
+            # without UWB the pose is dead reckoning by design; with it, wheels slipping against the
+            # IMU spoil the prediction (track slip is the chassis not following, reported only)
+            h_loc = max(OK if h_uwb == OFF else h_uwb, DEGRADED if od.slip & SLIP_ACCEL else OK)
+
+            elapsed = now - cmd.rx_time
+            if cmd.traj is not None:
+                # trajectory mode: keep executing through link gaps until the horizon ends
+                stale = cmd.traj.expired(elapsed)
+                vx_raw, wz_raw = cmd.traj.sample(elapsed)
+            elif cmd.path is not None:
+                stale = elapsed > cfg.path_timeout_s or not estimator.initialized
+                vx_raw, wz_raw = 0.0, 0.0
+                if not stale:
+                    vx_raw, wz_raw = controller.track(cmd.path, estimator.x, estimator.y, estimator.yaw)
+            else:
+                stale = elapsed > cfg.cmd_timeout_s
+                vx_raw, wz_raw = cmd.vx, cmd.wz
 
-            stale = (now - cmd.rx_time) > cfg.cmd_timeout_s
             if stale:
                 vx_cmd = 0.0
                 wz_cmd = 0.0
                 mode = "idle"
+                controller.reset()
             else:
-                vx_cmd = clamp(cmd.vx, -cfg.v_max, cfg.v_max)
-                wz_cmd = clamp(cmd.wz, -cfg.w_max, cfg.w_max)
+                vx_ref = clamp(vx_raw, -cfg.v_max, cfg.v_max)
+                wz_ref = clamp(wz_raw, -cfg.w_max, cfg.w_max)
+                if st.err == 0:
+                    vx_ref, wz_ref = controller.update(vx_ref, wz_ref, st.vx, st.wz, dt)
+                vx_cmd = clamp(vx_ref, -cfg.v_max, cfg.v_max)
+                wz_cmd = clamp(wz_ref, -cfg.w_max, cfg.w_max)
                 mode = cmd.mode
 
+            if cavoid is not None and not stale and estimator.initialized:
+                # no local range sensor driver yet, so only fleet neighbours feed the filter
+                t_ca = time.perf_counter()
+                peers = fleet.neighbors(estimator.x, estimator.y, cavoid.neighbor_radius_m, now) if fleet is not None else ()
+                vx_cmd, wz_cmd = cavoid.filter(vx_cmd, wz_cmd, estimator.x, estimator.y, estimator.yaw, peers, t_start=t_ca)
+
+            drive = fsm.update(h_chassis, h_loc, cmd.path is not None and not stale)
+            if drive == DRIVE_STOP:
+                controller.reset()
+            vx_cmd, wz_cmd = fsm.apply(vx_cmd, wz_cmd)
+            if fsm.changes != fsm_changes:
+                fsm_changes = fsm.changes
+                print(
+                    f"[safety] drive={DRIVE_NAMES[drive]} chassis={HEALTH_NAMES[h_chassis]} "
+                    f"uwb={HEALTH_NAMES[h_uwb]} loc={HEALTH_NAMES[h_loc]}"
+                )
+
+            if not (math.isfinite(vx_cmd) and math.isfinite(wz_cmd)):
+                # whatever the source, a NaN must not reach the chassis child: Command_Trans would kill it
+                nonfinite_cmds += 1
+                if nonfinite_cmds == 1 or nonfinite_cmds % 1000 == 0:
+                    print(f"[safety] non-finite command ({vx_cmd}, {wz_cmd}) replaced by stop, n={nonfinite_cmds}")
+                vx_cmd, wz_cmd = 0.0, 0.0
+                controller.reset()
             chassis.set_cmd(vx_cmd, 0.0, wz_cmd)
 
-            if now - last_telem >= telem_dt:
-                st = chassis.get_state()
+            if not boot.reported:
+                # the loop runs while sensors are still coming up; report once they are in
+                boot.mark("first_actuation")
+                if st.err == 0:
+                    boot.mark("chassis_first_frame")
+                if u is not None and u.err == 0:
+                    boot.mark("uwb_first_fix")
+                expected = ("chassis_first_frame",) if uwb is None else ("chassis_first_frame", "uwb_first_fix")
+                if all(boot.has(p) for p in expected) or time.perf_counter() - boot.t0 > 10.0:
+                    print("[boot] timeline:\n" + boot.report(expected))
+
+            if recorder is not None:
+                recorder.write("chassis", st)
+                recorder.write("cmd", cmd)
+                recorder.write("act", CmdSample(now, cmd.t, cmd.seq, vx_cmd, wz_cmd, mode))
+                recorder.write("pose", estimator.to_sample(now))
+                recorder.write("odom", od)
+                if u is not None and u.stamp != last_uwb_stamp:
+                    recorder.write("uwb", u)
+                    last_uwb_stamp = u.stamp
+
+            # neighbours age out on a fixed clock, so peer poses keep the base rate
+            if fleet is not None and estimator.initialized and now - last_peer >= 1.0 / max(1.0, cfg.telemetry_hz):
+                fleet.publish(PeerSample(now, cfg.car_id, estimator.x, estimator.y, estimator.yaw, st.vx, st.wz))
+                last_peer = now
+
+            if telem_rate is not None:
+                telem_dt = 1.0 / telem_rate.update(now, st.vx, st.wz, mode == "idle", cmd_server.loss, cmd_server.rtt_s)
 
+            if now - last_telem >= telem_dt:
                 uwb_state = None
-                if uwb is not None:
-                    u = uwb.get_latest()
+                if u is not None:
                     uwb_state = {
                         "x": u.x, "y": u.y,
                         "vx": u.vx, "vy": u.vy,
                         "age_s": u.rx_age_s,
-                        "err": u.err,
-                        "alive": uwb.is_alive(),
+                        "frames": uwb_frames,
+                        "pub_lat_ms": uwb_lat * 1e3,
                     }
+                    rg = uwb.get_ranges()
+                    if rg is not None:
+                        # per-anchor ranges for the fleet multilateration at the ground station
+                        uwb_state.update(rg.to_dict())
 
                 pkt = Telemetry(
                     car_id=cfg.car_id,
@@ -163,29 +373,62 @@ def main() -> None:
                         "vx": st.vx, "vy": st.vy, "vz": st.vz,
                         "ax": st.ax, "ay": st.ay, "az": st.az,
                         "wx": st.wx, "wy": st.wy, "wz": st.wz,
-                        "err": st.err,
                         "uwb": uwb_state,
+                        "pose": {"x": estimator.x, "y": estimator.y, "yaw": estimator.yaw},
+                        "odom": {"x": od.x, "y": od.y, "yaw": od.yaw, "dist": od.dist, "slip": od.slip},
                     },
                     health={
-                        "alive": chassis.is_alive(),
+                        # watchdog enums: sub follows watchdog.SUBSYSTEMS, drive is fsm.DRIVE_*
+                        "sub": [h_chassis, h_uwb, h_link, h_loc],
+                        "drive": drive,
+                        "chassis_frames": chassis_frames,
+                        "chassis_pub_lat_ms": chassis_lat * 1e3,
+                        "chassis_age_s": now - st.stamp if st.stamp > 0 else None,
                         "cmd_rx_count": cmd_server.rx_count,
                         "cmd_parse_err": cmd_server.parse_err,
-                        "cmd_stale": stale,
+                        "cmd_loss": cmd_server.loss,
+                        "cmd_rtt_ms": cmd_server.rtt_s * 1e3,
+                        # echo for the station's RTT: rtt = now - cmd_t - cmd_hold_s
+                        "cmd_t": cmd.t,
+                        "cmd_hold_s": now - cmd.rx_time if cmd.rx_time > 0 else None,
+                        "telem_hz": 1.0 / telem_dt,
+                        "telem_bps": telem.rate(now),
+                        "rt": {
+                            "cpus": rt_report["cpus"],
+                            "policy": rt_report["policy"],
+                            "mlock": rt_report["mlock"],
+                            "gc": rt_report["gc"],
+                            "fallback": bool(rt_report["errors"]),
+                            "loop_jitter_p99_ms": jitter["jitter_p99_ms"],
+                            "loop_max_ms": jitter["max_ms"],
+                        },
                         "mode": mode,
+                        "fleet_peers": fleet.peer_count() if fleet is not None else 0,
+                        "collision": cavoid.stats() if cavoid is not None else None,
                     },
                 )
-                telem.send(pkt.to_dict())
+                sent = telem.bytes_sent
+                telem.send(pkt.to_dict(), now)
                 last_telem = now
+                if recorder is not None:
+                    recorder.write("telemetry", TelemetrySample(
+                        now, telem.bytes_sent - sent, 1.0 / telem_dt, drive, h_chassis, h_uwb, h_link, h_loc,
+                        cmd_server.loss, cmd_server.rtt_s,
+                    ))
 
             if now - last_print >= 1.0:
-                st = chassis.get_state()
+                jitter = loop_jitter.stats()
                 print(
-                    f"[status] mode={mode} stale={stale} "
+                    f"[status] mode={mode} stale={stale} drive={DRIVE_NAMES[drive]} "
                     f"cmd(vx={vx_cmd:.3f},wz={wz_cmd:.3f}) "
                     f"state(vx={st.vx:.3f},wz={st.wz:.3f}) "
-                    f"rx={cmd_server.rx_count} err={cmd_server.parse_err}"
+                    f"rx={cmd_server.rx_count} err={cmd_server.parse_err} "
+                    f"telem={1.0 / telem_dt:.1f}Hz/{telem.bps:.0f}B/s"
                 )
                 last_print = now
+                if now - last_jitter_print >= 10.0:
+                    print(format_jitter("main loop", jitter))
+                    last_jitter_print = now
 
             time.sleep(dt)
     except KeyboardInterrupt:
@@ -195,6 +438,10 @@ def main() -> None:
         time.sleep(0.1)
         cmd_server.stop()
         telem.close()
+        if fleet is not None:
+            fleet.stop()
+        if recorder is not None:
+            recorder.close()
         chassis.stop()
         if uwb is not None:
             uwb.stop()
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import math
 import socket
 import threading
 import time
-from dataclasses import dataclass
 from typing import Optional, Tuple
 
-from .protocol import loads
+from car_agent.control.controller import TrackPath
+from car_agent.control.trajectory import Trajectory
+from car_agent.core.types import CmdSample
+
+from .protocol import WIRE_BROADCAST, WIRE_MAGIC, loads, unpack_cmd, wire_car_id
 
 
 def _parse_host_port(s: str) -> Tuple[str, int]:
@@ -14,20 +18,25 @@ def _parse_host_port(s: str) -> Tuple[str, int]:
     return host.strip(), int(port)
 
 
-@dataclass
-class CmdSnapshot:
-    seq: int = 0
-    t: float = 0.0
-    vx: float = 0.0
-    wz: float = 0.0
-    mode: str = "idle"
-    rx_time: float = 0.0
+class CmdSnapshot(CmdSample):
+    __slots__ = ("traj", "path")
+
+    def __init__(
+        self, seq: int = 0, t: float = 0.0, vx: float = 0.0, wz: float = 0.0,
+        mode: str = "idle", rx_time: float = 0.0,
+        traj: Optional[Trajectory] = None, path: Optional[TrackPath] = None,
+    ) -> None:
+        super().__init__(rx_time, t, seq, vx, wz, mode)
+        self.traj = traj
+        self.path = path
 
 
 class UdpCmdServer:
-    def __init__(self, car_id: str, listen: str) -> None:
+    def __init__(self, car_id: str, listen: str, traj_max_horizon_s: float = 2.0) -> None:
         self.car_id = car_id
         self.listen = listen
+        self._wire_dst = WIRE_BROADCAST + (wire_car_id(car_id),)
+        self.traj_max_horizon_s = float(traj_max_horizon_s)
 
         self._sock: Optional[socket.socket] = None
         self._th: Optional[threading.Thread] = None
@@ -40,6 +49,11 @@ class UdpCmdServer:
         self.parse_err = 0
         self.last_sender: Optional[Tuple[str, int]] = None
 
+        # command-link quality: loss from seq gaps, RTT when the station reports it
+        self.loss = 0.0
+        self.rtt_s = 0.0
+        self._last_seq = -1
+
     def start(self) -> None:
         if self._th is not None and self._th.is_alive():
             return
@@ -54,6 +68,14 @@ class UdpCmdServer:
         self._th = threading.Thread(target=self._run, daemon=True)
         self._th.start()
 
+    def _link(self, seq: int, rtt_s: float = 0.0) -> None:
+        if self._last_seq >= 0 and seq > self._last_seq:
+            lost = min(seq - self._last_seq - 1, 100)
+            self.loss += 0.05 * (lost / (lost + 1.0) - self.loss)
+        self._last_seq = seq
+        if rtt_s > 0.0:
+            self.rtt_s = rtt_s
+
     def _run(self) -> None:
         assert self._sock is not None
         while not self._stop.is_set():
@@ -66,25 +88,60 @@ class UdpCmdServer:
 
             self.last_sender = addr
             try:
+                if data[:2] == WIRE_MAGIC:
+                    # compact binary velocity command, no JSON decode on the hot path;
+                    # any other binary kind raises and counts as a parse error
+                    dst, c = unpack_cmd(data)
+                    if dst not in self._wire_dst:
+                        continue
+                    snap = CmdSnapshot(seq=c.seq, t=c.t, vx=c.vx, wz=c.wz, mode=c.mode, rx_time=time.time())
+                    with self._lock:
+                        self._latest = snap
+                    self.rx_count += 1
+                    self._link(c.seq)
+                    continue
+
                 msg = loads(data)
-                if msg.get("type") != "cmd":
+                kind = msg.get("type")
+                if kind not in ("cmd", "traj", "path"):
                     continue
 
                 dst = str(msg.get("car_id", ""))
                 if dst not in ("", "broadcast", self.car_id):
                     continue
 
+                traj = None
+                path = None
+                if kind == "traj":
+                    traj = Trajectory.from_msg(msg, self.traj_max_horizon_s)
+                    vx, wz = traj.vx[0], traj.wz[0]
+                    mode = str(msg.get("mode", "traj"))
+                elif kind == "path":
+                    path = TrackPath.from_msg(msg)
+                    vx, wz = 0.0, 0.0
+                    mode = str(msg.get("mode", "path"))
+                else:
+                    vx = float(msg.get("vx", 0.0))
+                    wz = float(msg.get("wz", 0.0))
+                    if not (math.isfinite(vx) and math.isfinite(wz)):
+                        raise ValueError(f"non-finite command vx={vx} wz={wz}")  # json.loads takes NaN
+                    mode = str(msg.get("mode", "auto"))
+
                 snap = CmdSnapshot(
                     seq=int(msg.get("seq", 0)),
                     t=float(msg.get("t", 0.0)),
-                    vx=float(msg.get("vx", 0.0)),
-                    wz=float(msg.get("wz", 0.0)),
-                    mode=str(msg.get("mode", "auto")),
+                    vx=vx,
+                    wz=wz,
+                    mode=mode,
                     rx_time=time.time(),
+                    traj=traj,
+                    path=path,
                 )
                 with self._lock:
                     self._latest = snap
                 self.rx_count += 1
+                # optional "rtt": the station's own measurement from the cmd_t echo in telemetry
+                self._link(snap.seq, float(msg.get("rtt", 0.0)))
             except Exception:
                 self.parse_err += 1
 
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import math
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from car_agent.core.types import PeerSample
+from car_agent.safety.collision import GridIndex
+
+from .protocol import WIRE_MAGIC, pack_sample, unpack_sample, wire_car_id
+
+
+def _parse_host_port(s: str) -> Tuple[str, int]:
+    host, port = s.rsplit(":", 1)
+    return host.strip(), int(port)
+
+
+class UdpFleetBus:
+    """
+    Car-to-car pose sharing: publishes this car's PeerSample to a broadcast
+    address and keeps the latest sample of every other car in a GridIndex.
+    Ages and extrapolation use the local receive time, so car clocks need
+    not agree. Car ids travel as 8 bytes, so our own broadcast is recognised
+    by the truncated id.
+    """
+
+    def __init__(self, car_id: str, listen: str, peer: str, max_age_s: float = 0.5, cell_m: float = 3.0) -> None:
+        self.car_id = car_id
+        self._wire_id = wire_car_id(car_id).decode("utf-8", "replace")
+        self.listen = listen
+        self.peer = _parse_host_port(peer) if peer else None
+        self.max_age_s = float(max_age_s)
+
+        self._sock: Optional[socket.socket] = None
+        self._tx: Optional[socket.socket] = None
+        self._th: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._lock = threading.Lock()
+        self._index = GridIndex(cell_m)
+        self._latest: Dict[str, Tuple[PeerSample, float]] = {}
+        self._pruned_t = 0.0
+
+        self.rx_count = 0
+        self.parse_err = 0
+
+    def start(self) -> None:
+        if self._th is not None and self._th.is_alive():
+            return
+
+        tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        tx.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        self._tx = tx
+
+        if self.listen:
+            host, port = _parse_host_port(self.listen)
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((host, port))
+            sock.settimeout(0.2)
+            self._sock = sock
+            self._stop.clear()
+            self._th = threading.Thread(target=self._run, daemon=True)
+            self._th.start()
+
+    def _run(self) -> None:
+        assert self._sock is not None
+        while not self._stop.is_set():
+            try:
+                data, _ = self._sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            except Exception:
+                continue
+            if data[:2] != WIRE_MAGIC:
+                continue
+            try:
+                p = unpack_sample(data)
+            except Exception:
+                self.parse_err += 1
+                continue
+            if not isinstance(p, PeerSample):
+                self.parse_err += 1
+                continue
+            if p.car == self._wire_id:
+                continue
+            now = time.time()
+            with self._lock:
+                self._latest[p.car] = (p, now)
+                self._index.update(p.car, p.x, p.y)
+                if now - self._pruned_t >= self.max_age_s:
+                    self._prune(now)
+            self.rx_count += 1
+
+    def _prune(self, now: float) -> None:
+        """Drops peers not heard from for max_age_s; caller holds the lock."""
+        self._pruned_t = now
+        for car in [c for c, (_, rx) in self._latest.items() if now - rx > self.max_age_s]:
+            self._index.remove(car)
+            del self._latest[car]
+
+    def publish(self, sample: PeerSample) -> None:
+        if self._tx is None or self.peer is None:
+            return
+        try:
+            self._tx.sendto(pack_sample(sample), self.peer)
+        except Exception:
+            pass
+
+    def neighbors(self, x: float, y: float, radius: float, now: float) -> List[Tuple[float, float, float, float]]:
+        """(x, y, yaw, vx) of fresh peers within radius, advanced along their heading to now."""
+        out = []
+        r2 = radius * radius
+        with self._lock:
+            for car in self._index.query(x, y, radius):
+                p, rx = self._latest[car]
+                age = now - rx
+                if age > self.max_age_s:
+                    self._index.remove(car)
+                    del self._latest[car]
+                    continue
+                age = max(0.0, age)
+                px = p.x + p.vx * math.cos(p.yaw) * age
+                py = p.y + p.vx * math.sin(p.yaw) * age
+                if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                    out.append((px, py, p.yaw + p.wz * age, p.vx))
+        return out
+
+    def peer_count(self) -> int:
+        """Peers heard from within max_age_s."""
+        with self._lock:
+            self._prune(time.time())
+            return len(self._latest)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._th is not None:
+            self._th.join(timeout=1.0)
+        for s in (self._sock, self._tx):
+            if s is not None:
+                try:
+                    s.close()
+                except Exception:
+                    pass
+        self._th = None
+        self._sock = None
+        self._tx = None
@@ -1,8 +1,76 @@
 from __future__ import annotations
 
 import json
+import math
+import struct
 from dataclasses import asdict, dataclass
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
+
+from car_agent.core.types import ChassisSample, CmdSample, ImuSample, OdomSample, PeerSample, PoseSample, Sample, UwbSample
+
+
+# binary samples: magic, version, kind, then the sample's STRUCT payload
+WIRE_MAGIC = b"CA"
+WIRE_VERSION = 1
+WIRE_HEADER = struct.Struct("<2sBB")
+WIRE_KINDS: Dict[int, type] = {1: ChassisSample, 2: ImuSample, 3: UwbSample, 4: CmdSample, 5: PoseSample, 6: OdomSample, 7: PeerSample}
+_WIRE_KIND_OF = {cls: k for k, cls in WIRE_KINDS.items()}
+
+# addressed velocity command: header, 8-byte destination car id, CmdSample payload.
+# The cmd port only accepts this kind, so a binary command always names its car.
+WIRE_CMD_KIND = 8
+WIRE_DST = struct.Struct("<8s")
+
+
+def wire_car_id(car_id: str) -> bytes:
+    """car_id as it travels in 8-byte wire fields (truncated, NUL padding stripped)."""
+    return car_id.encode("utf-8")[:8].rstrip(b"\0")
+
+
+# destinations every car accepts
+WIRE_BROADCAST = (b"", wire_car_id("broadcast"))
+
+
+def pack_sample(sample: Sample) -> bytes:
+    kind = next(_WIRE_KIND_OF[c] for c in type(sample).__mro__ if c in _WIRE_KIND_OF)
+    buf = bytearray(WIRE_HEADER.size + sample.STRUCT.size)
+    WIRE_HEADER.pack_into(buf, 0, WIRE_MAGIC, WIRE_VERSION, kind)
+    sample.pack_into(buf, WIRE_HEADER.size)
+    return bytes(buf)
+
+
+def unpack_sample(data: bytes) -> Sample:
+    magic, version, kind = WIRE_HEADER.unpack_from(data, 0)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION:
+        raise ValueError(f"bad wire header magic={magic!r} version={version}")
+    cls = WIRE_KINDS.get(kind)
+    if cls is None:
+        raise ValueError(f"unknown wire kind {kind}")
+    return cls.unpack_from(data, WIRE_HEADER.size)
+
+
+def pack_cmd(dst: str, cmd: CmdSample) -> bytes:
+    """dst "" or "broadcast" addresses every car."""
+    off = WIRE_HEADER.size + WIRE_DST.size
+    buf = bytearray(off + cmd.STRUCT.size)
+    WIRE_HEADER.pack_into(buf, 0, WIRE_MAGIC, WIRE_VERSION, WIRE_CMD_KIND)
+    WIRE_DST.pack_into(buf, WIRE_HEADER.size, wire_car_id(dst))
+    cmd.pack_into(buf, off)
+    return bytes(buf)
+
+
+def unpack_cmd(data: bytes) -> Tuple[bytes, CmdSample]:
+    """(destination, command); raises ValueError for anything but an addressed, finite command."""
+    magic, version, kind = WIRE_HEADER.unpack_from(data, 0)
+    if magic != WIRE_MAGIC or version != WIRE_VERSION:
+        raise ValueError(f"bad wire header magic={magic!r} version={version}")
+    if kind != WIRE_CMD_KIND:
+        raise ValueError(f"wire kind {kind} is not an addressed command")
+    (dst,) = WIRE_DST.unpack_from(data, WIRE_HEADER.size)
+    cmd = CmdSample.unpack_from(data, WIRE_HEADER.size + WIRE_DST.size)
+    if not (math.isfinite(cmd.vx) and math.isfinite(cmd.wz)):
+        raise ValueError(f"non-finite command vx={cmd.vx} wz={cmd.wz}")
+    return dst.rstrip(b"\0"), cmd  # type: ignore[return-value]
 
 
 def dumps(obj: Dict[str, Any]) -> bytes:
@@ -28,6 +96,41 @@ class Cmd:
         return d
 
 
+@dataclass
+class TrajCmd:
+    # ts: seconds relative to car-side receive time, same length as vx/wz
+    car_id: str
+    seq: int
+    t: float
+    ts: List[float]
+    vx: List[float]
+    wz: List[float]
+    mode: str = "traj"
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["type"] = "traj"
+        return d
+
+
+@dataclass
+class PathCmd:
+    # waypoints in the UWB frame (m); re-send with the same path_id to keep progress
+    car_id: str
+    seq: int
+    t: float
+    path_id: int
+    xs: List[float]
+    ys: List[float]
+    v: float
+    mode: str = "path"
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["type"] = "path"
+        return d
+
+
 @dataclass
 class Telemetry:
     car_id: str
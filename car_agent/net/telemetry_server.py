@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import socket
-from typing import Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from .protocol import dumps
 
@@ -13,16 +13,186 @@ def _parse_host_port(s: str) -> Tuple[str, int]:
     return host.strip(), int(port)
 
 
+def flatten(d: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Nested dict -> {"a.b.c": leaf}; lists are leaves."""
+    if out is None:
+        out = {}
+    for k, v in d.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flatten(v, key + ".", out)
+        else:
+            out[key] = v
+    return out
+
+
+def unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for key, v in flat.items():
+        node = out
+        *parents, leaf = key.split(".")
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = v
+    return out
+
+
+def quantize(v: Any, digits: int) -> Any:
+    if isinstance(v, float):
+        return round(v, digits)
+    if isinstance(v, list):
+        return [quantize(x, digits) for x in v]
+    return v
+
+
+class TelemetryEncoder:
+    """
+    Keyframe + delta coding of the telemetry dict. A keyframe is the full
+    message; in between, a "telemetry_delta" carries only the leaves whose
+    quantized value differs from the last keyframe. Deltas are relative to the
+    keyframe, not to the previous delta, so losing one costs nothing.
+    """
+
+    def __init__(self, keyframe_s: float = 1.0, digits: int = 3) -> None:
+        self.keyframe_s = float(keyframe_s)
+        self.digits = int(digits)
+        self.kf_id = 0
+        self._kf_t = -1e9
+        self._kf: Dict[str, Any] = {}
+        self.keyframes = 0
+        self.deltas = 0
+
+    def encode(self, now: float, msg: Dict[str, Any]) -> bytes:
+        flat = {k: quantize(v, self.digits) for k, v in flatten(msg).items()}
+        head = {k: flat.pop(k) for k in ("car_id", "t", "seq", "type") if k in flat}
+
+        if now - self._kf_t < self.keyframe_s and flat.keys() == self._kf.keys():
+            changed = {k: v for k, v in flat.items() if v != self._kf[k]}
+            if len(changed) * 2 < len(flat):
+                self.deltas += 1
+                head["type"] = "telemetry_delta"
+                head["kf"] = self.kf_id
+                head["d"] = changed
+                return dumps(head)
+
+        self.kf_id = (self.kf_id + 1) & 0xFFFF
+        self._kf_t = now
+        self._kf = flat
+        self.keyframes += 1
+        full = unflatten(flat)
+        full.update(head)
+        full["kf"] = self.kf_id
+        return dumps(full)
+
+
+class TelemetryDecoder:
+    """Ground-station side of TelemetryEncoder: rebuilds full messages, one keyframe per car."""
+
+    def __init__(self) -> None:
+        self._kf: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+    def decode(self, msg: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        car = str(msg.get("car_id", ""))
+        if msg.get("type") != "telemetry_delta":
+            self._kf[car] = (int(msg.get("kf", 0)), flatten({k: v for k, v in msg.items() if k not in ("car_id", "t", "seq", "type", "kf")}))
+            return msg
+        kf = self._kf.get(car)
+        if kf is None or kf[0] != msg.get("kf"):
+            return None  # keyframe lost; wait for the next one
+        flat = dict(kf[1])
+        flat.update(msg.get("d", {}))
+        full = unflatten(flat)
+        for k in ("car_id", "t", "seq"):
+            full[k] = msg.get(k)
+        full["type"] = "telemetry"
+        return full
+
+
+class TelemetryRate:
+    """
+    Picks the telemetry rate each tick. Activity sets the target: min_hz when
+    idle, base_hz when moving steadily, up to max_hz while speed or yaw rate
+    change fast. Link congestion scales it: halve on high command loss or RTT
+    (at most once per second), creep back up by 10 % per second when clear.
+    """
+
+    def __init__(
+        self,
+        base_hz: float = 20.0,
+        min_hz: float = 2.0,
+        max_hz: float = 30.0,
+        loss_hi: float = 0.05,
+        rtt_hi_s: float = 0.15,
+        accel_hi: float = 1.0,
+    ) -> None:
+        self.base_hz = float(base_hz)
+        self.min_hz = float(min_hz)
+        self.max_hz = max(float(max_hz), self.min_hz)
+        self.loss_hi = float(loss_hi)
+        self.rtt_hi_s = float(rtt_hi_s)
+        self.accel_hi = float(accel_hi)
+
+        self.backoff = 1.0
+        self.hz = self.base_hz
+        self._last_t = 0.0
+        self._last_v = 0.0
+        self._last_w = 0.0
+        self._change = 0.0
+        self._last_adjust = 0.0
+
+    def update(self, now: float, vx: float, wz: float, idle: bool, loss: float, rtt_s: float) -> float:
+        dt = now - self._last_t
+        if 0.0 < dt < 0.5:
+            rate = abs(vx - self._last_v) / dt + 0.3 * abs(wz - self._last_w) / dt
+            self._change += 0.2 * (rate - self._change)
+        self._last_t, self._last_v, self._last_w = now, vx, wz
+
+        if idle and self._change < 0.05 * self.accel_hi:
+            target = self.min_hz
+        else:
+            k = min(1.0, self._change / self.accel_hi)
+            target = self.base_hz + k * (self.max_hz - self.base_hz)
+
+        if now - self._last_adjust >= 1.0:
+            self._last_adjust = now
+            if loss > self.loss_hi or (rtt_s > 0.0 and rtt_s > self.rtt_hi_s):
+                self.backoff = max(0.1, self.backoff * 0.5)
+            else:
+                self.backoff = min(1.0, self.backoff + 0.1)
+
+        self.hz = max(self.min_hz, min(self.max_hz, target * self.backoff))
+        return self.hz
+
+
 class UdpTelemetryClient:
-    def __init__(self, peer: str) -> None:
+    def __init__(self, peer: str, encoder: Optional[TelemetryEncoder] = None) -> None:
         self.peer = _parse_host_port(peer)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.encoder = encoder
 
-    def send(self, obj: dict) -> None:
+        self.bytes_sent = 0
+        self.packets = 0
+        self.bps = 0.0
+        self._bps_t = 0.0
+        self._bps_bytes = 0
+
+    def send(self, obj: dict, now: float = 0.0) -> None:
+        data = self.encoder.encode(now, obj) if self.encoder is not None else dumps(obj)
         try:
-            self.sock.sendto(dumps(obj), self.peer)
+            self.sock.sendto(data, self.peer)
         except Exception:
-            pass
+            return
+        self.bytes_sent += len(data)
+        self.packets += 1
+
+    def rate(self, now: float) -> float:
+        """Bytes/s sent, averaged over windows of at least one second."""
+        if self._bps_t <= 0.0:
+            self._bps_t, self._bps_bytes = now, self.bytes_sent
+        elif now - self._bps_t >= 1.0:
+            self.bps = (self.bytes_sent - self._bps_bytes) / (now - self._bps_t)
+            self._bps_t, self._bps_bytes = now, self.bytes_sent
+        return self.bps
 
     def close(self) -> None:
         try:
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class GridIndex:
+    """
+    Uniform hash grid over the plane. Updates move one key between cells and a
+    query only visits the cells overlapping the search disc, so the cost per
+    tick follows local density, not fleet size.
+    """
+
+    def __init__(self, cell_m: float) -> None:
+        self.cell_m = float(cell_m)
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return (math.floor(x / self.cell_m), math.floor(y / self.cell_m))
+
+    def update(self, key: Hashable, x: float, y: float) -> None:
+        c = self._cell(x, y)
+        old = self._where.get(key)
+        if old == c:
+            return
+        if old is not None:
+            self._discard(key, old)
+        self._cells.setdefault(c, set()).add(key)
+        self._where[key] = c
+
+    def remove(self, key: Hashable) -> None:
+        old = self._where.pop(key, None)
+        if old is not None:
+            self._discard(key, old)
+
+    def _discard(self, key: Hashable, c: Tuple[int, int]) -> None:
+        bucket = self._cells.get(c)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[c]
+
+    def query(self, x: float, y: float, radius: float) -> List[Hashable]:
+        """Keys in every cell overlapping the disc; callers do the exact distance test."""
+        cx0, cy0 = self._cell(x - radius, y - radius)
+        cx1, cy1 = self._cell(x + radius, y + radius)
+        out: List[Hashable] = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells.get((cx, cy))
+                if bucket:
+                    out.extend(bucket)
+        return out
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+
+def time_to_collision(p: np.ndarray, v: np.ndarray, radius: float) -> np.ndarray:
+    """
+    Earliest t >= 0 with |p + v t| = radius, per row; inf if the gap never
+    closes to radius. p is the other body's position relative to us, v its
+    velocity relative to us. Already overlapping and closing gives 0.
+    """
+    a = (v * v).sum(axis=1)
+    b = 2.0 * (p * v).sum(axis=1)
+    c = (p * p).sum(axis=1) - radius * radius
+    disc = b * b - 4.0 * a * c
+    closing = b < 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / (2.0 * a)
+    t = np.where(closing & (disc >= 0.0) & (a > 1e-12), np.maximum(t, 0.0), np.inf)
+    return np.where(c <= 0.0, np.where(closing, 0.0, np.inf), t)
+
+
+class CollisionFilter:
+    """
+    Sits between the command source and ChassisDriver.set_cmd. For each nearby
+    car (and local range points, when a sensor supplies them) it computes the
+    time to collision under the commanded forward speed and scales that speed
+    down between ttc_slow_s and ttc_stop_s, stopping below ttc_stop_s. A
+    neighbour only counts if driving makes its TTC worse than standing still,
+    so the car is never blocked from moving away. Yaw rate is passed through.
+    """
+
+    def __init__(
+        self,
+        car_radius_m: float = 0.2,
+        ttc_stop_s: float = 0.6,
+        ttc_slow_s: float = 2.0,
+        neighbor_radius_m: float = 3.0,
+    ) -> None:
+        self.car_radius_m = float(car_radius_m)
+        self.ttc_stop_s = float(ttc_stop_s)
+        self.ttc_slow_s = max(float(ttc_slow_s), self.ttc_stop_s + 1e-3)
+        self.neighbor_radius_m = float(neighbor_radius_m)
+
+        self.ticks = 0
+        self.interventions = 0
+        self.min_ttc = math.inf
+        self.neighbors = 0
+        self._win_ticks = 0
+        self._win_interventions = 0
+        self._win_lat_sum = 0.0
+        self._win_lat_max = 0.0
+
+    def _scale(self, ttc_cmd: np.ndarray, ttc_idle: np.ndarray) -> float:
+        worse = ttc_cmd < ttc_idle
+        if not worse.any():
+            return 1.0
+        t = float(ttc_cmd[worse].min())
+        self.min_ttc = min(self.min_ttc, t)
+        return min(1.0, max(0.0, (t - self.ttc_stop_s) / (self.ttc_slow_s - self.ttc_stop_s)))
+
+    def filter(
+        self,
+        vx: float,
+        wz: float,
+        x: float,
+        y: float,
+        yaw: float,
+        peers: Iterable[Tuple[float, float, float, float]] = (),
+        points: Optional[np.ndarray] = None,
+        t_start: Optional[float] = None,
+    ) -> Tuple[float, float]:
+        """
+        peers: (x, y, yaw, vx) of nearby cars in the world frame, already
+        extrapolated to now. points: (K, 2) static obstacle points in the body
+        frame (x forward). t_start: perf_counter() taken before the neighbour
+        lookup, so the reported latency covers it. Returns the filtered (vx, wz).
+        """
+        t0 = time.perf_counter() if t_start is None else t_start
+        scale = 1.0
+        c, s = math.cos(yaw), math.sin(yaw)
+
+        nb = np.asarray(list(peers), dtype=np.float64).reshape(-1, 4)
+        self.neighbors = len(nb)
+        if len(nb) and vx != 0.0:
+            p = nb[:, 0:2] - (x, y)
+            v_other = nb[:, 3:4] * np.column_stack([np.cos(nb[:, 2]), np.sin(nb[:, 2])])
+            r = 2.0 * self.car_radius_m
+            ttc_cmd = time_to_collision(p, v_other - (vx * c, vx * s), r)
+            ttc_idle = time_to_collision(p, v_other, r)
+            scale = min(scale, self._scale(ttc_cmd, ttc_idle))
+
+        if points is not None and len(points) and vx != 0.0:
+            pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+            ttc_cmd = time_to_collision(pts, np.tile((-vx, 0.0), (len(pts), 1)), self.car_radius_m)
+            scale = min(scale, self._scale(ttc_cmd, np.full(len(pts), np.inf)))
+
+        self.ticks += 1
+        self._win_ticks += 1
+        if scale < 1.0:
+            self.interventions += 1
+            self._win_interventions += 1
+        lat = time.perf_counter() - t0
+        self._win_lat_sum += lat
+        self._win_lat_max = max(self._win_lat_max, lat)
+        return vx * scale, wz
+
+    def stats(self) -> Dict[str, float]:
+        """Intervention rate and filter latency since the previous call."""
+        n = max(1, self._win_ticks)
+        out = {
+            "rate": self._win_interventions / n,
+            "lat_us": 1e6 * self._win_lat_sum / n,
+            "lat_max_us": 1e6 * self._win_lat_max,
+            "neighbors": self.neighbors,
+            "min_ttc_s": self.min_ttc if math.isfinite(self.min_ttc) else -1.0,
+            "interventions": self.interventions,
+        }
+        self._win_ticks = 0
+        self._win_interventions = 0
+        self._win_lat_sum = 0.0
+        self._win_lat_max = 0.0
+        self.min_ttc = math.inf
+        return out
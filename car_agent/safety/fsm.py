@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from car_agent.safety.limits import clamp
+from car_agent.safety.watchdog import DEGRADED, FAILED
+
+
+DRIVE_NORMAL = 0
+DRIVE_LIMITED = 1
+DRIVE_STOP = 2
+DRIVE_NAMES: Tuple[str, ...] = ("normal", "limited", "stop")
+
+
+class DriveFsm:
+    """
+    Maps subsystem health to what the loop may command:
+      chassis failed                       -> stop (no feedback, nothing to close the loop on)
+      localization failed while on a path  -> stop (the tracker would steer on dead reckoning alone)
+      localization degraded or failed      -> limited to v_limited / w_limited
+      otherwise                            -> normal
+    Link health is not an input: stale commands already stop the car through
+    cmd_timeout_s, path_timeout_s and the trajectory horizon.
+    """
+
+    def __init__(self, v_limited: float = 0.3, w_limited: float = 0.8) -> None:
+        self.v_limited = float(v_limited)
+        self.w_limited = float(w_limited)
+        self.mode = DRIVE_STOP
+        self.changes = 0
+
+    def update(self, chassis: int, loc: int, on_path: bool) -> int:
+        if chassis == FAILED or (on_path and loc == FAILED):
+            mode = DRIVE_STOP
+        elif loc in (DEGRADED, FAILED):
+            mode = DRIVE_LIMITED
+        else:
+            mode = DRIVE_NORMAL
+        if mode != self.mode:
+            self.mode = mode
+            self.changes += 1
+        return mode
+
+    def apply(self, vx: float, wz: float) -> Tuple[float, float]:
+        if self.mode == DRIVE_STOP:
+            return 0.0, 0.0
+        if self.mode == DRIVE_LIMITED:
+            return clamp(vx, -self.v_limited, self.v_limited), clamp(wz, -self.w_limited, self.w_limited)
+        return vx, wz
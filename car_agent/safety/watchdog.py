@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+
+# health enums, sent as ints in telemetry
+OK = 0
+DEGRADED = 1
+FAILED = 2
+OFF = 3
+HEALTH_NAMES: Tuple[str, ...] = ("ok", "degraded", "failed", "off")
+
+# order of the per-subsystem states in telemetry health["sub"]
+SUBSYSTEMS: Tuple[str, ...] = ("chassis", "uwb", "link", "loc")
+
+
+class HealthMonitor:
+    """
+    ok / degraded / failed for one subsystem from frame age, frame rate and
+    error counters. Getting worse takes effect on the tick it is seen;
+    getting better needs the better condition to hold for recover_s, so a
+    flapping link does not toggle the drive mode.
+    """
+
+    __slots__ = (
+        "name", "degraded_age_s", "failed_age_s", "min_hz", "recover_s",
+        "state", "rate_hz", "transitions",
+        "_better_since", "_last_errors", "_win_t", "_win_count",
+    )
+
+    def __init__(
+        self, name: str, degraded_age_s: float, failed_age_s: float, min_hz: float = 0.0, recover_s: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.degraded_age_s = float(degraded_age_s)
+        self.failed_age_s = float(failed_age_s)
+        self.min_hz = float(min_hz)
+        self.recover_s = float(recover_s)
+
+        self.state = FAILED  # nothing heard yet
+        self.rate_hz: Optional[float] = None
+        self.transitions = 0
+        self._better_since: Optional[float] = None
+        self._last_errors = 0
+        self._win_t = 0.0
+        self._win_count = 0
+
+    def update(
+        self, now: float, age_s: float, count: int, errors: int = 0, alive: bool = True, degraded: bool = False,
+    ) -> int:
+        """age_s: since the last frame (inf if none); count, errors: running totals; degraded: external reason."""
+        if self._win_t <= 0.0:
+            self._win_t, self._win_count = now, count
+        elif now - self._win_t >= 1.0:
+            self.rate_hz = (count - self._win_count) / (now - self._win_t)
+            self._win_t, self._win_count = now, count
+
+        raw = OK
+        if not alive or not math.isfinite(age_s) or age_s > self.failed_age_s:
+            raw = FAILED
+        elif (
+            degraded
+            or age_s > self.degraded_age_s
+            or errors > self._last_errors
+            or (self.rate_hz is not None and self.rate_hz < self.min_hz)
+        ):
+            raw = DEGRADED
+        self._last_errors = errors
+
+        if raw >= self.state:
+            self._better_since = None
+            if raw != self.state:
+                self.state = raw
+                self.transitions += 1
+        elif self._better_since is None:
+            self._better_since = now
+        elif now - self._better_since >= self.recover_s:
+            self._better_since = None
+            self.state = raw
+            self.transitions += 1
+        return self.state
@@ -1,34 +1,32 @@
 from __future__ import annotations
 
+import multiprocessing
 import time
-from dataclasses import dataclass
 from multiprocessing import Process, shared_memory
-from typing import Optional
+from typing import Any, Optional, Tuple
 
 import numpy as np
 
-from . import uwb_serial_io
-
-
-@dataclass
-class UwbState:
-    x: float = 0.0
-    y: float = 0.0
-    vx: float = 0.0
-    vy: float = 0.0
-    stamp: float = 0.0
-    err: int = 1
-    rx_age_s: float = 1e9
+from car_agent.core.rt import Placement
+from car_agent.core.seqlock import snapshot
+from car_agent.core.types import UwbRanges, UwbSample
 
+from . import uwb_serial_io
 
 class UwbAdapter:
-    def __init__(self, serial_port: str, baudrate: int = 921600) -> None:
+    def __init__(
+        self, serial_port: str, baudrate: int = 921600,
+        mp_context: Optional[Any] = None, placement: Optional[Placement] = None, backend: str = "pyserial",
+    ) -> None:
         self.serial_port = serial_port
+        self.placement = placement
+        self.backend = backend
         self.baudrate = int(baudrate)
 
         self._shm: Optional[shared_memory.SharedMemory] = None
         self._arr: Optional[np.ndarray] = None
         self._proc: Optional[Process] = None
+        self._ctx = mp_context if mp_context is not None else multiprocessing.get_context()
 
     def start(self) -> None:
         if self._proc is not None and self._proc.is_alive():
@@ -38,9 +36,9 @@ class UwbAdapter:
         self._arr = arr
         self._shm = shm
 
-        self._proc = Process(
+        self._proc = self._ctx.Process(
             target=uwb_serial_io.read_UWB,
-            args=(self._arr.shape, self._arr.dtype, self._shm.name, self.serial_port, self.baudrate),
+            args=(self._arr.shape, self._arr.dtype, self._shm.name, self.serial_port, self.baudrate, self.placement, self.backend),
             daemon=True,
         )
         self._proc.start()
@@ -48,19 +46,41 @@ class UwbAdapter:
     def is_alive(self) -> bool:
         return self._proc is not None and self._proc.is_alive()
 
-    def get_latest(self) -> UwbState:
+    def get_latest(self) -> UwbSample:
         if self._arr is None:
-            return UwbState()
+            return UwbSample()
 
-        a = self._arr.copy()
-        x, y, vx, vy, stamp, err = float(a[0]), float(a[1]), float(a[2]), float(a[3]), float(a[4]), int(a[5])
+        s = snapshot(self._arr, uwb_serial_io.UWB_SEQ_IDX)
+        x, y, vx, vy, stamp = s[0:5].tolist()
+        err = s[-1]
 
         age = 1e9
         now = time.time()
         if stamp > 1e-6:
             age = max(0.0, now - stamp)
 
-        return UwbState(x=x, y=y, vx=vx, vy=vy, stamp=stamp, err=err, rx_age_s=age)
+        return UwbSample(stamp, x, y, vx, vy, int(err), age)
+
+    def get_ranges(self) -> Optional[UwbRanges]:
+        """Anchor ranges from the latest frame, or None before the first frame."""
+        if self._arr is None:
+            return None
+        s = snapshot(self._arr, uwb_serial_io.UWB_SEQ_IDX)
+        if s[-1] != 0.0:
+            return None
+        dis = s[uwb_serial_io.UWB_DIS_SLICE]
+        dis[dis <= 0.0] = np.nan  # 0 表示该基站无测距
+        return UwbRanges(
+            float(s[uwb_serial_io.UWB_STAMP_IDX]), int(s[uwb_serial_io.UWB_TAG_ID_IDX]),
+            dis, s[uwb_serial_io.UWB_EOP_SLICE], float(s[uwb_serial_io.UWB_Z_IDX]),
+        )
+
+    def rx_stats(self) -> Tuple[int, float]:
+        """(frames published, first-byte -> publish latency of the last frame in s)."""
+        if self._arr is None:
+            return 0, 0.0
+        s = snapshot(self._arr, uwb_serial_io.UWB_SEQ_IDX)
+        return int(s[uwb_serial_io.UWB_COUNT_IDX]), float(s[uwb_serial_io.UWB_PUB_LAT_IDX])
 
     def stop(self) -> None:
         if self._proc is not None and self._proc.is_alive():
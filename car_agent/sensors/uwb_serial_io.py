@@ -3,13 +3,30 @@ from __future__ import annotations
 import time
 from multiprocessing import shared_memory
 import numpy as np
-import serial
 import logging
 
+from car_agent.core.rt import JitterMeter, apply_placement, format_jitter, format_report
+from car_agent.core.seqlock import write_begin, write_end
+from car_agent.core.transport import open_transport
+
+
+# 共享内存布局: x, y, vx, vy, stamp(帧首字节接收时间), pub_lat(发布延迟 s), count(帧计数),
+# z, tag_id, eop(x,y,z 位置精度估计 m), dis[8](各基站测距 m, 0 表示无测距), seq(序列锁计数), err(始终在最后)
+UWB_ANCHORS = 8
+UWB_SHM_LEN = 22
+UWB_STAMP_IDX = 4
+UWB_PUB_LAT_IDX = 5
+UWB_COUNT_IDX = 6
+UWB_Z_IDX = 7
+UWB_TAG_ID_IDX = 8
+UWB_EOP_SLICE = slice(9, 12)
+UWB_DIS_SLICE = slice(12, 12 + UWB_ANCHORS)
+UWB_SEQ_IDX = 20
+assert UWB_DIS_SLICE.stop == UWB_SEQ_IDX and UWB_SEQ_IDX == UWB_SHM_LEN - 2  # err 始终在最后
+
 
 def init_UWB_shm():
-    # 布局: x, y, vx, vy, stamp, err
-    a = np.zeros(6, dtype=np.float64)
+    a = np.zeros(UWB_SHM_LEN, dtype=np.float64)
     shm = shared_memory.SharedMemory(create=True, size=a.nbytes)
     b = np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)
     b[:] = a[:]
@@ -34,7 +51,101 @@ def Uwb_Handle(frame: bytes):
     return pos_X, pos_Y, velocity_X, velocity_Y
 
 
-def read_UWB(shape, dtype, buffer_name: str, COM_name: str = "/dev/ttyCH343USB1", baudrate: int = 921600):
+UWB_FRAME_LEN = 128
+UWB_FRAME_HEAD = b"\x55\x01"
+
+# 完整的 Tag Frame0 解码结果，一帧一条记录
+UWB_FRAME_DTYPE = np.dtype([
+    ("tag_id", "u1"), ("role", "u1"),
+    ("pos", "<f8", (3,)),          # m
+    ("vel", "<f8", (3,)),          # m/s
+    ("dis", "<f8", (UWB_ANCHORS,)),  # 各基站测距 m，0 表示该基站无测距
+    ("gyro", "<f4", (3,)),         # rad/s
+    ("acc", "<f4", (3,)),          # m/s^2
+    ("angle", "<f4", (3,)),        # deg
+    ("quat", "<f4", (4,)),
+    ("local_time", "<u4"),         # ms
+    ("system_time", "<u4"),        # ms
+    ("eop", "<f8", (3,)),          # 位置精度估计 m，越小越好
+    ("voltage", "<f4"),            # V
+])
+
+
+def _int24_cols(raw: np.ndarray, offset: int, n: int) -> np.ndarray:
+    """raw (帧数, 128) uint8 中从 offset 起 n 个小端 int24，返回 (帧数, n) int32。"""
+    b = raw[:, offset:offset + 3 * n].reshape(len(raw), n, 3).astype(np.int32)
+    v = b[..., 0] | (b[..., 1] << 8) | (b[..., 2] << 16)
+    return (v ^ 0x800000) - 0x800000
+
+
+def decode_UWB_frames(frames) -> np.ndarray:
+    """
+    把一帧或多帧（bytes 或 bytes 列表，已校验）解码成 UWB_FRAME_DTYPE 记录数组，整批向量化。
+    离线读录包、回放和地面站聚合时可以一次解几千帧；单帧调用开销大，在线循环用 decode_UWB_fix。
+    """
+    if isinstance(frames, (bytes, bytearray, memoryview)):
+        frames = [frames]
+    raw = np.frombuffer(b"".join(frames), dtype=np.uint8).reshape(-1, UWB_FRAME_LEN)
+    out = np.zeros(len(raw), dtype=UWB_FRAME_DTYPE)
+    out["tag_id"] = raw[:, 2]
+    out["role"] = raw[:, 3]
+    out["pos"] = _int24_cols(raw, 4, 3) / 1000.0
+    out["vel"] = _int24_cols(raw, 13, 3) / 10000.0
+    out["dis"] = _int24_cols(raw, 22, UWB_ANCHORS) / 1000.0
+    floats = np.ascontiguousarray(raw[:, 46:70]).view("<f4")
+    out["gyro"] = floats[:, 0:3]
+    out["acc"] = floats[:, 3:6]
+    out["angle"] = np.ascontiguousarray(raw[:, 82:88]).view("<i2") / 100.0
+    out["quat"] = np.ascontiguousarray(raw[:, 88:104]).view("<f4")
+    out["local_time"] = np.ascontiguousarray(raw[:, 108:112]).view("<u4")[:, 0]
+    out["system_time"] = np.ascontiguousarray(raw[:, 112:116]).view("<u4")[:, 0]
+    out["eop"] = raw[:, 117:120] / 100.0
+    out["voltage"] = np.ascontiguousarray(raw[:, 120:122]).view("<u2")[:, 0] / 1000.0
+    return out
+
+
+_UWB_FIX_INT24 = (4, 7, 10, 13, 16) + tuple(22 + 3 * i for i in range(UWB_ANCHORS))  # x y z vx vy, dis[8]
+
+
+def decode_UWB_fix(frame: bytes):
+    """
+    在线循环用的单帧解码，只取发布到共享内存的字段，不经 numpy:
+    (tag_id, x, y, z, vx, vy, dis[8], eop[3])。gyro/acc/quat 等只在离线批量解码里取。
+    """
+    x, y, z, vx, vy, *dis = [int.from_bytes(frame[o:o + 3], "little", signed=True) for o in _UWB_FIX_INT24]
+    return (
+        frame[2], x / 1000.0, y / 1000.0, z / 1000.0, vx / 10000.0, vy / 10000.0,
+        [d / 1000.0 for d in dis], [e / 100.0 for e in frame[117:120]],
+    )
+
+
+def split_UWB_frames(buf: bytes, min_buffered: int = UWB_FRAME_LEN - 1, check: bool = True, starts=None):
+    """
+    从缓存中切出完整的 UWB 帧（帧头 0x55 0x01，末字节为前 127 字节累加和）。
+    最后一个字节一到就切出；返回 (帧列表, 剩余未解析字节)。starts 非空时追加每帧在 buf 中的起点。
+    """
+    frames = []
+    start_index = 0
+    count = len(buf)
+    while count > min_buffered:
+        end = start_index + UWB_FRAME_LEN
+        if (buf[start_index] == 0x55 and buf[start_index + 1] == 0x01
+                and (not check or sum(buf[start_index:end - 1]) & 0xFF == buf[end - 1])):
+            frames.append(buf[start_index:end])
+            if starts is not None:
+                starts.append(start_index)
+            start_index = end
+            count -= UWB_FRAME_LEN
+        else:
+            start_index += 1
+            count -= 1
+    return frames, buf[start_index:]
+
+
+def read_UWB(
+    shape, dtype, buffer_name: str, COM_name: str = "/dev/ttyCH343USB1", baudrate: int = 921600,
+    placement=None, backend: str = "pyserial",
+):
     existing_shm = shared_memory.SharedMemory(name=buffer_name)
     shared_numpy = np.ndarray(shape, dtype=dtype, buffer=existing_shm.buf)
     shared_numpy[-1] = 1.0
@@ -46,55 +157,65 @@ def read_UWB(shape, dtype, buffer_name: str, COM_name: str = "/dev/ttyCH343USB1"
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
     logger.info("=======UWB准备开始=======")
+    if placement is not None:
+        logger.info(format_report("uwb", apply_placement(placement)))
 
     try:
-        with serial.Serial(
-            COM_name,
-            baudrate,
-            bytesize=serial.EIGHTBITS,
-            parity=serial.PARITY_NONE,
-            stopbits=serial.STOPBITS_ONE,
-            timeout=0.001,
-        ) as ser:
-            if not ser.isOpen():
-                ser.open()
-            ser.reset_input_buffer()
-            ser.reset_output_buffer()
-
-            temp_sum = b""
-
-            while True:
-                orgin_data = bytes.fromhex(ser.read(150).hex())
-                temp_sum = temp_sum + orgin_data
-
-                start_index = 0
-                count = len(temp_sum)
-
-                while count > 200:
-                    if temp_sum[start_index] == 0x55 and temp_sum[start_index + 1] == 0x01:
-                        frame = temp_sum[start_index : start_index + 128]
-                        pos_X, pos_Y, vx, vy = Uwb_Handle(frame)
-
-                        now = time.time()
-                        shared_numpy[0] = float(pos_X)
-                        shared_numpy[1] = float(pos_Y)
-                        shared_numpy[2] = float(vx)
-                        shared_numpy[3] = float(vy)
-                        shared_numpy[4] = float(now)
-                        shared_numpy[5] = 0.0  # err=0
-
-                        start_index += 128
-                        count -= 128
-                    else:
-                        start_index += 1
-                        count -= 1
-
-                temp_sum = temp_sum[start_index:]
+        # COM_name 可带前缀选后端: raw:/dev/ttyX, replay:/path.bin（loopback: 无人喂数据，这里不允许）
+        with open_transport(COM_name, baudrate, backend=backend, timeout_s=0.001) as ser:
+            ser.reset_input()
+            UWB_loop(ser, shared_numpy, logger)
 
     except Exception as e:
         logger.error(f"UWB serial loop crashed: {e}")
         try:
-            shared_numpy[5] = 1.0
+            shared_numpy[-1] = 1.0
         except Exception:
             pass
         raise
+
+
+def UWB_loop(ser, shared_numpy, logger=None, stop_at_eof: bool = False) -> int:
+    """UWB 接收主循环，ser 为任意 Transport。stop_at_eof=True 时回放结束即返回帧数（用于基准测试）。"""
+    temp_sum = b""
+    temp_t = 0.0  # temp_sum 首字节到达时那次 read 的时间戳
+    frame_count = 0
+    starts = []
+    jitter = JitterMeter(0.0)
+    next_report_t = time.time() + 10.0
+
+    while not (stop_at_eof and ser.eof):
+        orgin_data = ser.read(150)
+        if not orgin_data:
+            continue
+        t_read = time.time()  # 在 read 返回处打时间戳
+        if not temp_sum:
+            temp_t = t_read
+        chunk_start = len(temp_sum)
+        temp_sum = temp_sum + orgin_data
+
+        # 帧的最后一个字节一到就立即解析发布，不再攒够 200 字节
+        del starts[:]
+        frames, temp_sum = split_UWB_frames(temp_sum, starts=starts)
+        for frame, start in zip(frames, starts):
+            tag_id, x, y, z, vx, vy, dis, eop = decode_UWB_fix(frame)
+            stamp = t_read if start >= chunk_start else temp_t
+            jitter.tick(stamp)
+            frame_count += 1
+            write_begin(shared_numpy, UWB_SEQ_IDX)  # 序列锁：整帧写完前读者会重试
+            shared_numpy[0:4] = (x, y, vx, vy)
+            shared_numpy[UWB_Z_IDX] = z
+            shared_numpy[UWB_TAG_ID_IDX] = tag_id
+            shared_numpy[UWB_EOP_SLICE] = eop
+            shared_numpy[UWB_DIS_SLICE] = dis
+            shared_numpy[UWB_STAMP_IDX] = stamp
+            shared_numpy[UWB_COUNT_IDX] = frame_count
+            shared_numpy[-1] = 0.0  # err=0
+            shared_numpy[UWB_PUB_LAT_IDX] = time.time() - stamp
+            write_end(shared_numpy, UWB_SEQ_IDX)
+        if len(temp_sum) <= len(orgin_data):
+            temp_t = t_read
+        if logger is not None and t_read >= next_report_t:
+            next_report_t = t_read + 10.0
+            logger.info(format_jitter("uwb frames", jitter.stats()))
+    return frame_count
@@ -0,0 +1,412 @@
+# run from the repo root: python -m scripts.bench_decoders [--no-bench]
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from car_agent.chassis.shm_layout import SHM_LEN
+from car_agent.chassis.wheeltec_serial_io import (
+    CAR_FRAME_HEAD,
+    CAR_FRAME_LEN,
+    CAR_Handle,
+    CAR_loop,
+    Command_Trans,
+    bcc_xor,
+    hex_to_int,
+    int_to_hex16,
+    split_CAR_frames,
+)
+from car_agent.core.transport import LoopbackTransport, PySerialTransport, RawFdTransport, ReplayTransport
+from car_agent.sensors.uwb_serial_io import (
+    UWB_ANCHORS, UWB_COUNT_IDX, UWB_FRAME_LEN, UWB_SHM_LEN, Uwb_Handle, UWB_loop,
+    decode_UWB_fix, decode_UWB_frames, hex_to_int24, split_UWB_frames,
+)
+
+
+# ---- golden byte streams -------------------------------------------------
+
+# vx=155mm/s vy=-33mm/s ax=1672 ay=-1672 az=16384 wz=3753 voltage=12000mV
+GOLDEN_CAR_FRAME = bytes.fromhex("7b00009bffdf00000688f9784000000000000ea92ee0e67d")
+GOLDEN_CAR_VALUES = (0.155, -0.033, 0.0, 1.0, -1.0, 16384 / 1672.0, 0.0, 0.0, 1.0)
+
+GOLDEN_CMD = [
+    ((0.1, 0.0, 0.5), bytes.fromhex("7b00000064000001f4ea7d")),
+    ((-0.25, 0.0, -1.2), bytes.fromhex("7b0000ff060000fb50297d")),
+]
+
+# tag frame0: x=1.234m y=-0.5m vx=0.25m/s vy=-0.1m/s, zero padded, sum checksum 0x17
+_GOLDEN_UWB_HEAD = bytes.fromhex("55010002d204000cfeff000000c4090018fcff000000")
+GOLDEN_UWB_FRAME = _GOLDEN_UWB_HEAD + bytes(UWB_FRAME_LEN - 1 - len(_GOLDEN_UWB_HEAD)) + b"\x17"
+GOLDEN_UWB_VALUES = (1.234, -0.5, 0.25, -0.1)
+
+
+# ---- encoders used to generate streams ------------------------------------
+
+def encode_car_frame(raw: Sequence[int], voltage_mv: int = 12000) -> bytes:
+    body = bytes([CAR_FRAME_HEAD, 0x00]) + b"".join(int_to_hex16(v) for v in raw) + int_to_hex16(voltage_mv)
+    return body + bytes([bcc_xor(body), 0x7D])
+
+
+def int24_le(v: int) -> bytes:
+    return (v & 0xFFFFFF).to_bytes(3, "little")
+
+
+def encode_uwb_frame(x_mm: int, y_mm: int, vx: int, vy: int, dis_mm: Sequence[int] = (), eop: Sequence[int] = (0, 0, 0)) -> bytes:
+    head = b"\x55\x01\x00\x02" + int24_le(x_mm) + int24_le(y_mm) + int24_le(0) + int24_le(vx) + int24_le(vy) + int24_le(0)
+    dis = list(dis_mm) + [0] * (UWB_ANCHORS - len(dis_mm))
+    head += b"".join(int24_le(d) for d in dis)
+    body = bytearray(head + bytes(UWB_FRAME_LEN - 1 - len(head)))
+    body[117:120] = bytes(eop)
+    return bytes(body) + bytes([sum(body) & 0xFF])
+
+
+def car_expected(raw: Sequence[int]) -> Tuple[float, ...]:
+    return tuple(
+        [r / 1000.0 for r in raw[0:3]] + [r / 1672.0 for r in raw[3:6]] + [r / 3753.0 for r in raw[6:9]]
+    )
+
+
+def garbage(rng: random.Random, n: int) -> bytes:
+    return bytes(rng.randrange(256) for _ in range(n))
+
+
+# ---- checks ----------------------------------------------------------------
+
+class Report:
+    def __init__(self) -> None:
+        self.failures: List[str] = []
+        self.passed = 0
+
+    def check(self, name: str, ok: bool, detail: str = "") -> None:
+        if ok:
+            self.passed += 1
+        else:
+            self.failures.append(f"{name}: {detail}")
+            print(f"[FAIL] {name}: {detail}")
+
+
+def close(a: Sequence[float], b: Sequence[float], tol: float = 1e-9) -> bool:
+    return len(a) == len(b) and all(abs(x - y) <= tol for x, y in zip(a, b))
+
+
+def check_golden(rep: Report) -> None:
+    rep.check("hex_to_int golden", hex_to_int(b"\xFF\xDF") == -33 and hex_to_int(b"\x00\x9B") == 155)
+    rep.check("int_to_hex16 golden", int_to_hex16(-33) == b"\xFF\xDF" and int_to_hex16(155) == b"\x00\x9B")
+    rep.check("bcc_xor golden", bcc_xor(bytes([0x7B, 0x00, 0x00, 0x64])) == 0x1F)
+    try:
+        int_to_hex16(0x8000)
+        rep.check("int_to_hex16 range", False, "no ValueError for 32768")
+    except ValueError:
+        rep.check("int_to_hex16 range", True)
+
+    for cmd, frame in GOLDEN_CMD:
+        got = Command_Trans(cmd)
+        rep.check(f"Command_Trans{cmd}", got == frame, f"{got.hex()} != {frame.hex()}")
+
+    rep.check("CAR_Handle golden", close(CAR_Handle(GOLDEN_CAR_FRAME), GOLDEN_CAR_VALUES), str(CAR_Handle(GOLDEN_CAR_FRAME)))
+    rep.check("Uwb_Handle golden", close(Uwb_Handle(GOLDEN_UWB_FRAME), GOLDEN_UWB_VALUES), str(Uwb_Handle(GOLDEN_UWB_FRAME)))
+    bad = bytearray(GOLDEN_CAR_FRAME)
+    bad[5] ^= 0x01
+    rep.check("CAR bad BCC rejected", split_CAR_frames(bytes(bad))[0] == [], "corrupted frame accepted")
+    bad = bytearray(GOLDEN_UWB_FRAME)
+    bad[5] ^= 0x01
+    rep.check("UWB bad checksum rejected", split_UWB_frames(bytes(bad))[0] == [], "corrupted frame accepted")
+    rep.check("hex_to_int24 golden", hex_to_int24(b"\x0c\xfe\xff") == -500 and hex_to_int24(b"\xd2\x04\x00") == 1234)
+
+
+def check_roundtrip(rep: Report, rng: random.Random, n: int) -> None:
+    bad = [v for v in (rng.randint(-0x8000, 0x7FFF) for _ in range(n)) if hex_to_int(int_to_hex16(v)) != v]
+    rep.check("int16 round trip", not bad, f"{len(bad)} mismatches, e.g. {bad[:3]}")
+
+    bad24 = [v for v in (rng.randint(-0x800000, 0x7FFFFF) for _ in range(n)) if hex_to_int24(int24_le(v)) != v]
+    rep.check("int24 round trip", not bad24, f"{len(bad24)} mismatches, e.g. {bad24[:3]}")
+
+    bad_cmd = []
+    for _ in range(n):
+        cmd = (rng.uniform(-32.0, 32.0), rng.uniform(-32.0, 32.0), rng.uniform(-32.0, 32.0))
+        frame = Command_Trans(cmd)
+        back = tuple(hex_to_int(frame[i:i + 2]) for i in (3, 5, 7))
+        if back != tuple(int(round(c * 1000)) for c in cmd) or bcc_xor(frame[:9]) != frame[9] or len(frame) != 11:
+            bad_cmd.append(cmd)
+    rep.check("Command_Trans round trip", not bad_cmd, f"{len(bad_cmd)} mismatches, e.g. {bad_cmd[:1]}")
+
+    bad_car = []
+    for _ in range(n):
+        raw = [rng.randint(-0x8000, 0x7FFF) for _ in range(9)]
+        if not close(CAR_Handle(encode_car_frame(raw)), car_expected(raw)):
+            bad_car.append(raw)
+    rep.check("CAR frame round trip", not bad_car, f"{len(bad_car)} mismatches, e.g. {bad_car[:1]}")
+
+    fields = [
+        ([rng.randint(-99999, 99999) for _ in range(4)], [rng.randint(0, 0x7FFFFF) for _ in range(UWB_ANCHORS)],
+         [rng.randint(0, 255) for _ in range(3)])
+        for _ in range(n)
+    ]
+    frames = [encode_uwb_frame(*pv, dis_mm=dis, eop=eop) for pv, dis, eop in fields]
+    recs = decode_UWB_frames(frames)
+    bad_uwb = [
+        i for i, ((pv, dis, eop), f, r) in enumerate(zip(fields, frames, recs))
+        if not close(Uwb_Handle(f), tuple(r["pos"][:2]) + tuple(r["vel"][:2]))
+        or not close(r["dis"], [d / 1000.0 for d in dis]) or not close(r["eop"], [e / 100.0 for e in eop])
+    ]
+    rep.check("UWB full decode round trip", not bad_uwb and len(recs) == n, f"{len(bad_uwb)} mismatches, e.g. {bad_uwb[:3]}")
+
+    # the loop's per-frame decode must agree with the batch decoder on every published field
+    bad_fix = []
+    for i, (f, r) in enumerate(zip(frames, recs)):
+        tag_id, x, y, z, vx, vy, dis, eop = decode_UWB_fix(f)
+        if (tag_id != r["tag_id"] or not close((x, y, z), r["pos"]) or not close((vx, vy), r["vel"][:2])
+                or not close(dis, r["dis"]) or not close(eop, r["eop"])):
+            bad_fix.append(i)
+    rep.check("UWB loop decode matches batch", not bad_fix, f"{len(bad_fix)} mismatches, e.g. {bad_fix[:3]}")
+
+
+def feed_stream(
+    stream: bytes, split: Callable[..., Tuple[List[bytes], bytes]], frame_ends: List[int],
+    rng: random.Random, max_read: int, frame_len: int,
+) -> Tuple[List[bytes], List[int]]:
+    """Feed stream in random read sizes; returns decoded frames and per-frame hold-back in reads."""
+    buf = b""
+    out: List[bytes] = []
+    held: List[int] = []
+    pos = 0
+    reads = 0
+    complete_at: List[int] = []
+    while pos < len(stream):
+        n = rng.randint(1, max_read)
+        buf += stream[pos:pos + n]
+        pos += n
+        reads += 1
+        while len(complete_at) < len(frame_ends) and frame_ends[len(complete_at)] <= pos:
+            complete_at.append(reads)
+        frames, buf = split(buf)
+        for f in frames:
+            held.append(reads - complete_at[len(out)] if len(out) < len(complete_at) else 0)
+            out.append(f)
+    frames, buf = split(buf, min_buffered=frame_len - 1)  # end of stream: drain
+    for f in frames:
+        held.append(reads + 1 - complete_at[len(out)] if len(out) < len(complete_at) else 0)
+        out.append(f)
+    return out, held
+
+
+def check_streams(rep: Report, rng: random.Random, n: int) -> Dict[str, float]:
+    stats: Dict[str, float] = {}
+
+    # chassis: frames separated by random garbage, random read sizes, truncated tail
+    raws = [[rng.randint(-0x8000, 0x7FFF) for _ in range(9)] for _ in range(n)]
+    stream = b""
+    ends: List[int] = []
+    for raw in raws:
+        stream += garbage(rng, rng.randint(0, 30)) + encode_car_frame(raw)
+        ends.append(len(stream))
+    truncated = stream + encode_car_frame(raws[0])[: rng.randint(1, CAR_FRAME_LEN - 1)]
+    for name, data in (("CAR stream", stream), ("CAR stream truncated", truncated)):
+        frames, held = feed_stream(data, split_CAR_frames, ends, rng, 50, CAR_FRAME_LEN)
+        ok = len(frames) == n and all(close(CAR_Handle(f), car_expected(r)) for f, r in zip(frames, raws))
+        rep.check(name, ok, f"decoded {len(frames)}/{n} frames")
+        rep.check(f"{name} no hold-back", not any(held), f"{sum(1 for h in held if h)} frames published late")
+        stats[f"{name} held_reads_mean"] = sum(held) / max(1, len(held))
+        stats[f"{name} held_reads_max"] = float(max(held or [0]))
+
+    # uwb
+    vals = [(rng.randint(-100000, 100000), rng.randint(-100000, 100000), rng.randint(-30000, 30000), rng.randint(-30000, 30000)) for _ in range(n)]
+    stream = b""
+    ends = []
+    for v in vals:
+        stream += garbage(rng, rng.randint(0, 60)) + encode_uwb_frame(*v)
+        ends.append(len(stream))
+    truncated = stream + encode_uwb_frame(*vals[0])[: rng.randint(2, UWB_FRAME_LEN - 1)]
+    for name, data in (("UWB stream", stream), ("UWB stream truncated", truncated)):
+        frames, held = feed_stream(data, split_UWB_frames, ends, rng, 150, UWB_FRAME_LEN)
+        want = [(x / 1000.0, y / 1000.0, vx / 10000.0, vy / 10000.0) for x, y, vx, vy in vals]
+        ok = len(frames) == n and all(close(Uwb_Handle(f), w) for f, w in zip(frames, want))
+        rep.check(name, ok, f"decoded {len(frames)}/{n} frames")
+        rep.check(f"{name} no hold-back", not any(held), f"{sum(1 for h in held if h)} frames published late")
+        stats[f"{name} held_reads_mean"] = sum(held) / max(1, len(held))
+        stats[f"{name} held_reads_max"] = float(max(held or [0]))
+
+    return stats
+
+
+# ---- throughput ------------------------------------------------------------
+
+def bench(fn: Callable[[], int], repeat: int) -> float:
+    """Best-of-repeat frames per second; fn returns the number of frames it processed."""
+    best = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        frames = fn()
+        dt = time.perf_counter() - t0
+        best = max(best, frames / dt if dt > 0 else 0.0)
+    return best
+
+
+def run_benchmarks(rng: random.Random, n: int, repeat: int) -> Dict[str, float]:
+    car_frames = [encode_car_frame([rng.randint(-0x8000, 0x7FFF) for _ in range(9)]) for _ in range(n)]
+    uwb_frames = [encode_uwb_frame(rng.randint(-9999, 9999), rng.randint(-9999, 9999), 0, 0) for _ in range(n)]
+    car_stream = b"".join(car_frames)
+    uwb_stream = b"".join(uwb_frames)
+
+    def decode_car() -> int:
+        for f in car_frames:
+            CAR_Handle(f)
+        return n
+
+    def decode_uwb() -> int:
+        for f in uwb_frames:
+            Uwb_Handle(f)
+        return n
+
+    def decode_uwb_full() -> int:
+        for f in uwb_frames:
+            decode_UWB_frames(f)
+        return n
+
+    def decode_uwb_fix() -> int:
+        for f in uwb_frames:
+            decode_UWB_fix(f)
+        return n
+
+    def encode_cmd() -> int:
+        for _ in range(n):
+            Command_Trans((0.3, 0.0, -0.7))
+        return n
+
+    def stream_loop(stream: bytes, split: Callable[..., Tuple[List[bytes], bytes]], handle: Callable[[bytes], object], read: int) -> Callable[[], int]:
+        def run() -> int:
+            buf = b""
+            got = 0
+            for i in range(0, len(stream), read):
+                buf += stream[i:i + read]
+                frames, buf = split(buf)
+                for f in frames:
+                    handle(f)
+                got += len(frames)
+            return got
+        return run
+
+    return {
+        "CAR_Handle": bench(decode_car, repeat),
+        "Uwb_Handle": bench(decode_uwb, repeat),
+        "Command_Trans": bench(encode_cmd, repeat),
+        "CAR stream": bench(stream_loop(car_stream, split_CAR_frames, CAR_Handle, 50), repeat),
+        "UWB stream": bench(stream_loop(uwb_stream, split_UWB_frames, Uwb_Handle, 150), repeat),
+        "UWB decode fix": bench(decode_uwb_fix, repeat),
+        "UWB decode x1": bench(decode_uwb_full, repeat),
+        "UWB decode batch": bench(lambda: len(decode_UWB_frames(uwb_frames)), repeat),
+    }
+
+
+def check_loops(rep: Report, rng: random.Random, n: int) -> None:
+    """The real I/O loops over replay and loopback transports: every frame published, commands sent."""
+    raw = [[rng.randint(-0x8000, 0x7FFF) for _ in range(9)] for _ in range(n)]
+    shm = np.zeros(SHM_LEN)
+    shm[0:3] = (0.2, 0.0, 0.1)
+    ser = ReplayTransport(b"".join(encode_car_frame(r) for r in raw))
+    got = CAR_loop(ser, shm, stop_at_eof=True)
+    rep.check("CAR_loop replay", got == n and close(shm[3:12], car_expected(raw[-1])) and shm[-1] == 0,
+              f"{got}/{n} frames")
+
+    shm = np.zeros(UWB_SHM_LEN)
+    got = UWB_loop(ReplayTransport(b"".join(encode_uwb_frame(i, -i, 0, 0) for i in range(n))), shm, stop_at_eof=True)
+    rep.check("UWB_loop replay", got == n and shm[UWB_COUNT_IDX] == n and close(shm[0:2], ((n - 1) / 1000.0, -(n - 1) / 1000.0)),
+              f"{got}/{n} frames")
+
+    lb = LoopbackTransport()
+    lb.feed(encode_car_frame(raw[0]))
+    rep.check("loopback transport", lb.read(50) == encode_car_frame(raw[0]) and lb.read(50) == b"" and lb.write(b"ab") == 2)
+
+
+def run_loop_benchmarks(rng: random.Random, n: int, repeat: int) -> Dict[str, float]:
+    car = b"".join(encode_car_frame([rng.randint(-0x8000, 0x7FFF) for _ in range(9)]) for _ in range(n))
+    uwb = b"".join(encode_uwb_frame(rng.randint(-9999, 9999), 0, 0, 0, dis_mm=[1000] * 4) for _ in range(n))
+    car_shm = np.zeros(SHM_LEN)
+    uwb_shm = np.zeros(UWB_SHM_LEN)
+    out = {
+        "CAR_loop replay": bench(lambda: CAR_loop(ReplayTransport(car), car_shm, stop_at_eof=True), repeat),
+        "UWB_loop replay": bench(lambda: UWB_loop(ReplayTransport(uwb), uwb_shm, stop_at_eof=True), repeat),
+    }
+
+    # per-read cost of the two hardware backends, on a pty standing in for the tty
+    if hasattr(os, "openpty"):
+        frame = encode_car_frame([0] * 9)
+        for name, cls in (("pyserial read", PySerialTransport), ("raw fd read", RawFdTransport)):
+            master, slave = os.openpty()
+            try:
+                ser = cls(os.ttyname(slave), 115200)
+            except Exception as e:
+                print(f"[bench] {name}: skipped ({e})")
+                os.close(master)
+                os.close(slave)
+                continue
+
+            def reads(ser=ser, master=master) -> int:
+                for _ in range(n // 10):
+                    os.write(master, frame)
+                    ser.read(CAR_FRAME_LEN)
+                return n // 10
+
+            out[name] = bench(reads, repeat)
+            ser.close()
+            os.close(master)
+            os.close(slave)
+    return out
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="chassis/UWB serial protocol conformance, fuzz and throughput suite")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--n", type=int, default=2000, help="frames per generated stream / round-trip cases")
+    ap.add_argument("--bench-n", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-bench", action="store_true")
+    ap.add_argument("--baseline", type=str, default="", help="json of frames/s from --save-baseline")
+    ap.add_argument("--max-regress", type=float, default=0.25, help="allowed fractional frames/s drop vs baseline")
+    ap.add_argument("--save-baseline", type=str, default="")
+    return ap.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    rep = Report()
+
+    check_golden(rep)
+    check_roundtrip(rep, rng, args.n)
+    stats = check_streams(rep, rng, args.n)
+    check_loops(rep, rng, args.n)
+    for k, v in stats.items():
+        print(f"[stream] {k}={v:.2f}")
+
+    if not args.no_bench:
+        fps = run_benchmarks(rng, args.bench_n, args.repeat)
+        fps.update(run_loop_benchmarks(rng, args.bench_n, args.repeat))
+        for name, v in fps.items():
+            print(f"[bench] {name:<18} {v:12.0f} frames/s {1e6 / v if v else float('inf'):8.2f} us/frame")
+
+        if args.baseline:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                base = json.load(f)
+            for name, v in fps.items():
+                ref = float(base.get(name, 0.0))
+                if ref > 0:
+                    rep.check(f"throughput {name}", v >= ref * (1.0 - args.max_regress), f"{v:.0f} < {ref:.0f} frames/s baseline")
+        if args.save_baseline:
+            with open(args.save_baseline, "w", encoding="utf-8") as f:
+                json.dump(fps, f, indent=2)
+            print(f"[bench] baseline saved to {args.save_baseline}")
+
+    print(f"[result] {rep.passed} passed, {len(rep.failures)} failed")
+    sys.exit(1 if rep.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from typing import List, Tuple
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="import-time audit of the car agent boot path")
+    ap.add_argument("--module", type=str, default="car_agent.main")
+    ap.add_argument("--top", type=int, default=15)
+    return ap.parse_args()
+
+
+def import_times(module: str) -> List[Tuple[int, int, str]]:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        rows.append((int(self_us), int(cum_us), name.rstrip()))
+    return rows
+
+
+def main() -> None:
+    args = parse_args()
+    rows = import_times(args.module)
+    top_level = [r for r in rows if not r[2].startswith("  ")]
+    total = sum(r[1] for r in top_level)
+    print(f"[audit] import {args.module}: {total / 1e3:.1f} ms total, {len(rows)} modules")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cum_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{cum_us / 1e3:14.1f} {self_us / 1e3:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,10 @@ from __future__ import annotations
 
 import argparse
 import time
-from pathlib import Path
-from typing import Any, Dict
-
-import yaml
 
 from car_agent.chassis.chassis_driver import ChassisDriver
-
-
-def load_yaml(path: str) -> Dict[str, Any]:
-    p = Path(path).expanduser().resolve()
-    with p.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
-
-
-def clamp(x: float, lo: float, hi: float) -> float:
-    return max(lo, min(hi, x))
+from car_agent.core.config import load_config
+from car_agent.safety.limits import clamp
 
 
 def parse_args() -> argparse.Namespace:
@@ -31,17 +19,14 @@ def parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
-    cfg = load_yaml(args.config)
-
-    serial_port = str(cfg.get("chassis", {}).get("serial_port", "/dev/ttyCH343USB0"))
-    baudrate = int(cfg.get("chassis", {}).get("baudrate", 115200))
-    hz = float(cfg.get("chassis", {}).get("control_hz", 50.0))
+    cfg = load_config(args.config)
 
-    v_max = float(cfg.get("safety", {}).get("v_max", 0.3))
-    w_max = float(cfg.get("safety", {}).get("w_max", 0.6))
+    serial_port = cfg.chassis_serial or "/dev/ttyCH343USB0"
+    baudrate = cfg.chassis_baudrate
+    hz = cfg.chassis_hz
 
-    vx = clamp(float(args.vx), -v_max, v_max)
-    wz = clamp(float(args.wz), -w_max, w_max)
+    vx = clamp(float(args.vx), -cfg.v_max, cfg.v_max)
+    wz = clamp(float(args.wz), -cfg.w_max, cfg.w_max)
     dt = 1.0 / max(1.0, hz)
 
     chassis = ChassisDriver(serial_port=serial_port, baudrate=baudrate, control_hz=hz)
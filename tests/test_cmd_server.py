@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import math
+import socket
+import time
+
+import pytest
+
+from car_agent.core.types import CmdSample
+from car_agent.net.cmd_server import UdpCmdServer
+from car_agent.net.protocol import pack_cmd, unpack_cmd
+
+
+def test_unpack_cmd_round_trip_and_rejects_non_finite():
+    dst, c = unpack_cmd(pack_cmd("car1", CmdSample(0.0, 1.5, 7, 0.25, -0.5, "auto")))
+    assert dst == b"car1" and (c.seq, c.vx, c.wz, c.mode) == (7, 0.25, -0.5, "auto")
+    for vx, wz in ((math.nan, 0.0), (0.0, math.inf)):
+        with pytest.raises(ValueError, match="non-finite"):
+            unpack_cmd(pack_cmd("car1", CmdSample(0.0, 1.5, 7, vx, wz, "auto")))
+
+
+def _send_and_wait(srv: UdpCmdServer, port: int, packets) -> None:
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    want = srv.rx_count + srv.parse_err + len(packets)
+    for p in packets:
+        tx.sendto(p, ("127.0.0.1", port))
+    tx.close()
+    deadline = time.time() + 2.0
+    while srv.rx_count + srv.parse_err < want and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_server_counts_non_finite_and_stray_payloads():
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    srv = UdpCmdServer("car1", f"127.0.0.1:{port}")
+    srv.start()
+    try:
+        _send_and_wait(srv, port, [
+            pack_cmd("car1", CmdSample(0.0, 1.0, 1, math.nan, 0.0, "auto")),
+            b'{"type":"cmd","car_id":"car1","seq":2,"vx":NaN,"wz":0}',
+            b"CA\x01\x01" + bytes(40),  # a ChassisSample is not a command
+            pack_cmd("car1", CmdSample(0.0, 1.0, 3, 0.2, 0.1, "auto")),
+        ])
+        assert (srv.rx_count, srv.parse_err) == (1, 3)
+        got = srv.get_latest()
+        assert (got.seq, got.vx) == (3, pytest.approx(0.2))
+    finally:
+        srv.stop()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+import socket
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from car_agent.core.config import load_config
+from car_agent.core.types import PeerSample
+from car_agent.net.fleet_bus import UdpFleetBus
+from car_agent.safety.collision import CollisionFilter, GridIndex, time_to_collision
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "car_agent" / "config"
+
+
+def _filter() -> CollisionFilter:
+    return CollisionFilter(car_radius_m=0.2, ttc_stop_s=0.6, ttc_slow_s=2.0, neighbor_radius_m=3.0)
+
+
+def test_grid_index_update_remove_query():
+    g = GridIndex(1.0)
+    g.update("a", 0.5, 0.5)
+    g.update("b", 5.5, 0.5)
+    assert sorted(g.query(0.0, 0.0, 1.0)) == ["a"]
+    g.update("a", 5.2, 0.2)  # moves cell
+    assert sorted(g.query(5.0, 0.0, 1.0)) == ["a", "b"] and g.query(0.0, 0.0, 0.5) == []
+    g.remove("b")
+    g.remove("missing")
+    assert len(g) == 1 and g.query(5.0, 0.0, 1.0) == ["a"]
+
+
+def test_time_to_collision_cases():
+    p = np.array([[2.0, 0.0], [2.0, 0.0], [0.1, 0.0], [2.0, 1.0]])
+    v = np.array([[-1.0, 0.0], [1.0, 0.0], [1.0, 0.0], [-1.0, 0.0]])
+    t = time_to_collision(p, v, 0.4)
+    assert t[0] == pytest.approx(1.6)
+    assert math.isinf(t[1]) and math.isinf(t[2]) and math.isinf(t[3])
+
+
+def test_head_on_scales_then_stops():
+    f = _filter()
+    # peer 2 m ahead driving towards us at 0.5 m/s, we command 0.5 m/s: closing at 1 m/s
+    vx, wz = f.filter(0.5, 0.3, 0.0, 0.0, 0.0, [(2.0, 0.0, math.pi, 0.5)])
+    ttc = 2.0 - 0.4
+    assert vx == pytest.approx(0.5 * (ttc - 0.6) / 1.4) and wz == 0.3
+    vx, _ = f.filter(0.5, 0.0, 0.0, 0.0, 0.0, [(0.9, 0.0, math.pi, 0.5)])
+    assert vx == 0.0
+    assert f.stats()["interventions"] == 2
+
+
+def test_receding_and_behind_peers_do_not_brake():
+    f = _filter()
+    ahead_faster = (1.0, 0.0, 0.0, 1.0)  # ahead, driving away faster than us
+    behind = (-0.6, 0.0, 0.0, 0.0)       # parked right behind us
+    assert f.filter(0.5, 0.0, 0.0, 0.0, 0.0, [ahead_faster, behind]) == (0.5, 0.0)
+    # reversing towards the parked car is braked
+    assert f.filter(-0.5, 0.0, 0.0, 0.0, 0.0, [behind])[0] == 0.0
+    # driving away from a car closing in from behind is never blocked
+    assert f.filter(0.3, 0.0, 0.0, 0.0, 0.0, [(-1.0, 0.0, 0.0, 1.0)]) == (0.3, 0.0)
+
+
+def _free_port() -> int:
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def _wait(cond, timeout_s: float = 2.0) -> None:
+    deadline = time.time() + timeout_s
+    while not cond() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_fleet_bus_neighbors_self_filter_and_prune():
+    port = _free_port()
+    addr = f"127.0.0.1:{port}"
+    bus = UdpFleetBus("car_long_id", addr, addr, max_age_s=0.3)
+    bus.start()
+    try:
+        now = time.time()
+        bus.publish(PeerSample(now, "car_long_id", 0.0, 0.0))  # own broadcast, truncated to 8 bytes
+        bus.publish(PeerSample(now, "car2", 1.0, 0.0, 0.0, 1.0))
+        bus.publish(PeerSample(now, "car3", 10.0, 0.0))
+        _wait(lambda: bus.rx_count == 2)
+        assert bus.peer_count() == 2
+        t = time.time()
+        (nb,) = bus.neighbors(0.0, 0.0, 3.0, t)
+        assert nb[0] > 1.0 and nb[1:] == (0.0, 0.0, 1.0)  # advanced along its heading
+
+        time.sleep(0.4)
+        assert bus.peer_count() == 0 and bus.neighbors(0.0, 0.0, 20.0, time.time()) == []
+        assert len(bus._index) == 0
+    finally:
+        bus.stop()
+
+
+def test_fleet_sharing_is_off_by_default():
+    cfg = load_config(str(CONFIG_DIR / "default.yaml"))
+    assert not cfg.collision_enabled
+    assert (cfg.fleet_listen, cfg.fleet_peer) == ("", "")
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from car_agent.core.config import ConfigError, ConfigStore, load_config, parse_config
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "car_agent" / "config"
+
+
+@pytest.mark.parametrize("spec", ["a", "1,,2", "3-1", "1-", "-1"])
+def test_bad_cpu_lists_rejected(spec):
+    with pytest.raises(ConfigError, match="placement.main.cpus"):
+        parse_config({"placement": {"main": {"cpus": spec}}})
+
+
+def test_shipped_configs_load():
+    for name in ("default", "rt_tuned", "car1", "car2", "car3"):
+        load_config(str(CONFIG_DIR / f"{name}.yaml"))
+
+
+def test_extends_merges_nested_keys(tmp_path):
+    (tmp_path / "base.yaml").write_text("car_id: base\nloop:\n  control_hz: 40\n  telemetry_hz: 10\n")
+    (tmp_path / "mid.yaml").write_text("extends: base.yaml\nloop:\n  telemetry_hz: 5\n")
+    (tmp_path / "car.yaml").write_text("extends: mid.yaml\ncar_id: car9\n")
+    cfg = load_config(str(tmp_path / "car.yaml"))
+    assert (cfg.car_id, cfg.control_hz, cfg.telemetry_hz) == ("car9", 40, 5)
+
+
+def test_extends_cycle_rejected(tmp_path):
+    (tmp_path / "a.yaml").write_text("extends: b.yaml\n")
+    (tmp_path / "b.yaml").write_text("extends: a.yaml\n")
+    with pytest.raises(ConfigError, match="circular"):
+        load_config(str(tmp_path / "a.yaml"))
+
+
+def test_unknown_and_out_of_order_keys_rejected():
+    with pytest.raises(ConfigError, match="unknown keys"):
+        parse_config({"loop": {"contrl_hz": 50}})
+    with pytest.raises(ConfigError, match="telemetry.min_hz must be <= telemetry.max_hz"):
+        parse_config({"telemetry": {"min_hz": 40, "max_hz": 30}})
+    with pytest.raises(ConfigError, match="ttc_stop_s must be <"):
+        parse_config({"safety": {"collision": {"ttc_stop_s": 2.0, "ttc_slow_s": 2.0}}})
+
+
+def test_reload_applies_live_fields_and_keeps_restart_fields(tmp_path):
+    path = tmp_path / "car.yaml"
+    path.write_text("car_id: car1\nsafety:\n  v_max: 0.5\n")
+    store = ConfigStore(str(path))
+
+    path.write_text("car_id: car2\nsafety:\n  v_max: 0.7\n")
+    ok, changed = store.reload()
+    assert ok and changed == ["car_id", "v_max"]
+    assert store.current.v_max == 0.7
+    assert store.current.car_id == "car1"
+
+    path.write_text("safety:\n  v_max: -1\n")
+    ok, changed = store.reload()
+    assert not ok and changed == []
+    assert store.current.v_max == 0.7
+
+
+def test_empty_sections_load(tmp_path):
+    (tmp_path / "base.yaml").write_text("logging:\n  record_dir: /tmp/runs\n")
+    (tmp_path / "car.yaml").write_text(
+        "extends: base.yaml\nlogging:\n#  record_dir: /var/log/car_agent\nsafety:\n  collision:\n"
+    )
+    cfg = load_config(str(tmp_path / "car.yaml"))
+    assert cfg.record_dir == "/tmp/runs"
+    assert parse_config({"logging": None, "safety": {"health": None}}).record_dir == ""
+    with pytest.raises(ConfigError, match="unknown keys"):
+        parse_config({"logging": None, "loging": None})
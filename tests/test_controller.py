@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from car_agent.control.controller import PathTracker, TrackPath, VelocityPI
+
+
+@pytest.mark.parametrize(
+    "xs, ys, v",
+    [
+        ([0.0, math.nan], [0.0, 1.0], 0.3),
+        ([0.0, 1.0], [math.inf, 1.0], 0.3),
+        ([0.0, 1.0], [0.0, 1.0], math.nan),
+        ([0.0], [0.0], 0.3),
+        ([0.0, 1.0], [0.0], 0.3),
+    ],
+)
+def test_bad_paths_rejected(xs, ys, v):
+    with pytest.raises(ValueError):
+        TrackPath(1, xs, ys, v)
+
+
+def test_from_msg_rejects_json_nan():
+    with pytest.raises(ValueError, match="finite"):
+        TrackPath.from_msg({"path_id": 1, "xs": [0.0, float("nan")], "ys": [0.0, 1.0], "v": 0.3})
+
+
+@pytest.mark.parametrize("kind", ["pure_pursuit", "stanley"])
+def test_tracker_heads_for_the_path(kind):
+    path = TrackPath(1, [0.0, 1.0, 2.0], [0.0, 0.0, 0.0], 0.3)
+    tr = PathTracker(kind, lookahead_m=0.4, stanley_k=1.5, heading_k=1.0, goal_tol_m=0.1)
+    vx, wz = tr.update(path, 0.0, 0.2, 0.0)  # left of the path, heading along it
+    assert vx == 0.3 and wz < 0.0
+    assert tr.update(path, 2.0, 0.0, 0.0) == (0.0, 0.0) and tr.done
+
+
+def test_pi_recovers_from_a_nan_reference():
+    pi = VelocityPI(kp_v=0.5, ki_v=1.0, kp_w=0.3, ki_w=0.5, i_max=0.3)
+    vx, _ = pi.update(math.nan, 0.0, 0.0, 0.0, 0.02)
+    assert math.isnan(vx)
+    vx, wz = pi.update(0.1, 0.0, 0.0, 0.0, 0.02)
+    assert vx == pytest.approx(0.1 + 0.5 * 0.1 + 1.0 * 0.1 * 0.02) and wz == 0.0
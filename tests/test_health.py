@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import math
+
+from car_agent.safety.fsm import DRIVE_LIMITED, DRIVE_NORMAL, DRIVE_STOP, DriveFsm
+from car_agent.safety.watchdog import DEGRADED, FAILED, OK, HealthMonitor
+
+
+def _monitor() -> HealthMonitor:
+    return HealthMonitor("chassis", degraded_age_s=0.2, failed_age_s=0.5, min_hz=0.0, recover_s=1.0)
+
+
+def test_starts_failed_and_reports_frame_age():
+    m = _monitor()
+    assert m.state == FAILED
+    assert m.update(0.0, math.inf, 0) == FAILED
+    assert m.update(0.1, 0.6, 1) == FAILED
+
+
+def test_worse_is_immediate_better_needs_recover_s():
+    m = _monitor()
+    m.update(0.0, math.inf, 0)
+    assert m.update(0.1, 0.01, 1) == FAILED   # better seen, timer starts
+    assert m.update(0.6, 0.01, 2) == FAILED
+    assert m.update(1.1, 0.01, 3) == OK       # held for recover_s
+    assert m.update(1.2, 0.3, 4) == DEGRADED  # worse takes effect at once
+    assert m.update(1.3, 0.01, 5) == DEGRADED
+    assert m.update(1.5, 0.3, 6) == DEGRADED  # a relapse restarts the timer
+    assert m.update(1.6, 0.01, 7) == DEGRADED
+    assert m.update(2.5, 0.01, 8) == DEGRADED
+    assert m.update(2.6, 0.01, 9) == OK
+
+
+def test_errors_rate_and_liveness_degrade():
+    m = HealthMonitor("uwb", 0.3, 1.5, min_hz=5.0, recover_s=0.0)
+    m.update(0.0, 0.01, 0)
+    assert m.update(0.1, 0.01, 1) == OK
+    assert m.update(0.2, 0.01, 2, errors=1) == DEGRADED
+    assert m.update(1.2, 0.01, 3, errors=1) == DEGRADED  # 3 frames in 1.2 s < min_hz
+    assert m.update(1.3, 0.01, 3, alive=False) == FAILED
+
+    m = HealthMonitor("link", 0.2, 1.0, recover_s=0.0)
+    m.update(0.0, 0.01, 0)
+    assert m.update(0.1, 0.01, 1) == OK
+    assert m.update(0.2, 0.01, 2, degraded=True) == DEGRADED
+
+
+def test_drive_fsm_modes():
+    fsm = DriveFsm(v_limited=0.3, w_limited=0.8)
+    assert fsm.mode == DRIVE_STOP
+    assert fsm.update(OK, OK, on_path=True) == DRIVE_NORMAL
+    assert fsm.update(OK, DEGRADED, on_path=True) == DRIVE_LIMITED
+    assert fsm.update(OK, FAILED, on_path=False) == DRIVE_LIMITED
+    assert fsm.update(OK, FAILED, on_path=True) == DRIVE_STOP
+    assert fsm.update(FAILED, OK, on_path=False) == DRIVE_STOP
+    assert fsm.changes == 3
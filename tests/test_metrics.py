@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from car_agent.analysis.metrics import cmd_latency, cross_track, path_distance, velocity_errors
+from car_agent.analysis.runs import load_run
+from car_agent.control.evaluate import make_path
+from car_agent.core.types import MODES, ChassisSample, CmdSample, PoseSample
+from car_agent.logging.recorder import Recorder
+
+DT = 0.02
+T0 = 1000.0
+
+
+def _rows(cls, samples) -> np.ndarray:
+    arr = np.zeros(len(samples), dtype=cls.DTYPE)
+    for i, s in enumerate(samples):
+        s.write_record(arr, i)
+    return arr
+
+
+def _run(n: int = 100):
+    """Ticks at T0 + i*DT; a new command every 5 ticks, received 3 ms after the tick before."""
+    cmd, act, chassis, pose = [], [], [], []
+    for i in range(n):
+        now = T0 + i * DT
+        seq = i // 5
+        rx = T0 + (5 * seq - 1) * DT + 0.003 if seq else now
+        vx = 0.1 * seq
+        cmd.append(CmdSample(rx, rx - 0.01, seq, vx, 0.0, "path"))
+        act.append(CmdSample(now, rx - 0.01, seq, vx, 0.0, "path" if i >= 50 else "auto"))
+        # the chassis reaches the command one tick later; frames are stamped 5 ms before the tick
+        chassis.append(ChassisSample(now - 0.005, 0.1 * ((i - 1) // 5) if i else 0.0))
+        pose.append(PoseSample(now, 0.01 * i, 0.5 if i >= 50 else 2.0))
+    return _rows(CmdSample, cmd), _rows(CmdSample, act), _rows(ChassisSample, chassis), _rows(PoseSample, pose)
+
+
+def test_joins_survive_dropped_rows():
+    cmd, act, chassis, pose = _run()
+    link, hold = cmd_latency(cmd, act)
+    ev, _ = velocity_errors(act, chassis, lag_ticks=1)
+    cte = cross_track(pose, act, np.array([0.0, 2.0]), np.array([0.0, 0.0]))
+
+    # drop a different row from each stream, as a full recorder queue would
+    cmd_d, act_d, ch_d, pose_d = np.delete(cmd, 12), np.delete(act, 33), np.delete(chassis, 47), np.delete(pose, 70)
+    link_d, hold_d = cmd_latency(cmd_d, act_d)
+    ev_d, _ = velocity_errors(act_d, ch_d, lag_ticks=1)
+    cte_d = cross_track(pose_d, act_d, np.array([0.0, 2.0]), np.array([0.0, 0.0]))
+
+    assert np.allclose(hold[1:], DT - 0.003) and np.allclose(hold_d[1:], DT - 0.003)
+    assert np.allclose(link, 0.01) and len(link_d) == len(link)
+    assert np.allclose(ev, 0.0, atol=1e-6) and np.allclose(ev_d, 0.0, atol=1e-6)
+    assert np.allclose(cte, 0.5) and np.allclose(cte_d, 0.5) and len(cte_d) == len(cte) - 1
+
+
+def test_path_distance_matches_brute_force():
+    rng = np.random.default_rng(0)
+    path_x, path_y = make_path("figure8", 150)
+    px, py = rng.uniform(-2.0, 2.0, 3000), rng.uniform(-1.0, 1.0, 3000)
+    ax, ay = path_x[:-1], path_y[:-1]
+    dx, dy = np.diff(path_x), np.diff(path_y)
+    rx, ry = px[:, None] - ax, py[:, None] - ay
+    u = np.clip((rx * dx + ry * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+    brute = np.sqrt(((rx - u * dx) ** 2 + (ry - u * dy) ** 2).min(axis=1))
+    assert path_distance(px, py, path_x, path_y) == pytest.approx(brute, abs=1e-12)
+
+
+def test_evaluate_scores_a_recorder_run(tmp_path):
+    rec = Recorder(str(tmp_path), "car1")
+    for i in range(50):
+        t = T0 + i * DT
+        rec.write("act", CmdSample(t, t, 0, 0.3, 0.0, "path"))
+        rec.write("pose", PoseSample(t, 3.0 * i / 49, 0.1))
+    rec.close()
+    assert MODES.index("path") == load_run(rec.run_dir)["act"]["mode"][0]
+    out = subprocess.run(
+        [sys.executable, "-m", "car_agent.control.evaluate", "--run", str(rec.run_dir), "--path", "line"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert "n=50.0000" in out and "ct_max_m=0.1000" in out
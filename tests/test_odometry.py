@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from car_agent.estimation.odometry import SLIP_ACCEL, SLIP_TRACK, Odometry
+
+DT = 0.01
+
+
+def _drive(od: Odometry, n: int, vx: float, wz: float = 0.0, ax: float = 0.0, cmd_vx=None, t0: float = 100.0) -> float:
+    t = t0
+    for i in range(n):
+        t = t0 + i * DT
+        od.update(t, vx, wz, ax, vx if cmd_vx is None else cmd_vx)
+    return t
+
+
+def test_straight_line_and_arc_are_exact():
+    od = Odometry()
+    _drive(od, 101, 0.5)
+    assert (od.x, od.y, od.yaw) == pytest.approx((0.5, 0.0, 0.0))
+    assert od.dist == pytest.approx(0.5)
+
+    # quarter circle of radius 1: v = 1 m/s, w = 1 rad/s for pi/2 s
+    od = Odometry()
+    n = 1000
+    for i in range(n + 1):
+        od.update(100.0 + i * (math.pi / 2) / n, 1.0, 1.0, 0.0, 1.0)
+    assert (od.x, od.y, od.yaw) == pytest.approx((1.0, 1.0, math.pi / 2))
+
+
+def test_frames_sharing_a_read_stamp_are_all_integrated():
+    # two frames per read, 10 ms apart on the wire, read every 20 ms; the first of each pair is moving
+    speeds = [0.5 if k % 2 == 0 else 0.0 for k in range(400)]
+    od = Odometry()
+    for k, v in enumerate(speeds):
+        od.update(100.0 + 0.02 * (k // 2 + 1), v, 0.0, 0.0, v)
+    ref = Odometry()
+    for k, v in enumerate(speeds):
+        ref.update(100.0 + 0.01 * k, v, 0.0, 0.0, v)
+    assert od.dist == pytest.approx(ref.dist, rel=0.02)
+    assert od.x == pytest.approx(ref.x, rel=0.02)
+
+
+def test_link_gap_is_not_integrated():
+    od = Odometry()
+    t = _drive(od, 11, 1.0)
+    od.update(t + 2.0, 1.0, 0.0, 0.0, 1.0)
+    assert od.dist == pytest.approx(0.1)
+
+
+def test_accel_slip_flag_sets_and_clears_with_hysteresis():
+    od = Odometry(accel_tol=1.5, hold_frames=10)
+    _drive(od, 20, 0.5)
+    # wheels spin up at 5 m/s^2 while the IMU says the body does not accelerate
+    t = 100.0 + 19 * DT
+    for i in range(30):
+        t += DT
+        od.update(t, 0.5 + 5.0 * DT * (i + 1), 0.0, 0.0, 0.5)
+    assert od.slip & SLIP_ACCEL
+    for _ in range(60):
+        t += DT
+        od.update(t, 2.0, 0.0, 0.0, 2.0)
+    assert not od.slip & SLIP_ACCEL
+
+
+def test_track_slip_ignores_actuator_lag():
+    od = Odometry(track_tol=0.15, hold_frames=10, cmd_tau_s=0.5)
+    _drive(od, 10, 0.0, cmd_vx=0.0)
+    # step to 0.8 m/s, chassis follows with a 0.3 s lag: never flagged
+    v, t = 0.0, 100.0 + 9 * DT
+    for _ in range(200):
+        t += DT
+        v += (DT / 0.3) * (0.8 - v)
+        od.update(t, v, 0.0, (DT / 0.3) * (0.8 - v) / DT, 0.8)
+        assert not od.slip & SLIP_TRACK
+    # stuck at 0.2 m/s under a 0.8 m/s command: flagged, and reset() clears it
+    for _ in range(200):
+        t += DT
+        od.update(t, 0.2, 0.0, 0.0, 0.8)
+    assert od.slip & SLIP_TRACK
+    od.reset()
+    assert od.slip == 0 and (od.x, od.y, od.dist) == (0.0, 0.0, 0.0)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+
+from car_agent.analysis.runs import STREAMS, load_run
+from car_agent.core.types import ChassisSample, CmdSample, OdomSample, PoseSample, TelemetrySample, UwbSample
+from car_agent.logging.recorder import REC_HEADER_LEN, Recorder, open_record, read_header
+
+
+def _tick(i: int):
+    t = 1000.0 + 0.02 * i
+    return {
+        "chassis": ChassisSample(t),
+        "cmd": CmdSample(t, t - 0.01, i, 0.1, 0.0, "auto"),
+        "act": CmdSample(t, t - 0.01, i, 0.1, 0.0, "auto"),
+        "pose": PoseSample(t, 0.01 * i),
+        "odom": OdomSample(t, 0.01 * i),
+        "uwb": UwbSample(t, 0.01 * i),
+        "telemetry": TelemetrySample(t, 300, 20.0, 1, 0, 3, 0, 1, 0.25, 0.5),  # exact in float32
+    }
+
+
+def test_round_trip_with_long_car_id(tmp_path):
+    car_id = "car_unknown_with_a_long_fleet_name"
+    rec = Recorder(str(tmp_path), car_id)
+    for i in range(100):
+        for stream, s in _tick(i).items():
+            rec.write(stream, s)
+    rec.close()
+    assert (rec.errors, rec.dropped) == (0, 0)
+
+    path = rec.run_dir / "telemetry.rec"
+    assert read_header(str(path))["meta"]["car_id"] == car_id
+    assert (path.stat().st_size - 100 * TelemetrySample.DTYPE.itemsize) % REC_HEADER_LEN == 0
+
+    run = load_run(rec.run_dir)
+    assert run.car_id == car_id
+    assert all(len(run[s]) == 100 for s in STREAMS)
+    assert np.allclose(run["pose"]["x"], 0.01 * np.arange(100), atol=1e-6)
+    assert TelemetrySample.from_record(run["telemetry"][-1]) == _tick(99)["telemetry"]
+
+
+def test_torn_last_record_ignored(tmp_path):
+    rec = Recorder(str(tmp_path), "car1")
+    for i in range(3):
+        rec.write("pose", PoseSample(float(i)))
+    rec.close()
+    path = rec.run_dir / "pose.rec"
+    with path.open("ab") as f:
+        f.write(b"\0\0\0")
+    assert list(open_record(str(path))["stamp"]) == [0.0, 1.0, 2.0]
+
+
+def test_bad_record_counted_and_writer_survives(tmp_path, capsys):
+    rec = Recorder(str(tmp_path), "car1")
+    rec._q.put(("bogus", type(None), b""))  # not a Sample: opening its file fails
+    rec.write("pose", PoseSample(1.0))
+    rec.close()
+    assert rec.errors == 1
+    assert len(open_record(str(rec.run_dir / "pose.rec"))) == 1
+    assert "write_errors=1" in capsys.readouterr().out
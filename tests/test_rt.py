@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import gc
+from pathlib import Path
+
+import pytest
+
+from car_agent.core.config import load_config
+from car_agent.core.rt import Placement, apply_gc, apply_placement, parse_cpus
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "car_agent" / "config"
+
+
+@pytest.mark.parametrize(
+    "spec, cpus",
+    [("", []), ("2", [2]), ("2,3", [2, 3]), ("0-1,3", [0, 1, 3]), (" 3, 1-2 ,3", [1, 2, 3])],
+)
+def test_parse_cpus(spec, cpus):
+    assert parse_cpus(spec) == cpus
+
+
+def test_default_placement_is_neutral_and_tuned_is_opt_in():
+    cfg = load_config(str(CONFIG_DIR / "default.yaml"))
+    for proc in ("main", "chassis", "uwb"):
+        assert (
+            getattr(cfg, f"placement_{proc}_policy"), getattr(cfg, f"placement_{proc}_mlock"),
+            getattr(cfg, f"placement_{proc}_cpus"), getattr(cfg, f"placement_{proc}_gc"),
+        ) == ("other", False, "", "default")
+    tuned = load_config(str(CONFIG_DIR / "rt_tuned.yaml"))
+    cpus = [parse_cpus(getattr(tuned, f"placement_{p}_cpus")) for p in ("main", "chassis", "uwb")]
+    assert all(cpus) and len({c[0] for c in cpus}) == 3
+
+
+def test_neutral_placement_changes_nothing():
+    rep = apply_placement(Placement())
+    assert (rep["policy"], rep["mlock"], rep["gc"], rep["errors"]) == ("other", False, "default", [])
+
+
+def test_freeze_no_gen2_makes_full_collections_rarer():
+    before = gc.get_threshold()
+    try:
+        rep = {}
+        apply_gc("freeze_no_gen2", rep)
+        assert rep["gc"].startswith("freeze_no_gen2")
+        assert gc.get_threshold()[2] > before[2]
+    finally:
+        gc.unfreeze()
+        gc.set_threshold(*before)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from car_agent.chassis.wheeltec_serial_io import CAR_FRAME_LEN, CAR_Handle, split_CAR_frames
+from car_agent.sensors.uwb_serial_io import Uwb_Handle, decode_UWB_fix, decode_UWB_frames, split_UWB_frames
+from scripts import bench_decoders
+from scripts.bench_decoders import (
+    GOLDEN_CAR_FRAME,
+    GOLDEN_CAR_VALUES,
+    GOLDEN_UWB_FRAME,
+    GOLDEN_UWB_VALUES,
+    encode_car_frame,
+    encode_uwb_frame,
+)
+
+
+def test_car_golden_frame():
+    frames, rest = split_CAR_frames(GOLDEN_CAR_FRAME)
+    assert frames == [GOLDEN_CAR_FRAME] and rest == b""
+    assert CAR_Handle(frames[0]) == pytest.approx(GOLDEN_CAR_VALUES)
+
+
+def test_car_resyncs_after_garbage_and_keeps_partial_tail():
+    a = encode_car_frame([1] * 9)
+    b = encode_car_frame([-2] * 9)
+    starts = []
+    frames, rest = split_CAR_frames(b"\x7b\x00\x11" + a + b + b[:5], starts=starts)
+    assert frames == [a, b]
+    assert starts == [3, 3 + CAR_FRAME_LEN]
+    assert rest == b[:5]
+
+
+def test_car_bad_bcc_rejected_unless_unchecked():
+    bad = bytearray(GOLDEN_CAR_FRAME)
+    bad[5] ^= 0x01
+    assert split_CAR_frames(bytes(bad))[0] == []
+    assert split_CAR_frames(bytes(bad), check=False)[0] == [bytes(bad)]
+
+
+def test_uwb_golden_frame():
+    frames, rest = split_UWB_frames(GOLDEN_UWB_FRAME)
+    assert frames == [GOLDEN_UWB_FRAME] and rest == b""
+    assert Uwb_Handle(frames[0]) == pytest.approx(GOLDEN_UWB_VALUES)
+
+
+def test_uwb_bad_checksum_rejected():
+    bad = bytearray(GOLDEN_UWB_FRAME)
+    bad[5] ^= 0x01
+    frames, _ = split_UWB_frames(b"\x55" + bytes(bad) + GOLDEN_UWB_FRAME)
+    assert frames == [GOLDEN_UWB_FRAME]
+
+
+def test_uwb_loop_decode_matches_batch():
+    frame = encode_uwb_frame(1234, -500, 2500, -1000, dis_mm=[1000, 2000, 0, 3500], eop=(3, 4, 5))
+    tag, x, y, z, vx, vy, dis, eop = decode_UWB_fix(frame)
+    rec = decode_UWB_frames([frame])[0]
+    assert (x, y, z) == pytest.approx(tuple(rec["pos"]))
+    assert (vx, vy) == pytest.approx(tuple(rec["vel"][:2]))
+    assert dis == pytest.approx(list(rec["dis"]))
+    assert eop == pytest.approx(list(rec["eop"]))
+    assert tag == rec["tag_id"]
+
+
+@pytest.mark.parametrize("suite", ["golden", "roundtrip", "streams", "loops"])
+def test_conformance_suite(suite):
+    # the golden, fuzz, round-trip and loop checks of the bench, without the timing part
+    rep = bench_decoders.Report()
+    if suite == "golden":
+        bench_decoders.check_golden(rep)
+    else:
+        getattr(bench_decoders, f"check_{suite}")(rep, random.Random(1), 300)
+    assert not rep.failures and rep.passed > 0
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from car_agent.core.config import load_config
+from car_agent.net.protocol import loads
+from car_agent.net.telemetry_server import TelemetryDecoder, TelemetryEncoder
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "car_agent" / "config"
+
+
+def _msg(t: float, vx: float, frames: int) -> dict:
+    return {
+        "type": "telemetry",
+        "car_id": "car1",
+        "t": t,
+        "seq": 7,
+        "state": {"vx": vx, "wz": 0.0, "pose": {"x": 1.0, "y": 2.0, "yaw": 0.5}, "uwb": None},
+        "health": {"sub": [0, 3, 0, 0], "drive": 0, "chassis_frames": frames},
+    }
+
+
+def _body(m: dict) -> dict:
+    return {k: v for k, v in m.items() if k not in ("t", "kf")}
+
+
+def test_keyframe_then_deltas_round_trip():
+    enc, dec = TelemetryEncoder(keyframe_s=1.0, digits=3), TelemetryDecoder()
+    for i in range(5):
+        m = _msg(round(100.0 + 0.1 * i, 3), round(0.1 * i, 3), 50 * i)  # already at the coded precision
+        wire = loads(enc.encode(m["t"], m))
+        assert wire["type"] == ("telemetry" if i == 0 else "telemetry_delta")
+        got = dec.decode(wire)
+        assert got is not None
+        assert _body(got) == _body(m)
+        assert got["t"] == m["t"]
+    assert (enc.keyframes, enc.deltas) == (1, 4)
+
+
+def test_delta_is_smaller_and_new_keyframe_after_keyframe_s():
+    enc = TelemetryEncoder(keyframe_s=1.0)
+    kf = enc.encode(0.0, _msg(0.0, 0.0, 0))
+    delta = enc.encode(0.5, _msg(0.5, 0.2, 10))
+    assert len(delta) < len(kf)
+    assert loads(enc.encode(1.5, _msg(1.5, 0.2, 20)))["type"] == "telemetry"
+
+
+def test_delta_after_lost_keyframe_is_dropped():
+    enc, dec = TelemetryEncoder(keyframe_s=1.0), TelemetryDecoder()
+    dec.decode(loads(enc.encode(0.0, _msg(0.0, 0.0, 0))))
+    enc.encode(1.5, _msg(1.5, 0.0, 1))  # keyframe lost on the way
+    delta = loads(enc.encode(1.6, _msg(1.6, 0.3, 2)))
+    assert delta["type"] == "telemetry_delta"
+    assert dec.decode(delta) is None
+
+
+def test_adaptive_telemetry_is_opt_in():
+    assert not load_config(str(CONFIG_DIR / "default.yaml")).telemetry_adaptive
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from car_agent.control.trajectory import Trajectory
+
+
+def test_interpolates_and_holds_last_setpoint():
+    tr = Trajectory([0.0, 1.0], [0.0, 1.0], [0.5, -0.5], max_horizon_s=2.0, hold_s=0.5)
+    assert tr.sample(0.25) == pytest.approx((0.25, 0.25))
+    assert tr.sample(1.2) == (1.0, -0.5)
+    assert tr.horizon_s == 1.5
+    assert not tr.expired(1.5) and tr.expired(1.51)
+
+
+def test_horizon_capped():
+    assert Trajectory([0.0, 5.0], [0.1, 0.1], [0.0, 0.0], max_horizon_s=2.0).horizon_s == 2.0
+
+
+def test_single_setpoint_needs_hold():
+    with pytest.raises(ValueError, match="hold_s > 0"):
+        Trajectory([0.0], [0.2], [0.0], max_horizon_s=2.0)
+    tr = Trajectory.from_msg({"ts": [0.0], "vx": [0.2], "wz": [0.0], "hold_s": 0.3}, max_horizon_s=2.0)
+    assert tr.horizon_s == 0.3 and tr.sample(0.2) == (0.2, 0.0)
+
+
+@pytest.mark.parametrize(
+    "ts, vx, wz, hold_s",
+    [
+        ([0.0, math.nan], [0.0, 0.0], [0.0, 0.0], 0.0),
+        ([0.0, 1.0], [0.0, math.inf], [0.0, 0.0], 0.0),
+        ([0.0, 1.0], [0.0, 0.0], [-math.inf, 0.0], 0.0),
+        ([0.0, 1.0], [0.0, 0.0], [0.0, 0.0], math.nan),
+        ([0.0, 1.0], [0.0, 0.0], [0.0, 0.0], -0.1),
+        ([0.0, 0.0], [0.0, 0.0], [0.0, 0.0], 0.0),
+        ([-0.1, 1.0], [0.0, 0.0], [0.0, 0.0], 0.0),
+        ([0.0, 1.0], [0.0], [0.0, 0.0], 0.0),
+    ],
+)
+def test_invalid_trajectories_rejected(ts, vx, wz, hold_s):
+    with pytest.raises(ValueError):
+        Trajectory(ts, vx, wz, max_horizon_s=2.0, hold_s=hold_s)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from car_agent.core.config import ConfigError, parse_config
+from car_agent.core.transport import (
+    LoopbackTransport,
+    PySerialTransport,
+    RawFdTransport,
+    ReplayTransport,
+    open_transport,
+)
+
+
+def test_scheme_prefix_picks_the_backend(tmp_path):
+    cap = tmp_path / "cap.bin"
+    cap.write_bytes(b"abc")
+    t = open_transport(f"replay:{cap}", 0)
+    assert isinstance(t, ReplayTransport) and t.read(10) == b"abc"
+    assert isinstance(open_transport("loopback:", 0, allow_loopback=True), LoopbackTransport)
+    with pytest.raises(ValueError, match="unknown serial backend"):
+        open_transport("/dev/ttyX", 115200, backend="usb")
+
+
+def test_plain_path_uses_backend(monkeypatch):
+    opened = []
+    monkeypatch.setattr(RawFdTransport, "__init__", lambda self, port, baud, timeout_s: opened.append(("raw", port)))
+    monkeypatch.setattr(PySerialTransport, "__init__", lambda self, port, baud, timeout_s: opened.append(("py", port)))
+    open_transport("/dev/ttyA", 115200, backend="raw")
+    open_transport("/dev/ttyB", 115200)
+    open_transport("pyserial:/dev/ttyC", 115200, backend="raw")
+    assert opened == [("raw", "/dev/ttyA"), ("py", "/dev/ttyB"), ("py", "/dev/ttyC")]
+
+
+def test_loopback_refused_for_the_serial_loops():
+    with pytest.raises(ValueError, match="loopback"):
+        open_transport("loopback:", 115200)
+    for section in ({"chassis": {"serial_port": "loopback:"}}, {"sensors": {"uwb": {"serial_port": "loopback:"}}}):
+        with pytest.raises(ConfigError, match="loopback"):
+            parse_config(section)
+
+
+def test_replay_eof_idles_instead_of_spinning():
+    r = ReplayTransport(b"xyz", timeout_s=0.01)
+    assert r.read(2) == b"xy" and r.read(2) == b"z" and not r.eof
+    t0 = time.perf_counter()
+    assert r.read(2) == b"" and r.eof
+    assert time.perf_counter() - t0 >= 0.009
+
+
+def test_replay_loop_and_pacing():
+    r = ReplayTransport(b"ab", loop=True)
+    assert b"".join(r.read(1) for _ in range(5)) == b"ababa" and not r.eof
+    paced = ReplayTransport(bytes(100), baudrate=10000, timeout_s=0.05)  # 1 ms per byte
+    t0 = time.perf_counter()
+    got = 0
+    while got < 100:
+        got += len(paced.read(100))
+    assert time.perf_counter() - t0 >= 0.08
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs a pty")
+def test_raw_fd_write_is_whole_or_dropped():
+    master, slave = os.openpty()
+    try:
+        t = RawFdTransport(os.ttyname(slave), 115200, timeout_s=0.01)
+        try:
+            assert t.write(b"x" * 100) == 100
+            assert os.read(master, 200) == b"x" * 100
+            # nobody drains the pty: it fills, the frame that hits the full buffer is dropped whole
+            sizes = [t.write(b"y" * 4096) for _ in range(64)]
+            assert sizes[-1] == 0
+            # at most the frame that filled it is cut short, after waiting timeout_s for room
+            assert sum(1 for s in sizes if 0 < s < 4096) <= 1
+        finally:
+            t.close()
+    finally:
+        os.close(master)
+        os.close(slave)